@@ -6,13 +6,26 @@ Events can be emitted from, and waited on, any event loop or thread.
 Waiting for an event will return the parameters passed into it when emitted.
 """
 
-from .event import Evt, EvtData, Event, Data
+from .event import Evt, EvtData, Event, Data, Subscription
 from .manager import Manager
+from .channel import Channel
+from .stream import EventStream, StreamPolicy
+from .metrics import Metrics
+from .flow import InFlightLimitExceeded, OverflowPolicy
+from .journal import Journal
+from .request import Gather
+from .timer import TimerHandle
+from .transport import Transport, SharedMemoryBus, SharedMemoryTransport
 
 name = "aioevt"
 version = (2, 2, 1)
 
-__all__ = ["Evt", "Event", "EvtData", "Data", "Manager", "name", "version"]
+__all__ = [
+    "Evt", "Event", "EvtData", "Data", "Subscription", "Manager", "Channel",
+    "EventStream", "StreamPolicy", "Metrics", "TimerHandle",
+    "OverflowPolicy", "InFlightLimitExceeded", "Gather", "Journal",
+    "Transport", "SharedMemoryBus", "SharedMemoryTransport", "name", "version",
+]
 
 __author__ = "Austin Archer"
 __version__ = ".".join(map(str, version))
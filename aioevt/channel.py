@@ -0,0 +1,71 @@
+"""
+Handles bound to a single event name
+"""
+from typing import Callable
+
+from .event import Evt, EvtData
+
+__all__ = ["Channel", "ChannelProxy"]
+
+
+class Channel:
+    """
+    A handle for one event name of a Manager, obtained with
+    `Manager.channel(name)` or as an attribute of `Manager.proxy`.
+
+        progress = mgr.channel("Progress")
+        progress.emit(50, total=100)     # mgr.emit("Progress", args=(50,), kwargs={"total": 100})
+
+    Channels are cached by the manager (up to `channels_maxsize` names), so
+    repeated lookups are cheap, and emitting through one skips the argument
+    handling of `Manager.emit`.
+    """
+    __slots__ = ("manager", "name")
+
+    def __init__(self, manager, name: str):
+        self.manager = manager
+        self.name = name
+
+    def __repr__(self) -> str:
+        return "Channel({!r})".format(self.name)
+
+    def emit(self, *args, **kwargs):
+        """
+        Emit the event with the given positional and keyword arguments
+        """
+        self.manager._emit(self.name, args, kwargs, None)
+
+    def __call__(self, *args, **kwargs):
+        self.manager._emit(self.name, args, kwargs, None)
+
+    def register(self, func: Callable, **options) -> Evt:
+        """
+        Subscribe a callback; see `Manager.register` for the options
+        """
+        return self.manager.register(self.name, func, **options)
+
+    async def wait(self, timeout: float = None) -> EvtData:
+        """
+        Wait until the event is emitted
+        """
+        return await self.manager.wait(self.name, timeout)
+
+
+class ChannelProxy:
+    """
+    Attribute access to channels: `mgr.proxy.Progress(50)` emits "Progress".
+
+    Every attribute that isn't a dunder is an event name, including names
+    such as `_manager`: the proxy's own state is only read through
+    `object.__getattribute__`. Channels come from the manager's bounded
+    cache rather than being stored on the proxy.
+    """
+    __slots__ = ("_manager",)
+
+    def __init__(self, manager):
+        self._manager = manager
+
+    def __getattribute__(self, name: str) -> Channel:
+        if name.startswith("__"):
+            return object.__getattribute__(self, name)
+        return object.__getattribute__(self, "_manager").channel(name)
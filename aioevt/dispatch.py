@@ -0,0 +1,314 @@
+"""
+Per-loop delivery queues used by the Manager
+"""
+from collections import deque
+from threading import Lock as LockType
+from typing import Optional
+import asyncio
+import time
+
+from .event import COROUTINE, SYNC
+from .flow import LIMITED, InFlightLimit, Tracked
+
+__all__ = ["LoopDispatcher"]
+
+
+class LoopDispatcher:
+    """
+    Batches every delivery bound for a single event loop.
+
+    Work items are appended from any thread, but the loop is only woken up
+    (via `call_soon_threadsafe`, or plain `call_soon` when the pushing
+    thread is already running the loop) when the queue transitions from
+    idle to pending. The loop then drains the entire batch in a single callback, so
+    a burst of emits costs one wakeup per target loop instead of one per
+    subscriber.
+
+    Items pushed while the loop is not running are kept in a bounded pending
+    buffer. They are flushed, in order, as soon as the loop runs, and items
+    older than `pending_ttl` are discarded instead of delivered. Overflowing
+    the buffer drops the oldest pending item.
+
+    Items are queued in priority lanes and drained highest lane first. With
+    a `drain_budget`, a single loop callback runs at most that many items
+    (every non-empty lane is guaranteed `lane_quota` of them) and the rest
+    is drained in later callbacks, so new high-priority items overtake a
+    backlog of low-priority ones.
+
+    With `inline`, items pushed from the loop's own thread while nothing is
+    queued run immediately, inside the push, like nested function calls:
+    an emit from a handler is handled before that handler returns. Items
+    never overtake queued ones, and nesting deeper than `INLINE_DEPTH`
+    falls back to the queue.
+
+    `running` counts the handler tasks started from this queue that have
+    not finished yet. It is only touched from the loop's thread. `on_idle`
+    is called there whenever the queue is empty and no handler is running.
+    """
+    __slots__ = (
+        "loop", "pending_maxsize", "pending_ttl", "limit", "on_idle",
+        "drain_budget", "lane_quota", "inline",
+        "wakeups", "deferred", "overflowed", "expired", "dropped", "running",
+        "_lanes", "_order", "_queued", "_pending", "_lock", "_scheduled",
+        "_depth",
+    )
+
+    INLINE_DEPTH = 16
+
+    def __init__(self,
+                 loop: asyncio.AbstractEventLoop,
+                 pending_maxsize: int = 10000,
+                 pending_ttl: Optional[float] = None,
+                 limit: Optional[InFlightLimit] = None,
+                 on_idle: Optional[callable] = None,
+                 drain_budget: Optional[int] = None,
+                 lane_quota: int = 16,
+                 inline: bool = False,
+    ):
+        self.loop = loop
+        self.pending_maxsize = pending_maxsize
+        self.pending_ttl = pending_ttl
+        self.limit = limit
+        self.on_idle = on_idle
+        self.drain_budget = drain_budget
+        self.lane_quota = lane_quota
+        self.inline = inline
+        self._depth = 0
+        self.running = 0
+        self.wakeups = 0
+        self.deferred = 0
+        self.overflowed = 0
+        self.expired = 0
+        self.dropped = 0
+        self._lanes = {0: deque()}
+        self._order = (0,)
+        self._queued = 0
+        self._pending = deque()
+        self._lock = LockType()
+        self._scheduled = False
+
+    def __len__(self) -> int:
+        return self._queued + len(self._pending)
+
+    def push(self, item: tuple, priority: int = 0):
+        """
+        Queue a single `(kind, func, args, kwargs)` work item, where `kind`
+        is the dispatch kind assigned to the callback at registration
+
+        :param item: the work item to run on the loop
+        :param priority: lane of the item; higher lanes are drained first
+        """
+        self.push_many((item,), priority)
+
+    def push_many(self, items, priority: int = 0):
+        """
+        Queue several work items with at most one wakeup
+
+        :param items: sized iterable of `(kind, func, args, kwargs)` work items
+        :param priority: lane of the items; higher lanes are drained first
+        """
+        loop = self.loop
+        if self.inline and not self._queued and not self._pending \
+                and self._depth < self.INLINE_DEPTH \
+                and asyncio._get_running_loop() is loop:
+            self._depth += 1
+            try:
+                self.run(items)
+            finally:
+                self._depth -= 1
+            return
+        if loop.is_closed():
+            self.dropped += len(items)
+            _lost(items)
+            return
+        with self._lock:
+            if loop.is_running():
+                lane = self._lanes.get(priority)
+                if lane is None:
+                    lane = self._lane(priority)
+                lane.extend(items)
+                self._queued += len(items)
+            else:
+                self._buffer(items, priority)
+            if self._scheduled or not len(self):
+                return
+            self._scheduled = True
+        self._wakeup()
+
+    def attach(self):
+        """
+        Flush anything buffered as soon as the loop runs
+        """
+        with self._lock:
+            if self._scheduled or not len(self):
+                return
+            self._scheduled = True
+        self._wakeup()
+
+    def discard(self):
+        """
+        Drop every queued and buffered item, e.g. once the loop is closed
+        """
+        with self._lock:
+            items = [item for lane in self._lanes.values() for item in lane]
+            items += [item for _, _, item in self._pending]
+            for lane in self._lanes.values():
+                lane.clear()
+            self._pending.clear()
+            self._queued = 0
+        self.dropped += len(items)
+        _lost(items)
+
+    def _lane(self, priority: int) -> deque:
+        # caller must hold the lock
+        lane = self._lanes[priority] = deque()
+        self._order = tuple(sorted(self._lanes, reverse=True))
+        return lane
+
+    def _buffer(self, items, priority: int):
+        # caller must hold the lock
+        now = time.monotonic()
+        pending = self._pending
+        for item in items:
+            pending.append((now, priority, item))
+        self.deferred += len(items)
+        overflow = len(pending) - self.pending_maxsize
+        if self.pending_maxsize and overflow > 0:
+            self.overflowed += overflow
+            _lost([pending.popleft()[2] for _ in range(overflow)])
+
+    def _wakeup(self):
+        self.wakeups += 1
+        loop = self.loop
+        try:
+            if asyncio._get_running_loop() is loop:
+                # no need to write to the self-pipe from the loop's thread
+                loop.call_soon(self._drain)
+            else:
+                loop.call_soon_threadsafe(self._drain)
+        except Exception:
+            with self._lock:
+                self._scheduled = False
+            raise
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, deque()
+            if pending:
+                self._unbuffer(pending)
+            batch = self._take()
+            # leave the lock with `_scheduled` still set if work remains
+            more = self._scheduled = bool(self._queued)
+
+        self.run(batch)
+        if more:
+            # yield to the loop before the next slice
+            self.loop.call_soon(self._drain)
+
+    def _unbuffer(self, pending):
+        # caller must hold the lock; buffered items go ahead of the lanes
+        if self.pending_ttl is not None:
+            cutoff = time.monotonic() - self.pending_ttl
+            expired = [item for queued, _, item in pending if queued < cutoff]
+            if expired:
+                self.expired += len(expired)
+                _lost(expired)
+                pending = [entry for entry in pending if entry[0] >= cutoff]
+        for _, priority, item in reversed(pending):
+            lane = self._lanes.get(priority)
+            if lane is None:
+                lane = self._lane(priority)
+            lane.appendleft(item)
+        self._queued += len(pending)
+
+    def _take(self) -> list:
+        """
+        Pop the next slice of work, highest lane first. With a drain budget,
+        every non-empty lane first gets up to `lane_quota` items so that a
+        flood in a higher lane can't starve the lower ones.
+        """
+        # caller must hold the lock
+        lanes = self._lanes
+        budget = self.drain_budget
+        if budget is None or self._queued <= budget:
+            batch = []
+            for priority in self._order:
+                lane = lanes[priority]
+                if lane:
+                    batch.extend(lane)
+                    lane.clear()
+            self._queued = 0
+            return batch
+
+        counts = {}
+        for priority in self._order:
+            counts[priority] = min(len(lanes[priority]), self.lane_quota)
+            budget -= counts[priority]
+        for priority in self._order:
+            if budget <= 0:
+                break
+            extra = min(len(lanes[priority]) - counts[priority], budget)
+            counts[priority] += extra
+            budget -= extra
+
+        batch = []
+        for priority in self._order:
+            lane = lanes[priority]
+            for _ in range(counts[priority]):
+                batch.append(lane.popleft())
+        self._queued -= len(batch)
+        return batch
+
+    def run(self, batch):
+        """
+        Run work items right away; must be called from the loop's thread
+        """
+        loop = self.loop
+        for kind, func, args, kwargs in batch:
+            try:
+                if kind is SYNC:
+                    func(*args, **kwargs)
+                    continue
+                if kind is COROUTINE:
+                    task = loop.create_task(func(*args, **kwargs))
+                elif kind is LIMITED:
+                    try:
+                        task = asyncio.ensure_future(
+                            func.func(*args, **kwargs), loop=loop)
+                    except BaseException:
+                        func.release()
+                        raise
+                    task.add_done_callback(func.release)
+                else:
+                    task = asyncio.ensure_future(func(*args, **kwargs), loop=loop)
+                self.running += 1
+                task.add_done_callback(self._finished)
+            except Exception as e:
+                loop.call_exception_handler({
+                    "message": "Exception in event callback {!r}".format(func),
+                    "exception": e,
+                })
+        self._check_idle()
+
+    def _finished(self, task):
+        self.running -= 1
+        if not self.running and self.on_idle is not None \
+                and not self._queued and not self._pending:
+            self.on_idle()
+
+    def _check_idle(self):
+        if not self.running and self.on_idle is not None and not len(self):
+            self.on_idle()
+
+
+def _lost(items):
+    """
+    Give back the limit slots held by deliveries that will never run, and
+    tell tracked deliveries they were lost
+    """
+    for kind, func, _, _ in items:
+        if kind is LIMITED:
+            func.release()
+            func = func.func
+        if isinstance(func, Tracked):
+            func.lost()
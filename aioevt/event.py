@@ -3,28 +3,172 @@ Module which provides the Event definition
 """
 
 from dataclasses import dataclass
-from asyncio import AbstractEventLoop
+from asyncio import AbstractEventLoop, iscoroutinefunction
+from inspect import ismethod
+from weakref import WeakMethod, ref
 
-__all__ = ["Event", "Data", "Evt", "EvtData",]
+__all__ = ["Event", "Data", "Evt", "EvtData", "Subscription",]
+
+
+SYNC, COROUTINE, AWAITABLE = 0, 1, 2
+
+
+def classify(func: callable):
+    """
+    Decide once, at registration, how a callback is dispatched:
+        SYNC       called directly on the target loop
+        COROUTINE  coroutine function scheduled as a task
+        AWAITABLE  callable object whose `__call__` is a coroutine function
+
+    :return the dispatch kind, or None if `func` isn't callable
+    """
+    if not callable(func):
+        return None
+    if iscoroutinefunction(func):
+        return COROUTINE
+    if iscoroutinefunction(getattr(type(func), "__call__", None)):
+        return AWAITABLE
+    return SYNC
+
+
+def weak_key(func: callable) -> tuple:
+    """
+    Reverse index key of a weakly held callback, which must not keep the
+    callback (or the object of a bound method) alive
+    """
+    if ismethod(func):
+        return ("method", id(func.__self__), id(func.__func__))
+    return ("func", id(func))
+
+
+class WeakCallback:
+    """
+    Weak reference to the callback of a subscription. A bound method is
+    held through its object: a plain weak reference to the bound method
+    itself would die immediately.
+
+    Calling it returns the callback, or None once it was garbage collected.
+    """
+    __slots__ = ("ref", "key")
+
+    def __init__(self, func: callable):
+        try:
+            self.ref = WeakMethod(func) if ismethod(func) else ref(func)
+        except TypeError:
+            raise TypeError(
+                "{!r} can't be subscribed weakly".format(func)) from None
+        self.key = weak_key(func)
+
+    def __call__(self):
+        return self.ref()
 
 
-@dataclass
 class Evt:
     """
     A simple event definition. Three pieces of information are needed:
         1. Callback function
         2. Calling event loop (current loop chosen if none provided)
         3. Recurring status
+
+    An `Evt` returned by `Manager.register` doubles as the subscription
+    handle: it remembers its event name and manager so it can `cancel` itself.
+
+    A `weak` subscription keeps its callback in a `WeakCallback` instead of
+    in `func`, which is then None.
     """
-    func: callable
-    loop: AbstractEventLoop
-    recurring: bool
+    __slots__ = ("func", "loop", "recurring", "name", "manager", "kind",
+                 "offload", "limit", "gate", "priority", "where", "fields",
+                 "weak", "cancelled")
+
+    def __init__(self,
+                 func: callable,
+                 loop: AbstractEventLoop,
+                 recurring: bool,
+                 name: str = None,
+                 manager: object = None,
+                 offload: callable = None,
+                 limit: object = None,
+                 gate: object = None,
+                 priority: int = 0,
+                 where: callable = None,
+                 fields: tuple = None,
+                 weak: bool = False,
+    ):
+        self.func = func
+        self.weak = None
+        if weak:
+            self.weak = WeakCallback(func)
+            self.func = None
+        self.loop = loop
+        self.recurring = recurring
+        self.name = name
+        self.manager = manager
+        self.kind = classify(func)
+        self.offload = offload
+        self.limit = limit
+        self.gate = gate
+        self.priority = priority
+        self.where = where
+        self.fields = fields
+        # set once it is unregistered, so payloads it deferred are dropped
+        self.cancelled = False
+
+    def __repr__(self) -> str:
+        return "Evt(func={!r}, loop={!r}, recurring={!r}, name={!r})".format(
+            self.callback, self.loop, self.recurring, self.name,
+        )
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.callback, self.loop, self.recurring) == \
+            (other.callback, other.loop, other.recurring)
+
+    __hash__ = None
+
+    @property
+    def callback(self) -> callable:
+        """
+        The callback, or None if it was weakly held and garbage collected
+        """
+        if self.weak is None:
+            return self.func
+        return self.weak()
+
+    @property
+    def dead(self) -> bool:
+        """
+        Whether the subscription can never run again: its weakly held
+        callback was garbage collected, or its target loop is closed
+        """
+        if self.weak is not None and self.weak() is None:
+            return True
+        return self.loop is not None and self.loop.is_closed()
+
+    @property
+    def active(self) -> bool:
+        """
+        Whether the subscription is still registered with its manager
+        """
+        return self.manager is not None and \
+            self.manager._events.contains(self)
+
+    def cancel(self) -> bool:
+        """
+        Unregister this subscription
+
+        :return True if it was still registered, otherwise False
+        """
+        if self.manager is None:
+            return False
+        return self.manager.unregister(subscription=self)
 
 Event = Evt
+Subscription = Evt
 
 @dataclass
 class EvtData:
     args: tuple = ()
     kwargs: dict = None
 
-Data = EvtData
\ No newline at end of file
+Data = EvtData
@@ -0,0 +1,138 @@
+"""
+Executor-backed callbacks, so blocking handlers don't stall their loop
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from threading import Lock as LockType
+from typing import Callable, Dict, Optional, Union
+import asyncio
+
+__all__ = ["ExecutorPools", "Offload"]
+
+
+class ExecutorPools:
+    """
+    Named executors owned by a Manager.
+
+    The "thread" and "process" pools are created on first use with
+    `max_workers` workers; any other name has to be added explicitly.
+    Every pool held here is shut down by `shutdown`.
+    """
+
+    BUILTIN = {
+        "thread": ThreadPoolExecutor,
+        "process": ProcessPoolExecutor,
+    }
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._pools: Dict[str, Executor] = {}
+        self._lock = LockType()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._pools
+
+    def add(self, name: str, executor: Executor):
+        """
+        Register an executor under a name
+
+        :raises RuntimeError if the name is already taken
+        """
+        with self._lock:
+            if name in self._pools:
+                raise RuntimeError("Executor {!r} already exists".format(name))
+            self._pools[name] = executor
+
+    def get(self, name: str) -> Executor:
+        """
+        Look up a named executor, creating the built-in pools lazily
+
+        :raises RuntimeError for an unknown name
+        """
+        executor = self._pools.get(name)
+        if executor is None:
+            with self._lock:
+                executor = self._pools.get(name)
+                if executor is None:
+                    factory = self.BUILTIN.get(name)
+                    if factory is None:
+                        raise RuntimeError(
+                            "Unknown executor {!r}".format(name))
+                    executor = self._pools[name] = factory(
+                        max_workers=self.max_workers)
+        return executor
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shut down and forget every pool
+        """
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for executor in pools.values():
+            executor.shutdown(wait=wait)
+
+
+class Offload:
+    """
+    Runs a synchronous callback in an executor on behalf of its target loop.
+
+    Calling an `Offload` returns a coroutine which the loop schedules like
+    any other async callback. The callback itself runs on an executor
+    worker; its exception, if any, is reported to the target loop's
+    exception handler. `max_concurrency` caps how many calls of this
+    subscription run at once on each loop; the rest wait on the loop.
+    """
+    __slots__ = ("func", "executor", "max_concurrency", "_limits")
+
+    def __init__(self,
+                 func: Callable,
+                 executor: Executor,
+                 max_concurrency: Optional[int] = None,
+    ):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.func = func
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._limits = {}
+
+    async def __call__(self, *args, **kwargs):
+        try:
+            return await self.call(*args, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            asyncio.get_running_loop().call_exception_handler({
+                "message": "Exception in executor callback {!r}".format(self.func),
+                "exception": e,
+            })
+
+    async def call(self, *args, **kwargs):
+        """
+        Run the callback on the executor and return its result, raising
+        its exception instead of reporting it (used by requests)
+        """
+        loop = asyncio.get_running_loop()
+        call = partial(self.func, *args, **kwargs)
+        if self.max_concurrency is None:
+            return await loop.run_in_executor(self.executor, call)
+        # only ever touched from the loop's own thread
+        limit = self._limits.get(loop)
+        if limit is None:
+            limit = self._limits.setdefault(
+                loop, asyncio.Semaphore(self.max_concurrency))
+        async with limit:
+            return await loop.run_in_executor(self.executor, call)
+
+
+def resolve_executor(pools: ExecutorPools,
+                     executor: Union[str, Executor, None],
+) -> Optional[Executor]:
+    """
+    Turn the `executor=` argument of `register` into an Executor
+    """
+    if executor is None or isinstance(executor, Executor):
+        return executor
+    if isinstance(executor, str):
+        return pools.get(executor)
+    raise TypeError("executor must be an Executor or a pool name")
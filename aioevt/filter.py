@@ -0,0 +1,98 @@
+"""
+Emitter-side subscription filters
+"""
+from typing import Callable, Optional, Tuple, Union
+
+__all__ = ["FieldIndex", "matches", "split_where"]
+
+_MISSING = object()
+
+
+def split_where(where: Union[Callable, dict, None]) -> Tuple[Optional[Callable], Optional[tuple]]:
+    """
+    Validate the `where` option of a subscription
+
+    :param where: a predicate called with the emit's arguments, or a dict of
+                  keyword arguments the emit must pass with equal values
+    :return `(predicate, fields)`, where `fields` is a sorted tuple of
+            `(key, value)` pairs
+    """
+    if where is None:
+        return None, None
+    if isinstance(where, dict):
+        if not where:
+            raise ValueError("An equality filter needs at least one field")
+        fields = tuple(sorted(where.items()))
+        for key, value in fields:
+            try:
+                hash(value)
+            except TypeError:
+                raise TypeError(
+                    "Filter value of {!r} must be hashable".format(key)
+                ) from None
+        return None, fields
+    if callable(where):
+        return where, None
+    raise TypeError("where must be a callable or a dict of field values")
+
+
+def matches(fields: tuple, kwargs: dict) -> bool:
+    """
+    Whether keyword arguments satisfy an equality filter
+    """
+    for key, value in fields:
+        found = kwargs.get(key, _MISSING)
+        if found is _MISSING or found != value:
+            return False
+    return True
+
+
+class FieldIndex:
+    """
+    Index of one subscriber snapshot by the equality filters of its
+    subscribers, so an emit only touches the subscribers whose first
+    filtered field it matches (plus those without filters).
+
+    The index is built from an immutable snapshot and never changes; the
+    table replaces it whenever the snapshot it was built from is replaced.
+    """
+    __slots__ = ("snapshot", "_plain", "_by_field")
+
+    def __init__(self, snapshot: tuple):
+        self.snapshot = snapshot
+        self._plain = []
+        # field -> value -> positions in the snapshot
+        self._by_field = {}
+        for position, evt in enumerate(snapshot):
+            if evt.fields is None:
+                self._plain.append(position)
+            else:
+                key, value = evt.fields[0]
+                self._by_field.setdefault(key, {}) \
+                    .setdefault(value, []).append(position)
+
+    def select(self, kwargs: dict) -> list:
+        """
+        Subscribers whose equality filters match `kwargs`, in snapshot order
+        """
+        if not self._by_field:
+            return self.snapshot
+        positions = self._plain
+        for key, values in self._by_field.items():
+            found = kwargs.get(key, _MISSING)
+            if found is _MISSING:
+                continue
+            try:
+                matched = values.get(found)
+            except TypeError:
+                # unhashable, yet possibly equal (e.g. a set to a frozenset)
+                matched = [p for ps in values.values() for p in ps]
+            if matched:
+                positions = positions + matched
+        snapshot = self.snapshot
+        if positions is self._plain:
+            return [snapshot[p] for p in positions]
+        return [
+            snapshot[p] for p in sorted(positions)
+            if snapshot[p].fields is None or matches(snapshot[p].fields, kwargs)
+        ]
@@ -0,0 +1,159 @@
+"""
+Concurrency limits for async callbacks
+"""
+from collections import deque
+from threading import Lock as LockType
+from typing import Optional, Tuple
+
+__all__ = ["InFlightLimit", "InFlightLimitExceeded", "OverflowPolicy", "Ticket", "Tracked"]
+
+
+# work item kind of a delivery that holds `InFlightLimit` slots; it follows
+# the callback kinds defined in `event`
+LIMITED = 3
+
+
+class Tracked:
+    """
+    Base of work item functions that must be told when their delivery is
+    lost (closed loop, buffer overflow or expiry, `discard`) instead of run
+    """
+    __slots__ = ()
+
+    def lost(self):
+        raise NotImplementedError
+
+
+class OverflowPolicy:
+    """
+    What happens to an async delivery when its in-flight limit is reached
+    """
+    QUEUE = "queue"     # hold the delivery until a running handler finishes
+    DROP = "drop"       # discard the delivery
+    REJECT = "reject"   # discard it and raise `InFlightLimitExceeded` from emit
+
+    ALL = (QUEUE, DROP, REJECT)
+
+
+class InFlightLimitExceeded(RuntimeError):
+    """
+    Raised by `emit` when a delivery was refused by a REJECT limit
+    """
+
+
+class InFlightLimit:
+    """
+    Counts the async handlers holding a slot, for one subscription or one
+    target loop. Deliveries refused under the QUEUE policy wait here, in
+    order, and inherit the slot of the next handler to finish.
+    """
+    __slots__ = ("limit", "policy", "count", "dropped", "rejected",
+                 "_waiting", "_lock", "__weakref__")
+
+    def __init__(self, limit: int, policy: str = OverflowPolicy.QUEUE):
+        if limit < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if policy not in OverflowPolicy.ALL:
+            raise ValueError("Unknown overflow policy {!r}".format(policy))
+        self.limit = limit
+        self.policy = policy
+        self.count = 0
+        self.dropped = 0
+        self.rejected = 0
+        self._waiting = deque()
+        self._lock = LockType()
+
+    def __len__(self) -> int:
+        """
+        Number of deliveries waiting for a slot
+        """
+        return len(self._waiting)
+
+    def acquire(self, ticket: "Ticket") -> Optional[str]:
+        """
+        Take a slot for `ticket`
+
+        :return None if granted, otherwise the policy that was applied
+        """
+        with self._lock:
+            if self.count < self.limit:
+                self.count += 1
+                return None
+            if self.policy == OverflowPolicy.QUEUE:
+                self._waiting.append(ticket)
+            elif self.policy == OverflowPolicy.DROP:
+                self.dropped += 1
+            else:
+                self.rejected += 1
+            return self.policy
+
+    def release(self) -> Optional["Ticket"]:
+        """
+        Give a slot back
+
+        :return the waiting ticket the slot was handed to, if any
+        """
+        with self._lock:
+            if self._waiting:
+                return self._waiting.popleft()
+            self.count -= 1
+            return None
+
+
+class Ticket:
+    """
+    An async delivery that must hold a slot in each of its `limits` before
+    it is handed to its target loop. The slots are given back when the
+    handler finishes, or when the delivery is lost.
+    """
+    __slots__ = ("func", "args", "kwargs", "limits", "held", "dispatcher",
+                 "priority")
+
+    def __init__(self,
+                 func,
+                 args: tuple,
+                 kwargs: dict,
+                 limits: Tuple[InFlightLimit, ...],
+                 dispatcher,
+                 priority: int = 0,
+    ):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.limits = limits
+        self.held = 0
+        self.dispatcher = dispatcher
+        self.priority = priority
+
+    @property
+    def item(self) -> tuple:
+        return (LIMITED, self, self.args, self.kwargs)
+
+    def admit(self) -> Optional[str]:
+        """
+        Take a slot in every remaining limit. A refused ticket gives back
+        what it holds, unless it was queued.
+
+        :return None once every slot is held, otherwise the policy applied
+        """
+        limits = self.limits
+        while self.held < len(limits):
+            outcome = limits[self.held].acquire(self)
+            if outcome is not None:
+                if outcome != OverflowPolicy.QUEUE:
+                    self.release()
+                return outcome
+            self.held += 1
+        return None
+
+    def release(self, *_):
+        """
+        Give back every held slot and admit the deliveries they pass to
+        """
+        held, self.held = self.held, 0
+        for limit in self.limits[:held]:
+            waiting = limit.release()
+            if waiting is not None:
+                waiting.held += 1
+                if waiting.admit() is None:
+                    waiting.dispatcher.push(waiting.item, waiting.priority)
@@ -0,0 +1,139 @@
+"""
+Delivery modes which collapse bursts of emits before they reach a loop
+"""
+from threading import Lock as LockType
+from typing import Callable
+import time
+
+from .event import SYNC
+from .flow import Tracked
+
+__all__ = ["DeliveryGate"]
+
+
+class _GateState:
+    __slots__ = ("payload", "pending", "offered", "fired")
+
+    def __init__(self):
+        self.payload = None
+        self.pending = False
+        self.offered = 0.0
+        self.fired = float("-inf")
+
+
+class DeliveryGate:
+    """
+    Sits between the emitters of one subscription and its target loops.
+
+    Every emit replaces the stored payload, and only the first emit of a
+    burst sends anything to the loop: a single work item that arms the
+    gate there. When the gate fires, the latest payload is delivered, so
+    superseded payloads never leave the emitting thread.
+
+        COALESCE  deliver on the loop's next iteration
+        DEBOUNCE  deliver once no emit has happened for `interval` seconds
+        THROTTLE  deliver at most once every `interval` seconds
+
+    An armed gate counts as a running handler of its dispatcher, so
+    `Manager.drain` waits for it. If the arming work item is lost (the loop
+    closed, or the item overflowed or expired in its pending buffer), the
+    gate is reset so the next emit arms it again.
+    """
+    COALESCE = "coalesce"
+    DEBOUNCE = "debounce"
+    THROTTLE = "throttle"
+
+    __slots__ = ("mode", "interval", "deliver", "_states", "_lock")
+
+    def __init__(self, mode: str, interval: float, deliver: Callable):
+        """
+        :param mode: COALESCE, DEBOUNCE or THROTTLE
+        :param interval: quiet period (DEBOUNCE) or spacing (THROTTLE) in seconds
+        :param deliver: called as `deliver(dispatcher, args, kwargs)` on the
+                        loop's thread when the gate fires
+        """
+        if mode != self.COALESCE and not interval > 0:
+            raise ValueError("{} needs a positive interval".format(mode))
+        self.mode = mode
+        self.interval = interval
+        self.deliver = deliver
+        self._states = {}
+        self._lock = LockType()
+
+    def offer(self, dispatcher, args: tuple, kwargs: dict):
+        """
+        Store the payload of an emit
+
+        :return the work item arming the gate on the dispatcher's loop, or
+                None if one is already pending
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._states.get(dispatcher)
+            if state is None:
+                state = self._states[dispatcher] = _GateState()
+            state.payload = (args, kwargs)
+            state.offered = now
+            if state.pending:
+                return None
+            state.pending = True
+        return (SYNC, _Arm(self, dispatcher), (), {})
+
+    def _disarm(self, dispatcher):
+        with self._lock:
+            state = self._states.get(dispatcher)
+            if state is not None:
+                state.payload = None
+                state.pending = False
+
+    def _arm(self, dispatcher):
+        dispatcher.running += 1
+        if self.mode == self.COALESCE:
+            delay = 0
+        elif self.mode == self.DEBOUNCE:
+            delay = self.interval
+        else:
+            delay = self._states[dispatcher].fired + self.interval - time.monotonic()
+        if delay > 0:
+            dispatcher.loop.call_later(delay, self._fire, dispatcher)
+        else:
+            self._fire(dispatcher)
+
+    def _fire(self, dispatcher):
+        now = time.monotonic()
+        with self._lock:
+            state = self._states[dispatcher]
+            if self.mode == self.DEBOUNCE:
+                quiet = now - state.offered
+                if quiet < self.interval:
+                    dispatcher.loop.call_later(
+                        self.interval - quiet, self._fire, dispatcher)
+                    return
+            args, kwargs = state.payload
+            state.payload = None
+            state.pending = False
+            state.fired = now
+        dispatcher.running -= 1
+        try:
+            self.deliver(dispatcher, args, kwargs)
+        finally:
+            # the delivery may have been skipped or refused; drain must
+            # still see the gate go idle
+            dispatcher._check_idle()
+
+
+class _Arm(Tracked):
+    """
+    The work item function arming a gate on one dispatcher's loop
+    """
+    __slots__ = ("gate", "dispatcher")
+
+    def __init__(self, gate: DeliveryGate, dispatcher):
+        self.gate = gate
+        self.dispatcher = dispatcher
+
+    def __call__(self):
+        self.gate._arm(self.dispatcher)
+
+    def lost(self):
+        self.gate._disarm(self.dispatcher)
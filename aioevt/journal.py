@@ -0,0 +1,404 @@
+"""
+Durable, append-only journal of emitted events
+"""
+from threading import Condition, Lock as LockType, Thread
+from typing import Iterable, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import zlib
+
+from .event import EvtData
+
+__all__ = ["Journal"]
+
+logger = logging.getLogger(__name__)
+
+_RECORD = struct.Struct("<II")      # payload length, crc32 of the payload
+_SUFFIX = ".seg"
+_CHECKPOINTS = "checkpoints.json"
+
+
+class Journal:
+    """
+    Appends emitted events to a segmented log in a directory, so they can
+    be replayed after a restart.
+
+    Records are written by a background thread which groups everything
+    appended within `fsync_interval` into one write and one fsync, so an
+    emit only pays for serializing its event. With `fsync_interval=0`,
+    `append` writes and syncs before returning.
+
+    Journaling never breaks an emit: an event that can't be pickled is
+    skipped, and after a write fails every later append is dropped. Both
+    are logged and counted in `failed`; `flush` raises the write error.
+
+    Every record has a byte offset in the journal; `end` is the offset the
+    next record will get. Segments are named after the offset of their
+    first record and rolled once they reach `segment_size`. A torn record
+    left at the tail by a crash is cut off when the journal is reopened.
+
+    `replay` feeds records back through `Manager.emit_many`, batch by batch,
+    reading segments through mmap. A replay run for a `consumer` resumes at
+    that consumer's checkpoint and advances it once each batch has been
+    handled, so a restart only redelivers the batch in progress.
+
+    :param directory: where segments and checkpoints are stored
+    :param names: only journal these event names (None = everything)
+    :param segment_size: bytes after which a new segment is started
+    :param fsync_interval: seconds between group commits
+    :param fsync: whether a group commit syncs to disk, or only writes and
+                  leaves the rest to the OS
+    """
+
+    def __init__(self,
+                 directory: str,
+                 names: Optional[Iterable[str]] = None,
+                 segment_size: int = 64 * 1024 * 1024,
+                 fsync_interval: float = 0.05,
+                 fsync: bool = True,
+    ):
+        if segment_size < 1:
+            raise ValueError("segment_size must be positive")
+        if fsync_interval < 0:
+            raise ValueError("fsync_interval can't be negative")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.names = None if names is None else frozenset(names)
+        self.segment_size = segment_size
+        self.fsync_interval = fsync_interval
+        self.fsync = fsync
+        self.appended = 0
+        self.commits = 0
+        self.failed = 0
+        self._pending = []
+        # guards `_pending`; `_io` serializes commits, so appends never
+        # wait for the disk
+        self._cond = Condition()
+        self._io = LockType()
+        self._checkpoint_lock = LockType()
+        self._closed = False
+        self._error = None
+        self._checkpoints = self._load_checkpoints()
+        # offset after the last record appended / written to the file
+        self._end = self._written = self._recover()
+        self._file = open(self._segment_path(self._base), "ab")
+        self._flusher = None
+        if fsync_interval > 0:
+            self._flusher = Thread(
+                target=self._run, name="aioevt-journal", daemon=True,
+            )
+            self._flusher.start()
+
+    @property
+    def end(self) -> int:
+        """
+        Offset the next appended record will get
+        """
+        return self._end
+
+    def segments(self) -> List[int]:
+        """
+        Base offsets of the segments on disk, in order
+        """
+        return sorted(
+            int(entry[:-len(_SUFFIX)]) for entry in os.listdir(self.directory)
+            if entry.endswith(_SUFFIX)
+        )
+
+    def append(self, events: List[Tuple[str, Optional[EvtData]]]):
+        """
+        Journal a batch of emitted events; called by the Manager on emit
+        """
+        if self.names is not None:
+            events = [event for event in events if event[0] in self.names]
+            if not events:
+                return
+        records = []
+        for name, data in events:
+            try:
+                payload = pickle.dumps(
+                    (name, data.args, data.kwargs) if data is not None else (name, (), None),
+                    pickle.HIGHEST_PROTOCOL,
+                )
+            except Exception:
+                logger.exception("Could not journal an event %r", name)
+                with self._cond:
+                    self.failed += 1
+                continue
+            records.append(
+                _RECORD.pack(len(payload), zlib.crc32(payload)) + payload)
+        if not records:
+            return
+        with self._cond:
+            if self._closed or self._error is not None:
+                # closed, or broken by a write error which was logged then
+                self.failed += len(records)
+                return
+            idle = not self._pending
+            for record in records:
+                self._pending.append(record)
+                self._end += len(record)
+            self.appended += len(records)
+            if self._flusher is not None:
+                if idle:
+                    # only wake the flusher at the start of a group
+                    self._cond.notify()
+                return
+        try:
+            self._commit()
+        except OSError:
+            # logged and counted by `_commit`
+            pass
+
+    def flush(self, sync: bool = False) -> int:
+        """
+        Write every appended record to its segment now
+
+        :param sync: also fsync, regardless of the `fsync` setting
+        :return the offset up to which records are written
+        """
+        if self._error is not None:
+            raise self._error
+        self._commit(sync)
+        return self._written
+
+    def close(self):
+        """
+        Commit what is pending and close the current segment
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+        try:
+            self._commit()
+        finally:
+            with self._io:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def checkpoint(self, consumer: str) -> int:
+        """
+        Offset from which `consumer` resumes (0 if it never committed)
+        """
+        return self._checkpoints.get(consumer, 0)
+
+    def commit(self, consumer: str, offset: int):
+        """
+        Record that `consumer` has handled every event before `offset`
+        """
+        with self._checkpoint_lock:
+            self._checkpoints[consumer] = offset
+            path = os.path.join(self.directory, _CHECKPOINTS)
+            with open(path + ".tmp", "w") as checkpoints:
+                json.dump(self._checkpoints, checkpoints)
+                checkpoints.flush()
+                os.fsync(checkpoints.fileno())
+            os.replace(path + ".tmp", path)
+
+    def compact(self, before: Optional[int] = None) -> int:
+        """
+        Delete the segments holding only events before an offset
+
+        :param before: (Default: the lowest consumer checkpoint)
+        :return the number of segments deleted
+        """
+        if before is None:
+            if not self._checkpoints:
+                return 0
+            before = min(self._checkpoints.values())
+        bases = self.segments()
+        removed = 0
+        # a segment ends where the next one starts; the current one is kept
+        for base, following in zip(bases, bases[1:]):
+            if following > before:
+                break
+            os.remove(self._segment_path(base))
+            removed += 1
+        return removed
+
+    def read(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, str, EvtData]]:
+        """
+        Decode the records between two offsets
+
+        :return an iterator of `(offset after the record, name, EvtData)`
+        """
+        if stop is None:
+            stop = self.flush()
+        bases = self.segments()
+        for i, base in enumerate(bases):
+            following = bases[i + 1] if i + 1 < len(bases) else stop
+            if following <= start or base >= stop:
+                continue
+            for offset, name, args, kwargs in _scan(
+                    self._segment_path(base), base, max(start, base),
+                    min(following, stop)):
+                yield offset, name, EvtData(args=args, kwargs=kwargs)
+
+    async def replay(self,
+                     manager,
+                     consumer: Optional[str] = None,
+                     start: Optional[int] = None,
+                     batch_size: int = 1024,
+    ) -> int:
+        """
+        Emit journaled events again through `manager.emit_many`, without
+        journaling (or publishing) them a second time.
+
+        With a `consumer`, replay starts at its checkpoint, and each batch is
+        drained (see `Manager.drain`) before the checkpoint moves past it.
+
+        :param manager: the Manager whose subscribers receive the events
+        :param consumer: checkpoint name
+        :param start: offset to start at (Default: the consumer's checkpoint)
+        :param batch_size: events per `emit_many` call
+        :return the offset replay stopped at
+        """
+        if start is None:
+            start = 0 if consumer is None else self.checkpoint(consumer)
+        offset = start
+        batch = []
+        for offset, name, data in self.read(start):
+            batch.append((name, data))
+            if len(batch) >= batch_size:
+                await self._deliver(manager, batch, consumer, offset)
+                batch = []
+        if batch:
+            await self._deliver(manager, batch, consumer, offset)
+        return offset
+
+    async def _deliver(self, manager, batch, consumer, offset):
+        manager.emit_many(batch, publish=False)
+        if consumer is None:
+            await asyncio.sleep(0)
+            return
+        await manager.drain()
+        self.commit(consumer, offset)
+
+    def _run(self):
+        with self._cond:
+            while not self._closed:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                # let the group fill up before committing it
+                self._cond.wait(self.fsync_interval)
+                self._cond.release()
+                try:
+                    self._commit()
+                except OSError:
+                    return
+                finally:
+                    self._cond.acquire()
+
+    def _commit(self, sync: bool = False):
+        with self._io:
+            with self._cond:
+                pending, self._pending = self._pending, []
+            try:
+                file = self._file
+                for record in pending:
+                    if self._size >= self.segment_size:
+                        self._roll()
+                        file = self._file
+                    file.write(record)
+                    self._size += len(record)
+                    self._written += len(record)
+                if pending or sync:
+                    file.flush()
+                    if self.fsync or sync:
+                        os.fsync(file.fileno())
+                    self.commits += 1
+            except OSError as e:
+                with self._cond:
+                    self._error = e
+                    lost = len(pending) + len(self._pending)
+                    self.failed += lost
+                    self._pending = []
+                logger.error(
+                    "Journal write failed, dropping %d events and every "
+                    "later one", lost, exc_info=True,
+                )
+                raise
+
+    def _roll(self):
+        # caller must hold `_io`
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._base = self._written
+        self._size = 0
+        self._file = open(self._segment_path(self._base), "ab")
+
+    def _recover(self) -> int:
+        """
+        Find the end of the last segment, cutting off a torn tail record
+        """
+        bases = self.segments()
+        self._base = bases[-1] if bases else 0
+        path = self._segment_path(self._base)
+        size = os.path.getsize(path) if bases else 0
+        valid = self._base
+        for valid, _, _, _ in _scan(path, self._base, self._base, self._base + size):
+            pass
+        self._size = valid - self._base
+        if self._size != size:
+            with open(path, "r+b") as segment:
+                segment.truncate(self._size)
+        return valid
+
+    def _segment_path(self, base: int) -> str:
+        return os.path.join(self.directory, "{:020d}{}".format(base, _SUFFIX))
+
+    def _load_checkpoints(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, _CHECKPOINTS)) as checkpoints:
+                return json.load(checkpoints)
+        except FileNotFoundError:
+            return {}
+
+
+def _scan(path: str, base: int, start: int, stop: int):
+    """
+    Decode the records of one segment between two journal offsets,
+    stopping at the first torn or corrupt record
+    """
+    try:
+        segment = open(path, "rb")
+    except FileNotFoundError:
+        # compacted away
+        return
+    with segment:
+        length = min(os.fstat(segment.fileno()).st_size, stop - base)
+        if length <= start - base:
+            return
+        with mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            position = start - base
+            unpack = _RECORD.unpack_from
+            loads = pickle.loads
+            while position + _RECORD.size <= length:
+                size, crc = unpack(view, position)
+                begin = position + _RECORD.size
+                end = begin + size
+                if end > length:
+                    return
+                payload = view[begin:end]
+                if zlib.crc32(payload) != crc:
+                    return
+                position = end
+                name, args, kwargs = loads(payload)
+                yield base + position, name, args, kwargs
@@ -1,18 +1,37 @@
 """
 Simple asyncio task manager
 """
-from collections import defaultdict
 from functools import partial, wraps
-from threading import Condition, Lock as LockType
-from typing import Callable, Union, Optional
+from threading import Condition, Lock as LockType, RLock
+from concurrent.futures import Executor, TimeoutError as FutureTimeoutError
+from typing import AsyncIterable, Callable, Dict, Iterable, Optional, Tuple, Union
 import asyncio
+import logging
 import sys
+import weakref
 
-from .event import Evt, EvtData
+from .channel import Channel, ChannelProxy
+from .dispatch import LoopDispatcher
+from .event import COROUTINE, SYNC, Evt, EvtData
+from .executor import ExecutorPools, Offload, resolve_executor
+from .filter import matches, split_where
+from .flow import InFlightLimit, InFlightLimitExceeded, OverflowPolicy, Ticket
+from .gate import DeliveryGate
+from .journal import Journal
+from .registry import (
+    LastValueCache, SubscriberTable, Waiter, WaiterTable, fire_waiters,
+)
+from .request import Gather, Reply
+from .stream import EventStream, StreamPolicy
+from .timer import TimerHandle, TimerWheel
+from .metrics import Metrics, loop_label
+from .transport import Transport
 
 
 __all__ = ["Manager"]
 
+logger = logging.getLogger(__name__)
+
 
 class Manager:
     """
@@ -23,18 +42,113 @@ class Manager:
                  loop: asyncio.AbstractEventLoop = None,
                  async_retry_delay: float = 0.1,
                  async_retry_count: int = 5,
+                 pending_maxsize: int = 10000,
+                 pending_ttl: Optional[float] = None,
+                 timer_resolution: float = 0.01,
+                 metrics: Union[bool, Metrics] = False,
+                 executor_workers: Optional[int] = None,
+                 max_in_flight: Optional[int] = None,
+                 overflow: str = OverflowPolicy.QUEUE,
+                 drain_budget: Optional[int] = 1024,
+                 lane_quota: int = 16,
+                 inline: bool = False,
+                 registry_shards: int = 16,
+                 latched: Iterable[str] = (),
+                 sticky_maxsize: int = 1024,
+                 channels_maxsize: int = 1024,
     ):
         """
         Initialize the Manager class
+
+        :param loop: the default (control) event loop
+        :param async_retry_delay: deprecated, ignored
+        :param async_retry_count: deprecated, ignored
+        :param pending_maxsize: how many deliveries to buffer per target loop
+                                while it is not running (0 = unbounded)
+        :param pending_ttl: discard buffered deliveries older than this many
+                            seconds when the loop starts (None = never)
+        :param timer_resolution: tick length (in seconds) of the timer wheel
+                                 used by `emit_after`
+        :param metrics: collect instrumentation; pass True or a `Metrics`
+                        instance (e.g. one with exporters attached)
+        :param executor_workers: size of the built-in "thread" and "process"
+                                 pools (None = the executor's default)
+        :param max_in_flight: how many async handlers may be scheduled or
+                              running at once on each target loop
+                              (None = unlimited)
+        :param overflow: the `OverflowPolicy` applied when a loop is at
+                         `max_in_flight`
+        :param drain_budget: most deliveries a loop runs before yielding, so
+                             higher priority deliveries can overtake a
+                             backlog (None = drain everything at once)
+        :param lane_quota: deliveries each non-empty priority lane is
+                           guaranteed per drain, so low lanes never starve
+        :param inline: when `emit` runs on the target loop and nothing is
+                       queued for it, run the callbacks immediately instead
+                       of on the loop's next iteration
+        :param registry_shards: how many locks subscription changes are
+                                striped over, by event name
+        :param latched: event names whose last emit is kept (see `latch`)
+        :param sticky_maxsize: how many latched names keep their last value
+                               before the least recently used one is
+                               evicted (0 = unbounded)
+        :param channels_maxsize: how many `channel` handles are cached; the
+                                 cache starts over once it is full, so
+                                 dynamic names don't grow it forever
+                                 (0 = unbounded)
         """
         self._loop = loop
-        self._events = defaultdict(list)
+        self._events = SubscriberTable(shards=registry_shards)
+        # copied on write, so emits read it without locking
+        self._latched = frozenset(latched)
+        self._latched_lock = LockType()
+        self._latest = LastValueCache(sticky_maxsize)
+        # held by a latched emit from its cache update until its deliveries
+        # are handed to the loops, and by a new subscription from its add
+        # until the cached value is handed over, so the two reach a loop in
+        # order; striped by name, reentrant for handlers run inline
+        self._latch_locks = tuple(RLock() for _ in range(registry_shards))
+        self._waiters = WaiterTable()
+        self._streams = {}
+        self._streams_lock = LockType()
         self._async_retry_delay = async_retry_delay
         self._async_retry_count = async_retry_count
-        self._events_lock = LockType()
+        self._pending_maxsize = pending_maxsize
+        self._pending_ttl = pending_ttl
+        self._timer_resolution = timer_resolution
+        self._dispatchers = {}
+        self._dispatchers_lock = LockType()
+        self._wheels = {}
+        self._transport = None
+        self._journal = None
+        if metrics is True:
+            metrics = Metrics()
+        self._metrics = metrics or None
+        self._executors = ExecutorPools(executor_workers)
+        if max_in_flight is not None:
+            # validate up front rather than on the first emit
+            InFlightLimit(max_in_flight, overflow)
+        self._max_in_flight = max_in_flight
+        self._overflow = overflow
+        self._limits = weakref.WeakSet()
+        self._drainers = []
+        self._drain_budget = drain_budget
+        self._lane_quota = lane_quota
+        self._inline = inline
+        self._channels = {}
+        self._channels_maxsize = channels_maxsize
+        self._proxy = ChannelProxy(self)
+        self._purged = 0
+        self._purge_scheduled = False
+        # closed loops already purged, so they don't trigger it again
+        self._purged_loops = weakref.WeakSet()
     
     @property
     def async_retry_delay(self) -> float:
+        """
+        Deprecated: deliveries to a loop that isn't running yet are buffered
+        and flushed when it starts, so emits are never retried
+        """
         return self._async_retry_delay
     
     @async_retry_delay.setter
@@ -43,16 +157,217 @@ class Manager:
     
     @property
     def async_retry_count(self) -> int:
+        """
+        Deprecated: see `async_retry_delay`
+        """
         return self._async_retry_count
     
     @async_retry_count.setter
     def async_retry_count(self, new_count: int):
         self._async_retry_count = new_count
 
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """
+        The `Metrics` collector, or None when instrumentation is disabled
+        """
+        return self._metrics
+
+    def metrics_snapshot(self) -> Optional[dict]:
+        """
+        Snapshot of every metric, plus the delivery queue state per loop
+
+        :return None when instrumentation is disabled
+        """
+        if self._metrics is None:
+            return None
+        snapshot = self._metrics.snapshot()
+        snapshot["loops"] = {
+            loop_label(loop): {
+                "queue_depth": len(dispatcher),
+                "wakeups": dispatcher.wakeups,
+                "deferred": dispatcher.deferred,
+                "overflowed": dispatcher.overflowed,
+                "expired": dispatcher.expired,
+                "dropped": dispatcher.dropped,
+            }
+            for loop, dispatcher in list(self._dispatchers.items())
+        }
+        snapshot["purged"] = self._purged
+        return snapshot
+
+    def export_metrics(self) -> Optional[dict]:
+        """
+        Take a snapshot and hand it to every exporter of the collector
+        """
+        snapshot = self.metrics_snapshot()
+        if snapshot is not None:
+            self._metrics.export(snapshot)
+        return snapshot
+
+    @property
+    def pending_overflow(self) -> int:
+        """
+        Number of buffered deliveries dropped because a target loop's
+        pending buffer was full
+        """
+        return sum(d.overflowed for d in list(self._dispatchers.values()))
+
+    @property
+    def purged(self) -> int:
+        """
+        Number of subscriptions (and streams) removed by `purge` because
+        their weakly held callback was garbage collected or their target
+        loop closed
+        """
+        return self._purged
+
+    def purge(self) -> int:
+        """
+        Remove every dead subscription (see `Evt.dead`) in bulk, close the
+        streams of closed loops, and forget the delivery queues and timer
+        wheels of closed loops.
+
+        This runs automatically, soon after an emit runs into a dead
+        subscription or a closed loop: on the emitting thread's loop if it
+        has one, otherwise right away.
+
+        :return the number of subscriptions removed
+        """
+        self._purge_scheduled = False
+        removed = self._events.remove_if(_is_dead)
+        with self._streams_lock:
+            orphaned = [
+                stream for streams in self._streams.values()
+                for stream in streams if stream.loop.is_closed()
+            ]
+        for stream in orphaned:
+            stream.close()
+        with self._dispatchers_lock:
+            closed = [loop for loop in self._dispatchers if loop.is_closed()]
+            dispatchers = [self._dispatchers.pop(loop) for loop in closed]
+            for loop in [loop for loop in self._wheels if loop.is_closed()]:
+                del self._wheels[loop]
+            self._purged_loops.update(closed)
+        for dispatcher in dispatchers:
+            dispatcher.discard()
+        self._purged += len(removed) + len(orphaned)
+        return len(removed) + len(orphaned)
+
+    def _schedule_purge(self):
+        if self._purge_scheduled:
+            return
+        self._purge_scheduled = True
+        loop = asyncio._get_running_loop()
+        if loop is not None:
+            # after the current callback rather than inside the emit
+            loop.call_soon(self.purge)
+        else:
+            self.purge()
+
+    def in_flight(self) -> int:
+        """
+        Number of deliveries that are queued for a loop, waiting for an
+        in-flight slot, or running as a handler task
+        """
+        dispatchers = list(self._dispatchers.values())
+        return sum(d.running + len(d) for d in dispatchers) + \
+            sum(len(limit) for limit in list(self._limits))
+
+    def _busy(self) -> bool:
+        for dispatcher in list(self._dispatchers.values()):
+            if dispatcher.running:
+                return True
+            if len(dispatcher) and dispatcher.loop.is_running():
+                return True
+        return any(len(limit) for limit in list(self._limits))
+
+    async def drain(self, timeout: float = None):
+        """
+        Wait until every scheduled handler has finished: delivery queues of
+        running loops are empty, no delivery waits for an in-flight slot and
+        no handler task is running. Deliveries buffered for loops that are
+        not running are not waited for.
+
+        NOTE: a handler awaiting `drain` counts itself and never sees it finish
+
+        :param timeout: the maximum time (in seconds) to wait
+        :raises asyncio.TimeoutError when necessary
+        """
+        loop = asyncio.get_running_loop()
+
+        async def drained():
+            while True:
+                future = loop.create_future()
+                entry = (loop, future)
+                self._drainers.append(entry)
+                try:
+                    if not self._busy():
+                        return
+                    await future
+                finally:
+                    try:
+                        self._drainers.remove(entry)
+                    except ValueError:
+                        pass
+
+        await asyncio.wait_for(drained(), timeout=timeout)
+
+    def _wake_drainers(self):
+        """
+        Called by a dispatcher when its loop goes idle
+        """
+        if not self._drainers:
+            return
+        for loop, future in list(self._drainers):
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                # the waiting loop is closed
+                pass
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop = None):
+        """
+        Declare a target loop ready, flushing anything emitted to it before
+        it started. Safe to call from any thread, before or after the loop
+        starts running; buffered deliveries run on its first iteration.
+
+        :param loop: the target loop (Default: the running loop)
+        """
+        self._dispatcher(loop or asyncio.get_running_loop()).attach()
+
+    def add_executor(self, name: str, executor: Executor):
+        """
+        Make an executor available to `register(executor=name)`. The
+        manager takes ownership and shuts it down in `shutdown_executors`.
+
+        :param name: pool name
+        :param executor: a `concurrent.futures.Executor`
+        """
+        self._executors.add(name, executor)
+
+    def shutdown_executors(self, wait: bool = True):
+        """
+        Shut down every named pool owned by this manager
+
+        :param wait: block until running callbacks have finished
+        """
+        self._executors.shutdown(wait=wait)
+
     def on(self,
            name: str,
            loop: asyncio.AbstractEventLoop = None,
            recurring: bool = True,
+           executor: Union[str, Executor, None] = None,
+           max_concurrency: Optional[int] = None,
+           max_in_flight: Optional[int] = None,
+           overflow: str = OverflowPolicy.QUEUE,
+           coalesce: bool = False,
+           debounce: Optional[float] = None,
+           throttle: Optional[float] = None,
+           priority: int = 0,
+           where: Union[Callable, dict, None] = None,
+           weak: bool = False,
     ):
         """
         A function to create a decorator for registering events
@@ -60,9 +375,27 @@ class Manager:
         :param name: event name as a string
         :param loop: the loop from which you want the callback to be executed
         :param recurring: whether or not the event should be re-registered
+        :param executor: run the callback off-loop (see `register`)
+        :param max_concurrency: cap on concurrent executor calls per loop
+        :param max_in_flight: cap on scheduled or running async calls
+        :param overflow: the `OverflowPolicy` applied at `max_in_flight`
+        :param coalesce: only deliver the latest of the pending payloads
+        :param debounce: deliver the latest payload after this many quiet seconds
+        :param throttle: deliver the latest payload at most this many times a second
+        :param priority: delivery lane on the target loop (higher runs first)
+        :param where: only deliver emits this predicate or field filter accepts
+        :param weak: don't keep the callback alive (see `register`)
+
+        NOTE: the decorated function is returned unchanged so it can still be
+        called directly; use `register` to get a subscription handle back.
         """
         def wrapper(func):
-            self.register(name, func, loop, recurring)
+            self.register(name, func, loop, recurring,
+                          executor=executor, max_concurrency=max_concurrency,
+                          max_in_flight=max_in_flight, overflow=overflow,
+                          coalesce=coalesce, debounce=debounce,
+                          throttle=throttle, priority=priority, where=where,
+                          weak=weak)
             return func
         return wrapper
 
@@ -71,32 +404,203 @@ class Manager:
                  func: Callable,
                  loop: asyncio.AbstractEventLoop = None,
                  recurring: bool = True,
-    ):
+                 executor: Union[str, Executor, None] = None,
+                 max_concurrency: Optional[int] = None,
+                 max_in_flight: Optional[int] = None,
+                 overflow: str = OverflowPolicy.QUEUE,
+                 coalesce: bool = False,
+                 debounce: Optional[float] = None,
+                 throttle: Optional[float] = None,
+                 priority: int = 0,
+                 where: Union[Callable, dict, None] = None,
+                 weak: bool = False,
+    ) -> Evt:
         """
         Register a global event to be triggered from a
         provided event loop when a named event is emitted.
 
+        With `executor`, a synchronous callback runs on an executor worker
+        instead of on the loop thread, so a blocking handler doesn't hold up
+        the rest of the loop. The call is still issued from (and its failure
+        reported to) the target loop.
+
+        `coalesce`, `debounce` and `throttle` (at most one of them) collapse
+        bursts of emits: the subscription keeps only the latest payload
+        while a delivery is pending, so superseded payloads are never sent
+        to the target loop. Requests bypass them.
+
+        A subscription to a latched name (see `latch`) with a last value
+        receives it as soon as it registers; a one-shot subscription is
+        done right away.
+
+        `where` filters emits on the emitting thread, before anything is
+        scheduled on the target loop. A predicate is called with the emit's
+        positional and keyword arguments; a dict such as `{"tenant": "acme"}`
+        requires equal keyword arguments and is indexed by value, so an emit
+        only reaches the subscribers whose fields it matches.
+
+        A `weak` subscription doesn't keep its callback alive: once it is
+        garbage collected (for a bound method, once its object is), the
+        subscription is skipped and purged (see `purge`), like those of a
+        closed target loop.
+
         :param name: event name.
         :param func: callable function or coroutine invoked on event emission
         :param loop: the loop from which you want the callback to be executed
         :param recurring: whether the event should be re-registered after run
+        :param executor: a `concurrent.futures.Executor`, or the name of a
+                         managed pool ("thread", "process" or one added with
+                         `add_executor`)
+        :param max_concurrency: how many executor calls of this subscription
+                                may run at once per loop (None = unlimited)
+        :param max_in_flight: how many async calls of this subscription may
+                              be scheduled or running at once, across loops
+                              (None = unlimited)
+        :param overflow: the `OverflowPolicy` applied at `max_in_flight`
+        :param coalesce: deliver only the latest payload on the loop's next
+                         iteration
+        :param debounce: deliver the latest payload once no emit has
+                         happened for this many seconds
+        :param throttle: deliver the latest payload at most this many times
+                         per second
+        :param priority: delivery lane on the target loop. Each loop drains
+                         its higher lanes first; `emit(priority=...)` can
+                         override it
+        :param where: a predicate `where(*args, **kwargs) -> bool`, or a dict
+                      of keyword argument values the emit must match
+        :param weak: hold the callback (or a bound method's object) through
+                     a weak reference
+        :return the subscription, which can be passed to `unregister` or
+                cancelled directly with `subscription.cancel()`
         """
-        with self._events_lock:
-            self._events[name].append(
-                Evt(
-                    func=func,
-                    loop=loop,
-                    recurring=recurring,
-                )
+        offload = None
+        if executor is not None:
+            if weak:
+                raise ValueError("Weak subscriptions cannot use an executor")
+            if asyncio.iscoroutinefunction(func):
+                raise ValueError("Coroutine callbacks cannot use an executor")
+            offload = Offload(
+                func,
+                resolve_executor(self._executors, executor),
+                max_concurrency,
             )
+        elif max_concurrency is not None:
+            raise ValueError("max_concurrency requires an executor")
+        limit = None
+        if max_in_flight is not None:
+            limit = InFlightLimit(max_in_flight, overflow)
+            self._limits.add(limit)
+        modes = [(mode, interval) for mode, interval in (
+            (DeliveryGate.COALESCE, 0 if coalesce else None),
+            (DeliveryGate.DEBOUNCE, debounce),
+            (DeliveryGate.THROTTLE, throttle and 1.0 / throttle),
+        ) if interval is not None]
+        if len(modes) > 1:
+            raise ValueError("Use only one of coalesce, debounce and throttle")
+        predicate, fields = split_where(where)
+        evt = Evt(
+            func=func,
+            loop=loop,
+            recurring=recurring,
+            manager=self,
+            offload=offload,
+            limit=limit,
+            priority=priority,
+            where=predicate,
+            fields=fields,
+            weak=weak,
+        )
+        if modes:
+            evt.gate = DeliveryGate(*modes[0], partial(self._deliver_gated, evt))
+        with self._latch_lock(name):
+            self._events.add(name, evt)
+            data = self._latest.get(name)
+            if data is not None:
+                self._deliver_latest(evt, data)
+        return evt
+
+    def _latch_lock(self, name: str) -> RLock:
+        return self._latch_locks[hash(name) % len(self._latch_locks)]
+
+    def _deliver_latest(self, evt: Evt, data: EvtData):
+        """
+        Hand the last value of a latched name to a new subscription. A
+        one-shot subscription is claimed by it, like by any emit.
+        """
+        args, kwargs = data.args or (), data.kwargs or {}
+        if evt.fields is not None and not matches(evt.fields, kwargs):
+            return
+        batches = {}
+        self._collect(
+            evt.name, args, kwargs, self.loop, batches, subscribers=(evt,),
+        )
+        self._flush(batches)
+
+    def latch(self, name: str):
+        """
+        Keep the last emit of an event name, as if every emit of it was
+        `sticky`. `wait` then returns it right away, and new subscriptions
+        receive it as soon as they register.
+
+        :param name: event name
+        """
+        with self._latched_lock:
+            self._latched = self._latched | {name}
+
+    def unlatch(self, name: str):
+        """
+        Stop latching an event name and forget its last value
+        """
+        with self._latched_lock:
+            self._latched = self._latched - {name}
+        self._latest.pop(name)
+
+    def latest(self, name: str) -> Optional[EvtData]:
+        """
+        The last value of a latched name, or None
+        """
+        return self._latest.get(name)
+
+    def clear(self, name: str) -> bool:
+        """
+        Forget the last value of a latched name; later waits block until
+        the next emit again
+
+        :return True if there was a value to forget
+        """
+        return self._latest.pop(name) is not None
     
+    def _dispatcher(self, loop: asyncio.AbstractEventLoop) -> LoopDispatcher:
+        """
+        Get (or lazily create) the delivery queue for a target loop
+        """
+        dispatcher = self._dispatchers.get(loop)
+        if dispatcher is None:
+            with self._dispatchers_lock:
+                dispatcher = self._dispatchers.get(loop)
+                if dispatcher is None:
+                    limit = None
+                    if self._max_in_flight is not None:
+                        limit = InFlightLimit(self._max_in_flight, self._overflow)
+                        self._limits.add(limit)
+                    dispatcher = self._dispatchers[loop] = LoopDispatcher(
+                        loop, self._pending_maxsize, self._pending_ttl,
+                        limit, self._wake_drainers,
+                        self._drain_budget, self._lane_quota, self._inline,
+                    )
+        return dispatcher
+
     @property
     def loop(self):
-        from contextlib import suppress
-        with suppress(RuntimeError):
-            return self._loop or asyncio.get_running_loop()
-        with suppress(RuntimeError):
-            return self._loop or asyncio.get_event_loop()
+        if self._loop is not None:
+            return self._loop
+        loop = asyncio._get_running_loop()
+        if loop is not None:
+            return loop
+        try:
+            return asyncio.get_event_loop()
+        except RuntimeError:
+            return None
     
     @loop.setter
     def loop(self, new_loop: Optional[asyncio.AbstractEventLoop]):
@@ -109,29 +613,115 @@ class Manager:
                    kwargs: dict = None,
                    loop: asyncio.AbstractEventLoop = None,
                    retries: int = None,
-    ):
+    ) -> TimerHandle:
         """
         Emit an event after a given period of time.
 
+        Delayed emits live on a per-loop timer wheel; every event due in the
+        same tick is emitted together through `emit_many`.
+
         :param delay: a float of the time (in seconds) you want to delay the call
         :param name: event name
         :param args: additional event arguments
         :param kwargs: addition event keyword arguments
         :param loop: asyncio event loop from which you want the event to be emitted
+        :param retries: deprecated, ignored
+        :return a `TimerHandle` which can be cancelled or rescheduled
         """
-        # event = self._events.get(name)
         loop = loop or self.loop
-        assert loop.is_running()
-        loop.call_later(delay, self.emit, name,
-                        args=args, kwargs=kwargs, retries=retries, loop=loop)
+        if loop is None:
+            raise RuntimeError("There is no accessible event loop")
+        return self._timer_wheel(loop).call_later(
+            delay, name, EvtData(args=args or (), kwargs=kwargs),
+        )
+
+    def attach_transport(self,
+                         transport: Transport,
+                         loop: asyncio.AbstractEventLoop = None,
+    ):
+        """
+        Connect this manager to Managers in other processes. Every emit is
+        published through the transport, and events received from peers are
+        delivered to local subscribers in batches on `loop`.
+
+        :param transport: e.g. a `SharedMemoryBus` endpoint
+        :param loop: the loop that receives peer events (Default: running loop)
+        """
+        if self._transport is not None:
+            raise RuntimeError("A transport is already attached")
+        transport.attach(self, loop or asyncio.get_running_loop())
+        self._transport = transport
+
+    def detach_transport(self) -> Optional[Transport]:
+        """
+        Disconnect the attached transport, if any
+
+        :return the detached transport
+        """
+        transport, self._transport = self._transport, None
+        if transport is not None:
+            transport.detach()
+        return transport
+
+    def attach_journal(self, journal: Journal):
+        """
+        Append every emit (or those of the journal's `names`) to a durable
+        journal, which can replay them after a restart
+
+        :param journal: the `Journal` to append to
+        """
+        if self._journal is not None:
+            raise RuntimeError("A journal is already attached")
+        self._journal = journal
+
+    def detach_journal(self) -> Optional[Journal]:
+        """
+        Stop journaling emits; the journal itself is left open
+
+        :return the detached journal
+        """
+        journal, self._journal = self._journal, None
+        return journal
+
+    def _timer_wheel(self, loop: asyncio.AbstractEventLoop) -> TimerWheel:
+        """
+        Get (or lazily create) the timer wheel driven by a loop
+        """
+        wheel = self._wheels.get(loop)
+        if wheel is None:
+            with self._dispatchers_lock:
+                wheel = self._wheels.get(loop)
+                if wheel is None:
+                    wheel = self._wheels[loop] = TimerWheel(
+                        loop, self._fire_timers, self._timer_resolution,
+                    )
+        return wheel
+
+    def _fire_timers(self, handles: list):
+        self.emit_many([(handle.name, handle.data) for handle in handles])
+
     @property
-    def proxy(self):
-        return type("Proxy", (), {
-            "__getattribute__": lambda s, name: \
-                partial(object.__getattribute__(s, "func"), name),
-            "func": lambda _, name, *a, **k:\
-                self.emit(name, args=a, kwargs=k),
-        })()
+    def proxy(self) -> ChannelProxy:
+        """
+        Emit through attribute access:
+        `mgr.proxy.MyEvent(1, x=2)` is `mgr.emit("MyEvent", args=(1,), kwargs={"x": 2})`
+        """
+        return self._proxy
+
+    def channel(self, name: str) -> Channel:
+        """
+        Get the cached `Channel` handle of an event name
+
+        :param name: event name
+        """
+        channel = self._channels.get(name)
+        if channel is None:
+            channels = self._channels
+            if self._channels_maxsize and len(channels) >= self._channels_maxsize:
+                # channels are stateless, dropping them only costs a rebuild
+                channels.clear()
+            channel = channels.setdefault(name, Channel(self, name))
+        return channel
 
     def emit(self,
              name: str,
@@ -140,6 +730,8 @@ class Manager:
              retries: Optional[int] = None,
              data: Optional[EvtData] = None,
              target_loop: Optional[asyncio.AbstractEventLoop] = None,
+             priority: Optional[int] = None,
+             sticky: bool = False,
     ):
         """
         Emit a signal with arbitrary parameters.
@@ -150,73 +742,459 @@ class Manager:
         :param name:    event name
         :param args:    additional event positional arguments
         :param kwargs:  additional event keyword arguments
-        :param retries: number of retries allowed (None = default)
+        :param retries: deprecated, ignored
+        :param priority: delivery lane for every subscriber, overriding the
+                         priority they registered with
+        :param sticky: keep the event as the name's last value (see `latch`),
+                       even if the name isn't latched
 
         :return None
         """
-        if retries is None:
-            retries = self.async_retry_count
-        
         if data:
             args = data.args
             kwargs = data.kwargs
+        self._emit(name, args or (), kwargs or {}, priority, sticky)
+
+    def _emit(self,
+              name: str,
+              args: tuple,
+              kwargs: dict,
+              priority: Optional[int],
+              sticky: bool = False,
+    ):
+        """
+        `emit` once its arguments are normalized
+        """
+        if self._transport is not None or self._journal is not None:
+            self._publish([(name, EvtData(args=args, kwargs=kwargs))])
+
+        batches = {}
+        if sticky or name in self._latched:
+            with self._latch_lock(name):
+                rejected = self._collect(
+                    name, args, kwargs, self.loop, batches, priority=priority,
+                    sticky=sticky,
+                )
+                self._flush(batches)
+        else:
+            rejected = self._collect(
+                name, args, kwargs, self.loop, batches, priority=priority,
+            )
+            self._flush(batches)
+        if rejected:
+            raise InFlightLimitExceeded(
+                "{} deliveries of {!r} were rejected".format(rejected, name))
+
+    def emit_many(self,
+                  events: Iterable[Tuple[str, Optional[EvtData]]],
+                  publish: bool = True,
+                  priority: Optional[int] = None,
+                  sticky: bool = False,
+    ):
+        """
+        Emit a batch of events in one call.
+
+        Subscribers for every event are resolved up front and deliveries are
+        grouped by target loop, so each loop receives a single hand-off for
+        the whole batch. Each subscriber still sees events in batch order.
+
+        :param events: iterable of `(name, EvtData)` pairs (data may be None)
+        :param publish: whether to forward the batch to an attached
+                        transport and journal
+        :param priority: delivery lane for the whole batch (see `emit`)
+        :param sticky: latch every event of the batch (see `emit`)
+
+        :return None
+        """
+        if publish and (self._transport is not None or self._journal is not None):
+            events = list(events)
+            self._publish(events)
 
-        with self._events_lock:
-            new_events = []
-            # Remove the event name from the event list, re-add if recurring
-            for evt in self._events.pop(name, ()):
-                re_add = False
+        control_loop = self.loop
+        batches = {}
+        rejected = 0
+        for name, data in events:
+            if data is None:
+                args, kwargs = (), {}
+            else:
+                args, kwargs = data.args or (), data.kwargs or {}
+            if sticky or name in self._latched:
+                # hand over what is batched so far, then this event alone
+                # under its latch lock (see `_emit`)
+                self._flush(batches)
+                batches = {}
+                with self._latch_lock(name):
+                    rejected += self._collect(
+                        name, args, kwargs, control_loop, batches,
+                        priority=priority, sticky=sticky,
+                    )
+                    self._flush(batches)
+                batches = {}
+                continue
+            rejected += self._collect(
+                name, args, kwargs, control_loop, batches, priority=priority,
+            )
+        self._flush(batches)
+        if rejected:
+            raise InFlightLimitExceeded(
+                "{} deliveries were rejected".format(rejected))
+
+    def _publish(self, events: list):
+        """
+        Hand locally emitted events to the attached transport and journal
+        """
+        # a failure to publish never prevents the local delivery
+        if self._journal is not None:
+            try:
+                self._journal.append(events)
+            except Exception:
+                logger.exception("Could not journal %d events", len(events))
+        if self._transport is not None:
+            try:
+                self._transport.publish(events)
+            except Exception:
+                logger.exception("Could not publish %d events", len(events))
+
+    async def emit_many_async(self,
+                              events: Union[Iterable, AsyncIterable],
+                              chunk_size: int = 1024,
+    ):
+        """
+        Asynchronous variant of `emit_many` accepting sync or async iterables.
+
+        Events are handed off in chunks of `chunk_size`, yielding to the
+        running loop between chunks so a large batch doesn't starve it.
+
+        :param events:     (async) iterable of `(name, EvtData)` pairs
+        :param chunk_size: maximum number of events per hand-off
+        """
+        chunk = []
+        if isinstance(events, AsyncIterable):
+            async for event in events:
+                chunk.append(event)
+                if len(chunk) >= chunk_size:
+                    self.emit_many(chunk)
+                    chunk = []
+                    await asyncio.sleep(0)
+        else:
+            for event in events:
+                chunk.append(event)
+                if len(chunk) >= chunk_size:
+                    self.emit_many(chunk)
+                    chunk = []
+                    await asyncio.sleep(0)
+        if chunk:
+            self.emit_many(chunk)
+
+    def _collect(self,
+                 name: str,
+                 args: tuple,
+                 kwargs: dict,
+                 control_loop: Optional[asyncio.AbstractEventLoop],
+                 batches: dict,
+                 reply: Optional[Reply] = None,
+                 priority: Optional[int] = None,
+                 sticky: bool = False,
+                 subscribers: Optional[Iterable[Evt]] = None,
+    ):
+        """
+        Resolve the subscribers of a single event and append its work items
+        to the per-loop `batches`. With a `reply`, every delivery reports
+        its outcome to it.
+
+        `batches` is keyed by target loop for the default lane and by
+        `(loop, priority)` for any other lane.
+
+        With `subscribers`, only those are delivered to, and the event isn't
+        latched nor seen by waiters and streams.
+
+        :return the number of deliveries refused by a REJECT limit
+        """
+        if subscribers is None:
+            data = None
+            if sticky or name in self._latched:
+                data = EvtData(args=tuple(args), kwargs=dict(kwargs))
+                # a subscription made meanwhile gets this value either from
+                # the cache or from this emit, never both
+                with self._latch_lock(name):
+                    self._latest.put(name, data)
+                    streams = self._streams.get(name)
+                    subscribers = self._events.select(name, kwargs)
+            else:
+                streams = self._streams.get(name)
+                # Lock-free snapshot; one-shot subscribers are claimed atomically below
+                subscribers = self._events.select(name, kwargs)
+
+            if streams:
+                if data is None:
+                    data = EvtData(args=tuple(args), kwargs=dict(kwargs))
+                for stream in streams:
+                    stream.put(data)
+
+            waiting = self._waiters.pop(name)
+            if waiting:
+                if data is None:
+                    data = EvtData(args=tuple(args), kwargs=dict(kwargs))
+                for waiter_loop, waiters in waiting.items():
+                    key = waiter_loop if not priority else (waiter_loop, priority)
+                    batch = batches.get(key)
+                    if batch is None:
+                        batch = batches[key] = []
+                    batch.append((SYNC, fire_waiters, (waiters, name, data), {}))
+        if not subscribers:
+            if self._metrics is not None:
+                self._metrics.emitted(name)
+            return 0
+
+        deliveries = []
+        one_shots = []
+        dead = False
+        for evt in subscribers:
+            target_loop = evt.loop or control_loop
+
+            if not target_loop:
+                raise RuntimeError("There is no accessible event loop")
+
+            if evt.kind is None:
+                # Invalid function
+                continue
+
+            func = evt.func
+            if func is None:
+                func = evt.weak()
+                if func is None:
+                    # garbage collected; purged in bulk later
+                    dead = True
+                    continue
+
+            if evt.where is not None:
                 try:
-                    # Re-add event if recurring (or event loop hasn't started)
-                    control_loop = self.loop
-                    target_loop = evt.loop or control_loop
-
-                    if not target_loop:
-                        raise RuntimeError("There is no accessible event loop")
-
-                    if not target_loop.is_running():
-                        if not control_loop.is_running():
-                            if retries == 0:
-                                raise RuntimeError(
-                                    "The target event loop is not running"
-                                )
-                            control_loop.call_later(
-                                self.async_retry_delay,
-                                self.emit,
-                                name, args, kwargs, retries - 1,
-                            )
-                            re_add = True
-                    elif asyncio.iscoroutinefunction(evt.func):
-                        asyncio.run_coroutine_threadsafe(
-                            evt.func(*(args or ()), **(kwargs or {})),
-                            loop=target_loop,
-                        )
-                    elif callable(evt.func):
-                        target_loop.call_soon_threadsafe(
-                            partial(
-                                evt.func, *args, **(kwargs or {}),
-                            )
-                        )
-                    else:
-                        # Invalid function
-                        re_add = False
-                    if re_add or evt.recurring:
-                        new_events.append(evt)
-                except RuntimeError:
-                    raise
+                    accepted = evt.where(*args, **kwargs)
                 except Exception as e:
-                    # TODO better output handling
-                    import traceback
-                    traceback.print_exc()
-            if new_events:
-                self._events[name] = new_events
+                    # isolate the faulty subscriber; report it on its loop
+                    key = target_loop if not priority else (target_loop, priority)
+                    batch = batches.get(key)
+                    if batch is None:
+                        batch = batches[key] = []
+                    batch.append((SYNC, target_loop.call_exception_handler, ({
+                        "message": "Exception in event filter {!r}".format(evt.where),
+                        "exception": e,
+                    },), {}))
+                    continue
+                if not accepted:
+                    continue
+
+            deliveries.append((evt, target_loop, func))
+            if not evt.recurring:
+                one_shots.append(evt)
+
+        claimed = ()
+        if one_shots:
+            claimed = {id(evt) for evt in self._events.claim(name, one_shots)}
+
+        metrics = self._metrics
+        loop_limited = self._max_in_flight is not None
+        rejected = 0
+        for evt, target_loop, func in deliveries:
+            if not evt.recurring and id(evt) not in claimed:
+                # another emitter already delivered this one-shot event
+                continue
+            lane = evt.priority if priority is None else priority
+            if evt.gate is not None and reply is None:
+                item = evt.gate.offer(self._dispatcher(target_loop), args, kwargs)
+                if item is not None:
+                    key = target_loop if not lane else (target_loop, lane)
+                    batch = batches.get(key)
+                    if batch is None:
+                        batch = batches[key] = []
+                    batch.append(item)
+                continue
+            if evt.offload is None:
+                kind = evt.kind
+            elif reply is None:
+                kind, func = COROUTINE, evt.offload
+            else:
+                # the requester gets the exception, not the loop
+                kind, func = COROUTINE, evt.offload.call
+            if metrics is not None:
+                func = metrics.instrument(name, kind, func, target_loop)
+            if reply is not None:
+                kind, func = reply.bind(kind, func)
+            item = (kind, func, args, kwargs)
+            if kind is not SYNC and (loop_limited or evt.limit is not None):
+                item = self._admit(evt, item, target_loop, lane)
+                if isinstance(item, str):
+                    if item == OverflowPolicy.REJECT:
+                        rejected += 1
+                    if reply is not None and item != OverflowPolicy.QUEUE:
+                        reply.refused()
+                    continue
+            key = target_loop if not lane else (target_loop, lane)
+            batch = batches.get(key)
+            if batch is None:
+                batch = batches[key] = []
+            batch.append(item)
+
+        if metrics is not None:
+            metrics.emitted(name)
+        if dead:
+            self._schedule_purge()
+        return rejected
+
+    def _deliver_gated(self,
+                       evt: Evt,
+                       dispatcher: LoopDispatcher,
+                       args: tuple,
+                       kwargs: dict,
+    ):
+        """
+        Run the payload released by a subscription's delivery gate; called
+        on the target loop. An async delivery still takes its in-flight
+        slots first, so a refused one is queued or discarded per the limit's
+        policy (REJECT can only discard: the emit has already returned).
+        A subscription unregistered meanwhile gets nothing.
+        """
+        if evt.cancelled:
+            return
+        if evt.offload is None:
+            kind, func = evt.kind, evt.callback
+            if func is None:
+                return
+        else:
+            kind, func = COROUTINE, evt.offload
+        if self._metrics is not None:
+            func = self._metrics.instrument(evt.name, kind, func, dispatcher.loop)
+        item = (kind, func, args, kwargs)
+        if kind is not SYNC and (
+                dispatcher.limit is not None or evt.limit is not None):
+            item = self._admit(evt, item, dispatcher.loop, evt.priority)
+            if isinstance(item, str):
+                return
+        dispatcher.run((item,))
+
+    def _admit(self,
+               evt: Evt,
+               item: tuple,
+               target_loop: asyncio.AbstractEventLoop,
+               priority: int,
+    ):
+        """
+        Take the in-flight slots of an async delivery
+
+        :return the work item to dispatch, or the `OverflowPolicy` applied
+        """
+        dispatcher = self._dispatcher(target_loop)
+        limits = tuple(
+            limit for limit in (evt.limit, dispatcher.limit) if limit is not None
+        )
+        _, func, args, kwargs = item
+        ticket = Ticket(func, args, kwargs, limits, dispatcher, priority)
+        outcome = ticket.admit()
+        if outcome is None:
+            return ticket.item
+        return outcome
+
+    def _flush(self, batches: dict):
+        """
+        Hand each target loop its batch of work items
+        """
+        for key, items in batches.items():
+            if key.__class__ is tuple:
+                target_loop, priority = key
+            else:
+                target_loop, priority = key, 0
+            if target_loop.is_closed() and target_loop not in self._purged_loops:
+                self._schedule_purge()
+            try:
+                self._dispatcher(target_loop).push_many(items, priority)
+            except Exception:
+                # TODO better output handling
+                import traceback
+                traceback.print_exc()
+
+    async def request(self,
+                      name: str,
+                      args: tuple = (),
+                      kwargs: dict = None,
+                      timeout: float = None,
+                      gather: str = Gather.FIRST,
+                      quorum: int = None,
+    ):
+        """
+        Emit an event and return what its handlers return
+
+            total = await mgr.request("Add", args=(1, 2))
+
+        The request is delivered like `emit` (waiters and streams see it too)
+        but it is not published to an attached transport, since remote
+        handlers can't reply. Exceptions raised by handlers are passed to
+        the requester instead of the loop's exception handler.
+
+        :param name: event name
+        :param args: event positional arguments
+        :param kwargs: event keyword arguments
+        :param timeout: the maximum time (in seconds) to wait for the result
+        :param gather: `Gather.FIRST` returns the first successful result,
+                       `Gather.ALL` a list of every result in subscription
+                       order, `Gather.QUORUM` a list of the first `quorum`
+                       successful results
+        :param quorum: number of results required by `Gather.QUORUM`
+        :return the gathered result
+        :raises asyncio.TimeoutError when necessary
+        :raises RuntimeError if nobody subscribes to the event, or the first
+                handler exception once the gather mode can't be satisfied
+        """
+        reply = Reply(gather, quorum, asyncio.get_running_loop())
+        self._request(name, args, kwargs, reply)
+        return await asyncio.wait_for(reply.future, timeout=timeout)
+
+    def request_sync(self,
+                     name: str,
+                     args: tuple = (),
+                     kwargs: dict = None,
+                     timeout: float = None,
+                     gather: str = Gather.FIRST,
+                     quorum: int = None,
+    ):
+        """
+        Blocking variant of `request` for threads without a running loop.
+        See `request` for the parameters.
+
+        :raises asyncio.TimeoutError when necessary
+        """
+        if asyncio._get_running_loop() is not None:
+            raise RuntimeError("request_sync would block the running loop, "
+                               "use request instead")
+        reply = Reply(gather, quorum)
+        self._request(name, args, kwargs, reply)
+        try:
+            return reply.future.result(timeout)
+        except FutureTimeoutError:
+            reply.future.cancel()
+            raise asyncio.TimeoutError from None
+
+    def _request(self, name: str, args: tuple, kwargs: dict, reply: Reply):
+        batches = {}
+        latch_lock = self._latch_lock(name) if name in self._latched else None
+        if latch_lock is not None:
+            latch_lock.acquire()
+        try:
+            self._collect(name, args or (), kwargs or {}, self.loop, batches, reply)
+        finally:
+            try:
+                self._flush(batches)
+            finally:
+                if latch_lock is not None:
+                    latch_lock.release()
+            reply.seal()
 
     async def wait(self,
                    name: str,
                    timeout: float=None,
     ) -> Union[EvtData, None]:
         """
-        Wait until an event fures and return the emit parameters
+        Wait until an event fures and return the emit parameters. A latched
+        name with a last value returns it right away.
 
         :param name: Event Name
         :param loop: the event loop
@@ -225,45 +1203,140 @@ class Manager:
         :raises asyncio.TimeoutError when necessary
         """
 
-        data = None
-        evt = asyncio.Event()
+        waiter = Waiter(asyncio.get_running_loop(), (name,), Waiter.ONE)
+        return await self._wait(waiter, timeout)
+
+    async def wait_any(self,
+                       names: Iterable[str],
+                       timeout: float = None,
+    ) -> Tuple[str, EvtData]:
+        """
+        Wait until any of several events fires
+
+        :param names: Event names
+        :param timeout: the maximum time (in seconds) to wait before it raises an exception
+        :return a `(name, EvtData)` tuple for the first event emitted
+        :raises asyncio.TimeoutError when necessary
+        """
+        waiter = Waiter(
+            asyncio.get_running_loop(), tuple(dict.fromkeys(names)), Waiter.ANY,
+        )
+        return await self._wait(waiter, timeout)
+
+    async def wait_all(self,
+                       names: Iterable[str],
+                       timeout: float = None,
+    ) -> Dict[str, EvtData]:
+        """
+        Wait until every one of several events has fired at least once
+
+        :param names: Event names
+        :param timeout: the maximum time (in seconds) to wait before it raises an exception
+        :return a dict mapping each name to the first `EvtData` it was emitted with
+        :raises asyncio.TimeoutError when necessary
+        """
+        waiter = Waiter(
+            asyncio.get_running_loop(), tuple(dict.fromkeys(names)), Waiter.ALL,
+        )
+        return await self._wait(waiter, timeout)
+
+    async def _wait(self, waiter: Waiter, timeout: Optional[float]):
+        if not waiter.names:
+            raise ValueError("At least one event name is required")
+        names = waiter.names
+        if len(self._latest):
+            # latched values complete the wait without registering it
+            for name in names:
+                data = self._latest.get(name)
+                if data is not None:
+                    waiter.fire(name, data)
+            if waiter.future.done():
+                return waiter.future.result()
+            # a wait_all only registers for the names still missing
+            names = tuple(name for name in names if name not in waiter.results)
+        self._waiters.add(waiter, names)
+        if len(self._latest):
+            # a latched emit may have landed between the lookup above and
+            # `add`; firing a waiter twice is harmless
+            for name in names:
+                data = self._latest.get(name)
+                if data is not None:
+                    waiter.fire(name, data)
+        try:
+            return await asyncio.wait_for(waiter.future, timeout=timeout)
+        finally:
+            # Drop the waiter right away, even on timeout or cancellation
+            self._waiters.discard(waiter)
 
-        def callback(*args, **kwargs):
-            # Set the provided parameters as a EvtData object
-            nonlocal data, evt
-            data = EvtData(args=args, kwargs=kwargs)
+    def stream(self,
+               name: str,
+               maxsize: int = 1024,
+               policy: str = StreamPolicy.DROP_OLDEST,
+               loop: asyncio.AbstractEventLoop = None,
+    ) -> EventStream:
+        """
+        Subscribe to an event as an async iterator
 
-            # indicate the callback is complete and data is set
-            evt.set()
+            async for data in mgr.stream("MyEvent", maxsize=100):
+                ...
 
-        self.register(name, callback, loop=asyncio.get_running_loop(), recurring=False)
-        await asyncio.wait_for(evt.wait(), timeout=timeout)
-        return data
+        The stream is subscribed immediately and buffers every emit until it
+        is consumed. It unsubscribes itself when iteration ends or it's closed.
 
+        :param name: event name
+        :param maxsize: maximum number of buffered events (0 = unbounded)
+        :param policy: a `StreamPolicy` applied when the buffer is full
+        :param loop: the consuming loop (Default: the running loop)
+        :return the `EventStream`
+        """
+        stream = EventStream(
+            self, name, loop or asyncio.get_running_loop(), maxsize, policy,
+        )
+        with self._latch_lock(name):
+            with self._streams_lock:
+                self._streams[name] = self._streams.get(name, ()) + (stream,)
+            data = self._latest.get(name)
+            if data is not None:
+                stream.put(data)
+        return stream
 
-    def unregister(self, name=None, func=None):
+    def _close_stream(self, stream: EventStream):
+        with self._streams_lock:
+            remaining = tuple(
+                s for s in self._streams.get(stream.name, ()) if s is not stream
+            )
+            if remaining:
+                self._streams[stream.name] = remaining
+            else:
+                self._streams.pop(stream.name, None)
+
+    def unregister(self, name=None, func=None, subscription=None):
         """
         Unregister an event
-        NOTE: by name is significantly faster than by function since
-        it just needs to do a single lookup. Unregistering an event
-        via callback means it needs to iterate through ALL events.
+        NOTE: by name is a single lookup. By function or by subscription
+        handle only touches that function's own subscriptions, which are
+        tracked in a reverse index.
 
         :param name: Event name
         :param func: callback function
-        :return None
+        :param subscription: an `Evt` handle returned by `register`
+        :return the removed subscribers (a bool for `subscription`)
         """
 
         if name is not None:
-            with self._events_lock:
-                return self._events.pop(name, None)
+            return self._events.pop(name)
 
         if func is not None:
-            with self._events_lock:
-                for evt in list(self._events.keys()):
-                    new_events = [e for e in self._events[evt] \
-                                    if e.func is not func]
-                    if new_events:
-                        self._events[evt] = new_events
-                    else:
-                        del self._events[evt]
+            return self._events.remove_func(func)
+
+        if subscription is not None:
+            return self._events.remove(subscription)
+
+
+def _is_dead(evt: Evt) -> bool:
+    return evt.dead
+
 
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
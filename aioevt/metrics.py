@@ -0,0 +1,181 @@
+"""
+Optional instrumentation for the Manager
+"""
+from bisect import bisect_left
+from threading import Lock as LockType
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Optional
+import asyncio
+
+from .event import COROUTINE
+
+__all__ = ["Histogram", "Metrics"]
+
+
+class Histogram:
+    """
+    A fixed-bucket latency histogram (seconds), 1-2-5 spaced from 1us to 100s
+    """
+    BOUNDS = tuple(
+        float("{}e{}".format(m, e)) for e in range(-6, 2) for m in (1, 2, 5)
+    ) + (100.0,)
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.buckets[bisect_left(self.BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket containing the `q` quantile
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.BOUNDS + (self.max,), self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip(
+                [str(b) for b in self.BOUNDS] + ["+Inf"], self.buckets,
+            )),
+        }
+
+
+class Metrics:
+    """
+    Counters and histograms collected by a `Manager` created with
+    `metrics=True`. When metrics are disabled the manager holds `None` and
+    the dispatch path pays a single attribute check per event.
+
+    Tracked per event name: emits, deliveries (callbacks that actually
+    started) and callback failures.
+    Tracked per target loop: emit -> callback start latency.
+    Tracked globally: sync/async callback duration and the number of
+    coroutine handlers started but not yet finished. Deliveries lost before
+    they run (overflow, expiry, a closed loop) are counted by neither.
+
+    :param exporters: callables invoked with each snapshot by `export`
+    """
+
+    def __init__(self, exporters: Iterable[Callable[[dict], None]] = ()):
+        self.emits = {}
+        self.deliveries = {}
+        self.failures = {}
+        self.latency = {}
+        self.duration = {"sync": Histogram(), "async": Histogram()}
+        self.in_flight = 0
+        self._exporters = list(exporters)
+        self._lock = LockType()
+
+    def add_exporter(self, exporter: Callable[[dict], None]):
+        self._exporters.append(exporter)
+
+    def emitted(self, name: str):
+        with self._lock:
+            self.emits[name] = self.emits.get(name, 0) + 1
+
+    def instrument(self,
+                   name: str,
+                   kind: int,
+                   func: Callable,
+                   loop: asyncio.AbstractEventLoop,
+    ):
+        """
+        Wrap a callback so its start latency, duration and failures are
+        recorded when it runs on `loop`. The wrapper keeps the callback's
+        dispatch `kind`.
+        """
+        queued = perf_counter()
+        latency = self._histogram(self.latency, loop_label(loop))
+
+        if kind == COROUTINE:
+            async def instrumented(*args, **kwargs):
+                start = self._started(name, True)
+                failed = False
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    self._finished(name, "async", queued, start, failed, latency)
+            return instrumented
+
+        def instrumented(*args, **kwargs):
+            start = self._started(name, False)
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                self._finished(name, "sync", queued, start, failed, latency)
+        return instrumented
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                "emits": dict(self.emits),
+                "deliveries": dict(self.deliveries),
+                "failures": dict(self.failures),
+                "latency": {k: h.snapshot() for k, h in self.latency.items()},
+                "duration": {k: h.snapshot() for k, h in self.duration.items()},
+                "in_flight": self.in_flight,
+            }
+
+    def export(self, snapshot: dict):
+        for exporter in self._exporters:
+            exporter(snapshot)
+
+    def _histogram(self, table: dict, key: str) -> Histogram:
+        histogram = table.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(key, Histogram())
+        return histogram
+
+    def _started(self, name, coroutine):
+        with self._lock:
+            self.deliveries[name] = self.deliveries.get(name, 0) + 1
+            if coroutine:
+                self.in_flight += 1
+        return perf_counter()
+
+    def _finished(self, name, kind, queued, start, failed, latency):
+        end = perf_counter()
+        with self._lock:
+            latency.observe(start - queued)
+            self.duration[kind].observe(end - start)
+            if failed:
+                self.failures[name] = self.failures.get(name, 0) + 1
+            if kind == "async":
+                self.in_flight -= 1
+
+
+def loop_label(loop: asyncio.AbstractEventLoop) -> str:
+    """
+    A stable, readable key for a loop in metric snapshots
+    """
+    return "{}@{:x}".format(type(loop).__name__, id(loop))
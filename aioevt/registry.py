@@ -0,0 +1,447 @@
+"""
+Subscriber and waiter registries used by the Manager
+"""
+from collections import OrderedDict
+from threading import Lock as LockType
+from typing import Callable, Iterable, Optional
+import asyncio
+
+from .event import Evt, weak_key
+from .filter import FieldIndex
+from .topic import TopicTrie, is_pattern
+
+__all__ = ["LastValueCache", "SubscriberTable", "Waiter", "WaiterTable", "fire_waiters"]
+
+
+class SubscriberTable:
+    """
+    Maps event names to immutable tuples of subscribers.
+
+    Writers build a new tuple and swap it in while holding the lock of that
+    name. Readers (i.e. every emit) simply fetch the current tuple without
+    locking: a snapshot is never mutated, so it stays valid for the whole
+    dispatch even if the table changes underneath it.
+
+    Writes are striped over `shards` locks by a hash of the event name, so
+    threads subscribing to unrelated names don't serialize on one lock. A
+    reverse index from callback to subscribers, striped the same way by
+    callback, keeps removal by function proportional to that function's own
+    subscriptions. No write ever holds two locks at once.
+
+    Names such as `order.*.created` (`*` is one segment) or `metrics.#`
+    (`#` is any number of segments) are wildcard patterns, indexed in a
+    topic trie and written under a lock of their own. Once any pattern is
+    registered, the subscribers of each concrete name (its own, then those
+    of matching patterns) are resolved once and cached. A change to a name
+    drops its cache entry, a change to a pattern drops the whole cache.
+    Without patterns, `get` is the same single dict read as before.
+
+    Once any subscriber has an equality filter, `select` indexes each
+    snapshot by filter field values (see `FieldIndex`). The index is built
+    on the first emit after a change and cached until the snapshot is
+    replaced.
+    """
+    __slots__ = ("_snapshots", "_by_func", "_locks", "_func_locks",
+                 "_pattern_lock", "_trie", "_resolved", "resolved_maxsize",
+                 "_filtered", "_indexes")
+
+    def __init__(self, resolved_maxsize: int = 4096, shards: int = 16):
+        """
+        :param resolved_maxsize: most concrete names whose wildcard matches
+                                 are cached
+        :param shards: number of locks writes are striped over
+        """
+        if shards < 1:
+            raise ValueError("A subscriber table needs at least 1 shard")
+        self._snapshots = {}
+        self._by_func = {}
+        self._locks = tuple(LockType() for _ in range(shards))
+        self._func_locks = tuple(LockType() for _ in range(shards))
+        self._pattern_lock = LockType()
+        self._trie = TopicTrie()
+        self._resolved = {}
+        self.resolved_maxsize = resolved_maxsize
+        # set once and never reset, so it needs no lock
+        self._filtered = False
+        self._indexes = {}
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._snapshots
+
+    def __iter__(self):
+        return iter(list(self._snapshots))
+
+    @property
+    def shards(self) -> int:
+        return len(self._locks)
+
+    def _lock(self, name: str) -> LockType:
+        if is_pattern(name):
+            return self._pattern_lock
+        return self._locks[hash(name) % len(self._locks)]
+
+    def _func_lock(self, key) -> LockType:
+        return self._func_locks[hash(key) % len(self._func_locks)]
+
+    def get(self, name: str) -> tuple:
+        """
+        Lock-free read of the current subscriber snapshot for a name,
+        including the subscribers of wildcard patterns matching it
+        """
+        if not self._trie:
+            return self._snapshots.get(name, ())
+        resolved = self._resolved.get(name)
+        if resolved is None:
+            with self._lock(name):
+                resolved = self._resolve(name)
+        return resolved
+
+    def select(self, name: str, kwargs: dict):
+        """
+        Lock-free read of the subscribers of a name whose equality filters
+        match the keyword arguments of an emit, in subscription order
+        """
+        subscribers = self.get(name)
+        if not self._filtered or not subscribers:
+            return subscribers
+        index = self._indexes.get(name)
+        if index is None or index.snapshot is not subscribers:
+            index = FieldIndex(subscribers)
+            indexes = self._indexes
+            if len(indexes) >= self.resolved_maxsize:
+                indexes.clear()
+            indexes[name] = index
+        return index.select(kwargs)
+
+    def _resolve(self, name: str) -> tuple:
+        # caller must hold the lock of `name`. Pattern writers drop the
+        # whole cache after updating the trie, so a result computed from
+        # stale patterns only ever lands in a cache that was dropped.
+        cache = self._resolved
+        resolved = cache.get(name)
+        if resolved is not None:
+            return resolved
+        resolved = self._snapshots.get(name, ())
+        for pattern in self._trie.match(name):
+            if pattern != name:
+                # a pattern emitted literally already has its own snapshot
+                resolved += self._snapshots.get(pattern, ())
+        if len(cache) >= self.resolved_maxsize:
+            cache.clear()
+        cache[name] = resolved
+        return resolved
+
+    def contains(self, evt: Evt) -> bool:
+        """
+        Whether a specific subscriber is still registered
+        """
+        return any(e is evt for e in self._snapshots.get(evt.name, ()))
+
+    def add(self, name: str, evt: Evt):
+        """
+        Append a subscriber to a name
+        """
+        evt.name = name
+        if evt.fields is not None:
+            self._filtered = True
+        with self._lock(name):
+            self._set(name, self._snapshots.get(name, ()) + (evt,))
+        key = _evt_key(evt)
+        with self._func_lock(key):
+            self._by_func.setdefault(key, []).append(evt)
+
+    def remove(self, evt: Evt) -> bool:
+        """
+        Remove a single subscriber
+
+        :return True if it was registered, otherwise False
+        """
+        with self._lock(evt.name):
+            current = self._snapshots.get(evt.name, ())
+            if not any(e is evt for e in current):
+                return False
+            self._set(evt.name, tuple(e for e in current if e is not evt))
+        evt.cancelled = True
+        self._unindex((evt,))
+        return True
+
+    def claim(self, name: str, evts: Iterable[Evt]) -> tuple:
+        """
+        Atomically remove one-shot subscribers that are still registered.
+
+        When several threads emit the same name concurrently, each one-shot
+        subscriber is claimed (and therefore delivered) by exactly one of them.
+
+        :param name: event name
+        :param evts: subscribers taken from a previously read snapshot
+        :return the subset of `evts` this caller removed
+        """
+        # wildcard subscribers are registered under their pattern
+        by_name = {}
+        for evt in evts:
+            by_name.setdefault(evt.name, set()).add(id(evt))
+        claimed = ()
+        for key, wanted in by_name.items():
+            with self._lock(key):
+                current = self._snapshots.get(key, ())
+                taken = tuple(e for e in current if id(e) in wanted)
+                if not taken:
+                    continue
+                self._set(key, tuple(e for e in current if id(e) not in wanted))
+            self._unindex(taken)
+            claimed += taken
+        return claimed
+
+    def pop(self, name: str) -> tuple:
+        """
+        Remove every subscriber of a name
+        """
+        with self._lock(name):
+            removed = self._snapshots.get(name)
+            if not removed:
+                return removed
+            self._set(name, ())
+        for evt in removed:
+            evt.cancelled = True
+        self._unindex(removed)
+        return removed
+
+    def remove_func(self, func: Callable) -> list:
+        """
+        Remove every subscriber whose callback is `func`
+
+        :return the removed subscribers
+        """
+        removed = []
+        # strongly and weakly held subscriptions are indexed differently
+        for key in (_func_key(func), weak_key(func)):
+            with self._func_lock(key):
+                removed += self._by_func.pop(key, [])
+        names = {}
+        for evt in removed:
+            evt.cancelled = True
+            names.setdefault(evt.name, set()).add(id(evt))
+        for name, ids in names.items():
+            with self._lock(name):
+                current = self._snapshots.get(name, ())
+                self._set(name, tuple(e for e in current if id(e) not in ids))
+        return removed
+
+    def remove_if(self, predicate: Callable[[Evt], bool]) -> list:
+        """
+        Remove every subscriber for which `predicate` is true, rewriting
+        each affected name once
+
+        :return the removed subscribers
+        """
+        removed = []
+        for name in self:
+            with self._lock(name):
+                current = self._snapshots.get(name, ())
+                dropped = tuple(e for e in current if predicate(e))
+                if not dropped:
+                    continue
+                ids = {id(e) for e in dropped}
+                self._set(name, tuple(e for e in current if id(e) not in ids))
+            for evt in dropped:
+                evt.cancelled = True
+            self._unindex(dropped)
+            removed += dropped
+        return removed
+
+    def _unindex(self, evts):
+        for evt in evts:
+            key = _evt_key(evt)
+            with self._func_lock(key):
+                siblings = self._by_func.get(key)
+                if siblings is None:
+                    continue
+                siblings[:] = [e for e in siblings if e is not evt]
+                if not siblings:
+                    del self._by_func[key]
+
+    def _set(self, name: str, snapshot: tuple):
+        # caller must hold the lock of `name`
+        if snapshot:
+            self._snapshots[name] = snapshot
+        else:
+            self._snapshots.pop(name, None)
+        if is_pattern(name):
+            if snapshot:
+                self._trie.add(name)
+            else:
+                self._trie.discard(name)
+            self._resolved = {}
+            if self._filtered:
+                self._indexes = {}
+        else:
+            if self._resolved:
+                self._resolved.pop(name, None)
+            if self._filtered:
+                # don't keep removed subscribers alive through a stale index
+                self._indexes.pop(name, None)
+
+
+def _evt_key(evt: Evt):
+    if evt.weak is not None:
+        return evt.weak.key
+    return _func_key(evt.func)
+
+
+def _func_key(func: Callable):
+    """
+    Reverse index key for a callback. Bound methods compare equal across
+    attribute accesses; unhashable callables fall back to their identity.
+    """
+    try:
+        hash(func)
+    except TypeError:
+        return id(func)
+    return func
+
+
+class Waiter:
+    """
+    A single pending `wait`, `wait_any` or `wait_all` call.
+
+    The waiter is registered under each of its names and is resolved on its
+    own loop. `wait_all` waiters collect one `EvtData` per name before their
+    future completes.
+    """
+    __slots__ = ("future", "loop", "names", "mode", "results")
+
+    ONE = "one"
+    ANY = "any"
+    ALL = "all"
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, names: tuple, mode: str):
+        self.future = loop.create_future()
+        self.loop = loop
+        self.names = names
+        self.mode = mode
+        self.results = {}
+
+    def fire(self, name: str, data):
+        """
+        Deliver an emitted event; must be called on the waiter's loop
+        """
+        if self.future.done():
+            return
+        if self.mode == Waiter.ONE:
+            self.future.set_result(data)
+        elif self.mode == Waiter.ANY:
+            self.future.set_result((name, data))
+        else:
+            self.results.setdefault(name, data)
+            if len(self.results) == len(self.names):
+                self.future.set_result(dict(self.results))
+
+
+class WaiterTable:
+    """
+    Pending waiters grouped per event name and per loop.
+
+    Waiters are removed as soon as their wait finishes (including timeouts
+    and cancellation), so abandoned waits never linger in the registry.
+    """
+    __slots__ = ("_by_name", "_lock")
+
+    def __init__(self):
+        self._by_name = {}
+        self._lock = LockType()
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def add(self, waiter: Waiter, names: Optional[Iterable[str]] = None):
+        """
+        :param names: register under these of the waiter's names only
+        """
+        with self._lock:
+            for name in waiter.names if names is None else names:
+                self._by_name.setdefault(name, {}) \
+                    .setdefault(waiter.loop, {})[waiter] = None
+
+    def discard(self, waiter: Waiter):
+        with self._lock:
+            for name in waiter.names:
+                loops = self._by_name.get(name)
+                if loops is None:
+                    continue
+                waiters = loops.get(waiter.loop)
+                if waiters is None:
+                    continue
+                waiters.pop(waiter, None)
+                if not waiters:
+                    del loops[waiter.loop]
+                    if not loops:
+                        del self._by_name[name]
+
+    def pop(self, name: str) -> Optional[dict]:
+        """
+        Take every waiter of a name, grouped as `{loop: [waiter, ...]}`
+        """
+        if name not in self._by_name:
+            # lock-free fast path for the common no-waiter case
+            return None
+        with self._lock:
+            loops = self._by_name.pop(name, None)
+        if loops is None:
+            return None
+        return {loop: list(waiters) for loop, waiters in loops.items()}
+
+
+def fire_waiters(waiters: list, name: str, data):
+    """
+    Resolve a batch of waiters on their shared loop
+    """
+    for waiter in waiters:
+        waiter.fire(name, data)
+
+
+class LastValueCache:
+    """
+    The last `EvtData` of each latched event name, evicting the least
+    recently emitted or read name beyond `maxsize` (0 = unbounded).
+    """
+    __slots__ = ("maxsize", "evicted", "_values", "_lock")
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.evicted = 0
+        self._values = OrderedDict()
+        self._lock = LockType()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values
+
+    def put(self, name: str, data):
+        with self._lock:
+            self._values[name] = data
+            self._values.move_to_end(name)
+            if self.maxsize and len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+                self.evicted += 1
+
+    def get(self, name: str):
+        """
+        :return the last value of a name, or None
+        """
+        if name not in self._values:
+            # lock-free fast path for names that were never latched
+            return None
+        with self._lock:
+            data = self._values.get(name)
+            if data is not None:
+                self._values.move_to_end(name)
+            return data
+
+    def pop(self, name: str):
+        with self._lock:
+            return self._values.pop(name, None)
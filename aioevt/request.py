@@ -0,0 +1,197 @@
+"""
+Request/response over events: collect the return values of handlers
+"""
+from concurrent.futures import Future, InvalidStateError
+from threading import Lock as LockType
+from typing import Callable, Optional, Tuple
+import asyncio
+
+from .event import SYNC, COROUTINE
+from .flow import InFlightLimitExceeded, Tracked
+
+__all__ = ["Gather", "Reply"]
+
+
+class Gather:
+    """
+    How a request turns handler results into its own result
+    """
+    FIRST = "first"     # the first successful result
+    ALL = "all"         # every result, in subscription order
+    QUORUM = "quorum"   # the first `quorum` successful results
+
+    ALL_MODES = (FIRST, ALL, QUORUM)
+
+
+class Reply:
+    """
+    Collects the results of one request from handlers on any loop.
+
+    Each delivery is bound to a slot with `bind`, and its outcome is
+    recorded from the handler's loop. The request resolves `future` as soon
+    as its gather mode is satisfied, or fails as soon as it no longer can
+    be; later outcomes are ignored. `seal` is called once every delivery is
+    bound, since ALL (and failure detection) need the final count. A
+    delivery that is lost before it runs, or whose handler is cancelled,
+    counts as a failure.
+
+    With a `loop`, `future` is an asyncio future of that loop, resolved
+    in a single hop; otherwise it's a `concurrent.futures.Future`.
+    """
+    __slots__ = ("gather", "quorum", "future", "expected", "_results",
+                 "_ok", "_errors", "_sealed", "_settled", "_lock", "_loop")
+
+    def __init__(self,
+                 gather: str = Gather.FIRST,
+                 quorum: Optional[int] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        if gather not in Gather.ALL_MODES:
+            raise ValueError("Unknown gather mode {!r}".format(gather))
+        if gather == Gather.QUORUM:
+            if quorum is None or quorum < 1:
+                raise ValueError("A quorum of at least 1 is required")
+        elif quorum is not None:
+            raise ValueError("quorum is only used with Gather.QUORUM")
+        self.gather = gather
+        self.quorum = quorum if gather == Gather.QUORUM else 1
+        self.future = Future() if loop is None else loop.create_future()
+        self._loop = loop
+        self.expected = 0
+        self._results = {}
+        self._ok = []
+        self._errors = []
+        self._sealed = False
+        self._settled = False
+        self._lock = LockType()
+
+    def bind(self, kind: int, func: Callable) -> Tuple[int, Callable]:
+        """
+        Wrap one delivery so its outcome is recorded
+
+        :return the `(kind, func)` to dispatch instead
+        """
+        index = self.expected
+        self.expected += 1
+        if kind is SYNC:
+            return SYNC, _Bound(self, self._call, index, func)
+        return COROUTINE, _Bound(self, self._await, index, func)
+
+    def refused(self):
+        """
+        Record a delivery that was dropped or rejected by an in-flight limit
+        """
+        self._record(None, None, InFlightLimitExceeded(
+            "A delivery of the request was refused"))
+
+    def seal(self):
+        """
+        No more deliveries will be bound
+        """
+        with self._lock:
+            self._sealed = True
+            if self._settled:
+                return
+            if not self.expected:
+                self._fail(RuntimeError("The request has no subscribers"))
+            else:
+                self._check()
+
+    def _call(self, index, func, *args, **kwargs):
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._record(index, None, e)
+        else:
+            self._record(index, result, None)
+
+    async def _await(self, index, func, *args, **kwargs):
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self._record(index, None, e)
+        except asyncio.CancelledError as e:
+            # not the requester's own cancellation, so don't pass it on as one
+            error = RuntimeError("A handler of the request was cancelled")
+            error.__cause__ = e
+            self._record(index, None, error)
+            raise
+        else:
+            self._record(index, result, None)
+
+    def _record(self, index, result, error):
+        with self._lock:
+            if self._settled:
+                return
+            if error is None:
+                self._results[index] = result
+                self._ok.append(result)
+            else:
+                self._errors.append(error)
+            self._check()
+
+    def _check(self):
+        # caller must hold the lock
+        if self.gather == Gather.ALL:
+            if self._errors:
+                self._fail(self._errors[0])
+            elif self._sealed and len(self._results) == self.expected:
+                self._resolve([self._results[i] for i in range(self.expected)])
+            return
+
+        if len(self._ok) >= self.quorum:
+            if self.gather == Gather.FIRST:
+                self._resolve(self._ok[0])
+            else:
+                self._resolve(self._ok[:self.quorum])
+        elif self._sealed and \
+                self.expected - len(self._errors) < self.quorum:
+            self._fail(self._errors[0])
+
+    def _resolve(self, value):
+        self._settle(self.future.set_result, value)
+
+    def _fail(self, error: BaseException):
+        self._settle(self.future.set_exception, error)
+
+    def _settle(self, setter, value):
+        # caller must hold the lock; no outcome is recorded after this
+        self._settled = True
+        loop = self._loop
+        if loop is None or asyncio._get_running_loop() is loop:
+            _settle(setter, value)
+        else:
+            try:
+                loop.call_soon_threadsafe(_settle, setter, value)
+            except RuntimeError:
+                # the requesting loop is closed
+                pass
+
+
+class _Bound(Tracked):
+    """
+    A delivery bound to a slot of a `Reply`; a lost delivery is recorded
+    as a failure so the request doesn't wait for it forever
+    """
+    __slots__ = ("reply", "run", "index", "func")
+
+    def __init__(self, reply: Reply, run: Callable, index: int, func: Callable):
+        self.reply = reply
+        self.run = run
+        self.index = index
+        self.func = func
+
+    def __call__(self, *args, **kwargs):
+        return self.run(self.index, self.func, *args, **kwargs)
+
+    def lost(self):
+        self.reply._record(self.index, None, RuntimeError(
+            "A delivery of the request was lost"))
+
+
+def _settle(setter, value):
+    try:
+        setter(value)
+    except (InvalidStateError, asyncio.InvalidStateError):
+        # the requester gave up (timeout or cancellation)
+        pass
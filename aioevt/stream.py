@@ -0,0 +1,162 @@
+"""
+Async iterator subscriptions with bounded buffering
+"""
+from collections import deque
+from threading import Condition
+import asyncio
+
+from .event import EvtData
+
+__all__ = ["EventStream", "StreamPolicy"]
+
+
+class StreamPolicy:
+    """
+    What a stream does with a new event when its buffer is full
+    """
+    BLOCK = "block"                 # block the emitting thread until there is room
+    DROP_OLDEST = "drop_oldest"     # discard the oldest buffered event
+    DROP_NEWEST = "drop_newest"     # discard the incoming event
+    KEEP_LATEST = "keep_latest"     # only ever buffer the most recent event
+
+    ALL = (BLOCK, DROP_OLDEST, DROP_NEWEST, KEEP_LATEST)
+
+
+class EventStream:
+    """
+    A persistent subscription that buffers emitted `EvtData` for one consumer.
+
+    Emitters append straight into the buffer from their own thread; the
+    consumer's loop is only woken when it is actually waiting for data.
+    Iterate with `async for`; leaving the loop (or calling `close`)
+    unsubscribes the stream from its manager.
+
+    NOTE: with `StreamPolicy.BLOCK`, an emitter running on the consumer's own
+    loop cannot block (it would deadlock), so its event is buffered anyway.
+
+    A stream whose consumer loop has closed closes itself on the next emit
+    (or `Manager.purge`), so it never holds up other subscribers.
+    """
+
+    def __init__(self,
+                 manager,
+                 name: str,
+                 loop: asyncio.AbstractEventLoop,
+                 maxsize: int = 1024,
+                 policy: str = StreamPolicy.DROP_OLDEST,
+    ):
+        if policy not in StreamPolicy.ALL:
+            raise ValueError("Unknown stream policy: {!r}".format(policy))
+        self.name = name
+        self.loop = loop
+        self.maxsize = 1 if policy == StreamPolicy.KEEP_LATEST else maxsize
+        self.policy = policy
+        self.dropped = 0
+        self._manager = manager
+        self._buffer = deque()
+        self._cond = Condition()
+        self._getter = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, data: EvtData):
+        """
+        Buffer an emitted event; safe to call from any thread
+        """
+        if self.loop.is_closed():
+            self.close()
+            return
+        with self._cond:
+            if self._closed:
+                return
+            if self.maxsize and len(self._buffer) >= self.maxsize:
+                if self.policy == StreamPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                if self.policy == StreamPolicy.BLOCK:
+                    if asyncio._get_running_loop() is not self.loop:
+                        while len(self._buffer) >= self.maxsize \
+                                and not self._closed:
+                            self._cond.wait()
+                        if self._closed:
+                            return
+                else:
+                    self.dropped += 1
+                    self._buffer.popleft()
+            self._buffer.append(data)
+            getter, self._getter = self._getter, None
+        if getter is not None:
+            try:
+                self.loop.call_soon_threadsafe(_wake, getter)
+            except RuntimeError:
+                # the consumer loop closed while it was waiting
+                self.close()
+
+    async def get(self) -> EvtData:
+        """
+        Wait for the next buffered event
+
+        :raises EOFError once the stream is closed and drained
+        """
+        while True:
+            with self._cond:
+                if self._buffer:
+                    data = self._buffer.popleft()
+                    self._cond.notify()
+                    return data
+                if self._closed:
+                    raise EOFError("The event stream is closed")
+                getter = self._getter = self.loop.create_future()
+            await getter
+
+    def close(self):
+        """
+        Unsubscribe the stream; buffered events can still be consumed
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            getter, self._getter = self._getter, None
+            self._cond.notify_all()
+        self._manager._close_stream(self)
+        if getter is not None:
+            try:
+                self.loop.call_soon_threadsafe(_wake, getter)
+            except RuntimeError:
+                # the consumer loop is closed; nobody is left to wake
+                pass
+
+    async def aclose(self):
+        self.close()
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        try:
+            while True:
+                try:
+                    data = await self.get()
+                except EOFError:
+                    return
+                yield data
+        finally:
+            self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+def _wake(getter: asyncio.Future):
+    if not getter.done():
+        getter.set_result(None)
@@ -0,0 +1,214 @@
+"""
+Hierarchical timer wheel used for delayed emits
+"""
+from threading import Lock as LockType
+from typing import Callable, List
+import asyncio
+
+from .event import EvtData
+
+__all__ = ["TimerHandle", "TimerWheel"]
+
+
+class TimerHandle:
+    """
+    A delayed emit scheduled on a `TimerWheel`. It can be cancelled or moved
+    to a new deadline until it fires.
+    """
+    __slots__ = ("name", "data", "when", "_wheel", "_tick", "_slot")
+
+    def __init__(self, wheel: "TimerWheel", name: str, data: EvtData):
+        self.name = name
+        self.data = data
+        self.when = None
+        self._wheel = wheel
+        self._tick = None
+        self._slot = None
+
+    def __repr__(self) -> str:
+        return "<TimerHandle name={!r} when={!r} active={}>".format(
+            self.name, self.when, self.active,
+        )
+
+    @property
+    def active(self) -> bool:
+        """
+        Whether the timer is still waiting to fire
+        """
+        return self._slot is not None
+
+    def cancel(self) -> bool:
+        """
+        Cancel the delayed emit
+
+        :return True if the timer was pending, otherwise False
+        """
+        return self._wheel.cancel(self)
+
+    def reschedule(self, delay: float):
+        """
+        Move the timer to fire `delay` seconds from now. A timer that already
+        fired or was cancelled is armed again.
+
+        :param delay: seconds from now
+        """
+        self._wheel.schedule(self, delay)
+
+
+class TimerWheel:
+    """
+    A hierarchical timing wheel bound to one event loop.
+
+    Time is split into ticks of `resolution` seconds. Level 0 has one slot
+    per tick; every higher level has slots `slots` times coarser, and its
+    timers cascade down one level each time the level below wraps around.
+    Insertion and cancellation are O(1), and a single `call_later` per tick
+    drives the wheel while timers are pending. All timers due in the same
+    tick are handed to `fire` as one batch on the loop.
+    """
+
+    def __init__(self,
+                 loop: asyncio.AbstractEventLoop,
+                 fire: Callable[[List[TimerHandle]], None],
+                 resolution: float = 0.01,
+                 slots: int = 64,
+                 levels: int = 4,
+    ):
+        if slots & (slots - 1):
+            raise ValueError("slots must be a power of two")
+        self.loop = loop
+        self.resolution = resolution
+        self._fire = fire
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._levels = levels
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._overflow = {}
+        self._origin = loop.time()
+        self._tick = 0
+        self._count = 0
+        self._armed = False
+        self._lock = LockType()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def call_later(self, delay: float, name: str, data: EvtData) -> TimerHandle:
+        """
+        Schedule a named emit `delay` seconds from now
+        """
+        handle = TimerHandle(self, name, data)
+        self.schedule(handle, delay)
+        return handle
+
+    def schedule(self, handle: TimerHandle, delay: float):
+        """
+        (Re)insert a handle so it fires `delay` seconds from now
+        """
+        when = self.loop.time() + max(delay, 0.0)
+        # round up so a timer never fires early
+        tick = -int(-(when - self._origin) // self.resolution)
+        with self._lock:
+            if handle._slot is not None:
+                self._unlink(handle)
+                self._count -= 1
+            if not self._count:
+                # nothing pending: skip straight over the idle ticks
+                self._tick = max(self._tick, self._now_tick())
+            handle.when = when
+            handle._tick = tick
+            self._link(handle, self._tick + 1)
+            self._count += 1
+            arm = not self._armed
+            self._armed = True
+        if arm:
+            self.loop.call_soon_threadsafe(self._run)
+
+    def cancel(self, handle: TimerHandle) -> bool:
+        with self._lock:
+            if handle._slot is None:
+                return False
+            self._unlink(handle)
+            self._count -= 1
+        return True
+
+    def advance(self, tick: int) -> List[TimerHandle]:
+        """
+        Move the wheel forward to `tick`, returning every expired handle in
+        deadline order (batched per tick)
+        """
+        due = []
+        with self._lock:
+            while self._tick < tick:
+                self._tick += 1
+                index = self._tick & self._mask
+                if index == 0:
+                    self._cascade()
+                slot = self._wheels[0][index]
+                if slot:
+                    expired = list(slot)
+                    slot.clear()
+                    for handle in expired:
+                        handle._slot = None
+                    self._count -= len(expired)
+                    due.extend(expired)
+                if not self._count:
+                    self._tick = tick
+        return due
+
+    def _now_tick(self) -> int:
+        return int((self.loop.time() - self._origin) // self.resolution)
+
+    def _run(self):
+        due = self.advance(self._now_tick())
+        if due:
+            try:
+                self._fire(due)
+            except Exception as e:
+                self.loop.call_exception_handler({
+                    "message": "Exception while firing timers",
+                    "exception": e,
+                })
+        with self._lock:
+            if not self._count:
+                self._armed = False
+                return
+        self.loop.call_later(self.resolution, self._run)
+
+    def _link(self, handle: TimerHandle, earliest: int):
+        # caller must hold the lock; `earliest` is the first tick whose
+        # level 0 slot has not been processed yet
+        tick = max(handle._tick, earliest)
+        delta = tick - self._tick
+        for level in range(self._levels):
+            if delta < 1 << (self._bits * (level + 1)):
+                index = (tick >> (self._bits * level)) & self._mask
+                slot = self._wheels[level][index]
+                break
+        else:
+            slot = self._overflow
+        slot[handle] = None
+        handle._slot = slot
+
+    def _unlink(self, handle: TimerHandle):
+        # caller must hold the lock
+        del handle._slot[handle]
+        handle._slot = None
+
+    def _cascade(self):
+        # caller must hold the lock; level 0 just wrapped around
+        for level in range(1, self._levels):
+            index = (self._tick >> (self._bits * level)) & self._mask
+            slot = self._wheels[level][index]
+            if slot:
+                handles = list(slot)
+                slot.clear()
+                for handle in handles:
+                    self._link(handle, self._tick)
+            if index != 0:
+                return
+        if self._overflow:
+            handles = list(self._overflow)
+            self._overflow.clear()
+            for handle in handles:
+                self._link(handle, self._tick)
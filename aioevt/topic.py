@@ -0,0 +1,116 @@
+"""
+Dotted topic patterns and the trie used to match them
+"""
+from typing import List
+
+__all__ = ["TopicTrie", "is_pattern"]
+
+#: matches exactly one segment
+ONE = "*"
+#: matches zero or more segments
+ANY = "#"
+
+_LAST = float("inf")
+
+
+def is_pattern(name: str) -> bool:
+    """
+    Whether an event name is a wildcard pattern, e.g. `order.*.created`
+    or `metrics.#`
+    """
+    if ONE not in name and ANY not in name:
+        return False
+    return any(segment in (ONE, ANY) for segment in name.split("."))
+
+
+class _Node:
+    __slots__ = ("children", "pattern")
+
+    def __init__(self):
+        self.children = {}
+        self.pattern = None
+
+
+class TopicTrie:
+    """
+    Index of wildcard patterns by segment. Matching a concrete name walks
+    the literal, `*` and `#` branches of each segment, so its cost depends
+    on the depth of the name rather than on the number of patterns.
+    """
+    __slots__ = ("_root", "_order", "_added")
+
+    def __init__(self):
+        self._root = _Node()
+        # pattern -> insertion sequence
+        self._order = {}
+        self._added = 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add(self, pattern: str):
+        node = self._root
+        for segment in pattern.split("."):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _Node()
+            node = child
+        if node.pattern is None:
+            node.pattern = pattern
+            self._added += 1
+            self._order[pattern] = self._added
+
+    def discard(self, pattern: str):
+        path = [self._root]
+        segments = pattern.split(".")
+        for segment in segments:
+            node = path[-1].children.get(segment)
+            if node is None:
+                return
+            path.append(node)
+        if path[-1].pattern is None:
+            return
+        path[-1].pattern = None
+        del self._order[pattern]
+        # prune branches left without patterns
+        for segment, parent, node in zip(
+            reversed(segments), reversed(path[:-1]), reversed(path[1:]),
+        ):
+            if node.pattern is not None or node.children:
+                break
+            del parent.children[segment]
+
+    def match(self, name: str) -> List[str]:
+        """
+        Every pattern matching a concrete, dotted event name, in the order
+        the patterns were added
+        """
+        if not self._order:
+            return []
+        matched = set()
+        self._match(self._root, name.split("."), 0, matched)
+        # `discard` may run concurrently (under another lock than the
+        # caller's), so a pattern can vanish from `_order` meanwhile
+        order = self._order
+        return sorted(matched, key=lambda pattern: order.get(pattern, _LAST))
+
+    def _match(self, node: _Node, segments: list, index: int, matched: set):
+        if index == len(segments):
+            if node.pattern is not None:
+                matched.add(node.pattern)
+            # a trailing `#` also matches zero segments
+            tail = node.children.get(ANY)
+            if tail is not None:
+                self._match(tail, segments, index, matched)
+            return
+        children = node.children
+        child = children.get(segments[index])
+        if child is not None:
+            self._match(child, segments, index + 1, matched)
+        child = children.get(ONE)
+        if child is not None:
+            self._match(child, segments, index + 1, matched)
+        child = children.get(ANY)
+        if child is not None:
+            for rest in range(index, len(segments) + 1):
+                self._match(child, segments, rest, matched)
@@ -0,0 +1,376 @@
+"""
+Pluggable transports which carry emits to Managers in other processes
+"""
+from abc import ABC, abstractmethod
+from multiprocessing import shared_memory
+from typing import Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import time
+
+from .event import EvtData
+
+__all__ = ["Transport", "SharedMemoryRing", "SharedMemoryBus", "SharedMemoryTransport"]
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<QQ")      # head, tail: total bytes written / consumed
+_FRAME = struct.Struct("<I")        # record length prefix
+
+
+class Transport(ABC):
+    """
+    Base class for cross-process transports.
+
+    A transport is attached to one `Manager` and one event loop. The manager
+    hands it every locally emitted batch through `publish`; the transport
+    feeds batches received from its peers back through
+    `manager.emit_many(..., publish=False)`.
+    """
+
+    @abstractmethod
+    def attach(self, manager, loop: asyncio.AbstractEventLoop):
+        """
+        Start feeding batches received from peers to `manager` on `loop`
+        """
+
+    @abstractmethod
+    def detach(self):
+        """
+        Stop receiving batches
+        """
+
+    @abstractmethod
+    def publish(self, events: List[Tuple[str, EvtData]]):
+        """
+        Send a batch of locally emitted events to the peers; called by the
+        Manager on emit, so it must not block an event loop
+        """
+
+
+class SharedMemoryRing:
+    """
+    A multi-producer, single-consumer byte ring in POSIX shared memory.
+
+    Records are length-prefixed and may wrap around the end of the buffer.
+    Producers serialize on a process-shared lock; the consumer only takes it
+    briefly to read the head and publish its tail. A named FIFO acts as the
+    doorbell: producers ring it only when the ring goes from empty to
+    non-empty, so a busy consumer is never woken more than once per batch.
+    """
+
+    def __init__(self, name: str, size: int, lock, doorbell: str):
+        self.name = name
+        self.size = size
+        self.lock = lock
+        self.doorbell = doorbell
+        self._shm = None
+        self._fd = None
+
+    @classmethod
+    def create(cls, size: int, lock, doorbell: str) -> "SharedMemoryRing":
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER.size + size)
+        _HEADER.pack_into(shm.buf, 0, 0, 0)
+        os.mkfifo(doorbell)
+        ring = cls(shm.name, size, lock, doorbell)
+        ring._shm = shm
+        return ring
+
+    def __reduce__(self):
+        return (SharedMemoryRing, (self.name, self.size, self.lock, self.doorbell))
+
+    @property
+    def buf(self) -> memoryview:
+        if self._shm is None:
+            self._shm = _attach_shared_memory(self.name)
+        return self._shm.buf
+
+    def fileno(self) -> int:
+        if self._fd is None:
+            # O_RDWR keeps the FIFO open without waiting for a peer
+            self._fd = os.open(self.doorbell, os.O_RDWR | os.O_NONBLOCK)
+        return self._fd
+
+    def write(self, payloads: List[bytes], timeout: float = 1.0) -> int:
+        """
+        Append records, waiting up to `timeout` seconds for free space
+
+        :return the number of records written (the rest were dropped)
+        """
+        buf = self.buf
+        written = 0
+        deadline = None
+        while written < len(payloads):
+            with self.lock:
+                head, tail = _HEADER.unpack_from(buf, 0)
+                was_empty = head == tail
+                free = self.size - (head - tail)
+                for payload in payloads[written:]:
+                    needed = _FRAME.size + len(payload)
+                    if needed > self.size:
+                        raise ValueError("Record larger than the ring buffer")
+                    if needed > free:
+                        break
+                    self._copy(head, _FRAME.pack(len(payload)))
+                    self._copy(head + _FRAME.size, payload)
+                    head += needed
+                    free -= needed
+                    written += 1
+                _HEADER.pack_into(buf, 0, head, tail)
+            if was_empty and head != tail:
+                self._ring()
+            if written < len(payloads):
+                if timeout <= 0:
+                    break
+                now = time.monotonic()
+                if deadline is None:
+                    deadline = now + timeout
+                elif now >= deadline:
+                    break
+                time.sleep(0.0005)
+        return written
+
+    def read(self) -> List[bytes]:
+        """
+        Consume every record currently in the ring (consumer side only)
+        """
+        buf = self.buf
+        self._drain_doorbell()
+        records = []
+        while True:
+            with self.lock:
+                head, tail = _HEADER.unpack_from(buf, 0)
+            if head == tail:
+                return records
+            while tail < head:
+                (length,) = _FRAME.unpack(self._peek(tail, _FRAME.size))
+                records.append(self._peek(tail + _FRAME.size, length))
+                tail += _FRAME.size + length
+            with self.lock:
+                _HEADER.pack_into(buf, 0, _HEADER.unpack_from(buf, 0)[0], tail)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    def unlink(self):
+        """
+        Destroy the ring; only the creating process should call this
+        """
+        self.close()
+        shm = shared_memory.SharedMemory(name=self.name)
+        shm.close()
+        shm.unlink()
+        if os.path.exists(self.doorbell):
+            os.unlink(self.doorbell)
+
+    def _copy(self, position: int, data: bytes):
+        start = position % self.size
+        first = min(len(data), self.size - start)
+        offset = _HEADER.size
+        self.buf[offset + start:offset + start + first] = data[:first]
+        if first < len(data):
+            self.buf[offset:offset + len(data) - first] = data[first:]
+
+    def _peek(self, position: int, length: int) -> bytes:
+        start = position % self.size
+        first = min(length, self.size - start)
+        offset = _HEADER.size
+        data = bytes(self.buf[offset + start:offset + start + first])
+        if first < length:
+            data += bytes(self.buf[offset:offset + length - first])
+        return data
+
+    def _ring(self):
+        try:
+            os.write(self.fileno(), b"\0")
+        except BlockingIOError:
+            # the FIFO is already full of unread doorbells
+            pass
+
+    def _drain_doorbell(self):
+        try:
+            while os.read(self.fileno(), 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+
+class SharedMemoryBus:
+    """
+    A set of rings, one inbound ring per participating process.
+
+    Create the bus once in the parent process and hand it to the workers
+    (e.g. as a `multiprocessing.Process` argument); every process then calls
+    `endpoint(index)` with its own index and attaches the result to its
+    `Manager`. Only the creator should `close` the bus.
+    """
+
+    def __init__(self, rings: List[SharedMemoryRing], directory: str):
+        self.rings = rings
+        self.directory = directory
+
+    @classmethod
+    def create(cls,
+               peers: int,
+               ring_size: int = 1 << 20,
+               context=None,
+    ) -> "SharedMemoryBus":
+        """
+        :param peers: number of participating processes
+        :param ring_size: bytes of shared memory per inbound ring
+        :param context: multiprocessing context used to create the locks
+        """
+        context = context or multiprocessing.get_context()
+        directory = tempfile.mkdtemp(prefix="aioevt-")
+        rings = [
+            SharedMemoryRing.create(
+                ring_size, context.Lock(), os.path.join(directory, str(i)),
+            )
+            for i in range(peers)
+        ]
+        return cls(rings, directory)
+
+    def endpoint(self,
+                 index: int,
+                 names: Optional[Iterable[str]] = None,
+                 put_timeout: float = 1.0,
+    ) -> "SharedMemoryTransport":
+        return SharedMemoryTransport(self, index, names, put_timeout)
+
+    def close(self):
+        for ring in self.rings:
+            ring.unlink()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class SharedMemoryTransport(Transport):
+    """
+    One process's view of a `SharedMemoryBus`: it reads its own ring and
+    broadcasts every published batch to the rings of all other peers.
+
+    :param bus: the shared bus
+    :param index: this process's ring
+    :param names: only publish these event names (None = everything)
+    :param put_timeout: how long a thread without a running event loop
+                        waits for room in a full peer ring before dropping
+                        the rest of a batch; an emit on a running loop
+                        drops it right away instead of stalling the loop
+
+    Publishing never breaks an emit: an event that can't be pickled, or
+    whose record is larger than a peer's ring, is logged and counted in
+    `dropped` for every peer it doesn't reach.
+    """
+
+    def __init__(self,
+                 bus: SharedMemoryBus,
+                 index: int,
+                 names: Optional[Iterable[str]] = None,
+                 put_timeout: float = 1.0,
+    ):
+        self.inbox = bus.rings[index]
+        self.peers = [ring for i, ring in enumerate(bus.rings) if i != index]
+        self.names = None if names is None else frozenset(names)
+        self.put_timeout = put_timeout
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self._manager = None
+        self._loop = None
+
+    def attach(self, manager, loop: asyncio.AbstractEventLoop):
+        self._manager = manager
+        self._loop = loop
+        loop.call_soon_threadsafe(
+            loop.add_reader, self.inbox.fileno(), self._on_doorbell,
+        )
+        # pick up anything published before we started listening
+        loop.call_soon_threadsafe(self._on_doorbell)
+
+    def detach(self):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(
+                self._loop.remove_reader, self.inbox.fileno(),
+            )
+        self._manager = self._loop = None
+
+    def close(self):
+        self.detach()
+        self.inbox.close()
+        for ring in self.peers:
+            ring.close()
+
+    def publish(self, events: List[Tuple[str, EvtData]]):
+        if self.names is not None:
+            events = [event for event in events if event[0] in self.names]
+        if not events:
+            return
+        payloads = []
+        for name, data in events:
+            try:
+                payload = pickle.dumps(
+                    (name, data.args, data.kwargs) if data is not None else (name, (), None),
+                    pickle.HIGHEST_PROTOCOL,
+                )
+            except Exception:
+                logger.exception("Could not publish an event %r", name)
+                self.dropped += len(self.peers)
+                continue
+            payloads.append(payload)
+        if not payloads:
+            return
+        timeout = self.put_timeout
+        if asyncio._get_running_loop() is not None:
+            timeout = 0.0
+        for ring in self.peers:
+            fitting = [
+                payload for payload in payloads
+                if _FRAME.size + len(payload) <= ring.size
+            ]
+            if len(fitting) < len(payloads):
+                logger.error(
+                    "Dropped %d events larger than the ring of %s",
+                    len(payloads) - len(fitting), ring.name,
+                )
+            written = ring.write(fitting, timeout) if fitting else 0
+            self.published += written
+            self.dropped += len(payloads) - written
+
+    def _on_doorbell(self):
+        manager = self._manager
+        if manager is None:
+            return
+        records = self.inbox.read()
+        if not records:
+            return
+        self.received += len(records)
+        events = []
+        for record in records:
+            name, args, kwargs = pickle.loads(record)
+            events.append((name, EvtData(args=args, kwargs=kwargs)))
+        manager.emit_many(events, publish=False)
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing segment without handing it to this process's
+    resource tracker, which would otherwise unlink it when we exit
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
@@ -0,0 +1,6 @@
+"""
+Standalone benchmarks for AIOEVT
+
+Each module can be run on its own, e.g. `python -m benchmarks.bench_dispatch`,
+and prints one JSON object per measurement.
+"""
@@ -0,0 +1,145 @@
+"""
+Run the benchmark suite
+
+    python -m benchmarks                           # everything, full size
+    python -m benchmarks emit wait --quick         # a subset, reduced size
+    python -m benchmarks --quick --output new.json
+    python -m benchmarks --quick --baseline old.json --tolerance 0.1
+
+Every measurement is printed as one JSON object per line. `--output` also
+writes the whole run as a single JSON document, which can later be passed
+back as `--baseline` to compare runs.
+"""
+import argparse
+import importlib
+import json
+import platform
+import sys
+
+from . import _util
+
+SUITE = (
+    "emit",
+    "dispatch",
+    "emit_scaling",
+    "wait",
+    "timers",
+    "proxy",
+    "churn",
+    "subscriber",
+    "request",
+    "priority",
+    "topics",
+    "chain",
+    "contention",
+    "filter",
+    "journal",
+    "memory",
+    "metrics",
+    "transport",
+)
+
+
+def split(record: dict, keys: dict):
+    """
+    Split a measurement into its identifying key and its metrics
+
+    :param keys: the `KEY` fields declared by each benchmark, by name
+    """
+    fields = keys[record["bench"]]
+    key = (("bench", record["bench"]),) + tuple(
+        (field, record.get(field)) for field in fields
+    )
+    metrics = {
+        k: v for k, v in record.items()
+        if k != "bench" and k not in fields
+        and isinstance(v, (int, float)) and not isinstance(v, bool)
+    }
+    return key, metrics
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith(("_per_sec", "_per_s"))
+
+
+def compare(results: list, baseline: list, keys: dict, tolerance: float) -> int:
+    """
+    Print the relative change of every metric against a baseline run
+
+    :return the number of regressions beyond `tolerance`
+    """
+    previous = dict(
+        split(record, keys) for record in baseline if record["bench"] in keys
+    )
+    regressions = 0
+    for record in results:
+        key, metrics = split(record, keys)
+        old = previous.get(key)
+        if old is None:
+            continue
+        label = " ".join("{}={}".format(k, v) for k, v in key if v is not None)
+        for metric, value in metrics.items():
+            before = old.get(metric)
+            if not before:
+                continue
+            change = value / before - 1
+            worse = -change if higher_is_better(metric) else change
+            flag = ""
+            if worse > tolerance:
+                flag = "  REGRESSION"
+                regressions += 1
+            elif -worse > tolerance:
+                flag = "  improved"
+            print("{:<60} {:<24} {:>12.4g} -> {:<12.4g} {:+7.1%}{}".format(
+                label[:60], metric, before, value, change, flag,
+            ), file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("benchmarks", nargs="*", metavar="name",
+                        help="subset to run: " + ", ".join(SUITE))
+    parser.add_argument("--quick", action="store_true", help="run reduced sizes")
+    parser.add_argument("--output", help="write the run as a JSON document")
+    parser.add_argument("--baseline", help="JSON document from a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="relative change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    opts = parser.parse_args(argv)
+    unknown = set(opts.benchmarks) - set(SUITE)
+    if unknown:
+        parser.error("unknown benchmark(s): " + ", ".join(sorted(unknown)))
+
+    keys = {}
+    for name in opts.benchmarks or SUITE:
+        module = importlib.import_module(".bench_" + name, __package__)
+        keys[name] = module.KEY
+        module.main(module.QUICK if opts.quick else [])
+
+    document = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "quick": opts.quick,
+        "results": _util.results,
+    }
+    if opts.output:
+        with open(opts.output, "w") as output:
+            json.dump(document, output, indent=1)
+
+    if opts.baseline:
+        with open(opts.baseline) as baseline:
+            regressions = compare(
+                _util.results, json.load(baseline)["results"], keys,
+                opts.tolerance,
+            )
+        if regressions and opts.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+from threading import Event as ThreadEvent, Thread
+import asyncio
+import json
+import time
+
+__all__ = ["report", "results", "loop_threads", "stop_loops", "barrier", "drain", "timed"]
+
+#: every measurement reported in this process, in order
+results = []
+
+
+def report(bench: str, **fields):
+    """
+    Print (and record) a single machine-readable measurement.
+
+    The fields named by the benchmark's `KEY` identify the configuration
+    being measured; the suite runner compares every other numeric field.
+    """
+    record = dict(bench=bench, **fields)
+    results.append(record)
+    print(json.dumps(record), flush=True)
+
+
+def loop_threads(count: int):
+    """
+    Start `count` event loops, each running forever in a daemon thread
+    """
+    loops = []
+    for _ in range(count):
+        loop = asyncio.new_event_loop()
+        started = ThreadEvent()
+        loop.call_soon(started.set)
+        Thread(target=loop.run_forever, daemon=True).start()
+        started.wait()
+        loops.append(loop)
+    return loops
+
+
+def stop_loops(loops):
+    """
+    Stop and close loops started by `loop_threads`
+    """
+    for loop in loops:
+        loop.call_soon_threadsafe(loop.stop)
+    for loop in loops:
+        while loop.is_running():
+            time.sleep(0.0005)
+        loop.close()
+
+
+def barrier(loops, timeout: float = 60.0):
+    """
+    Block until every loop has run all callbacks queued before this call
+    """
+    events = []
+    for loop in loops:
+        evt = ThreadEvent()
+        loop.call_soon_threadsafe(evt.set)
+        events.append(evt)
+    for evt in events:
+        if not evt.wait(timeout):
+            raise TimeoutError("event loop did not drain in time")
+
+
+def drain(manager, loops, timeout: float = 60.0):
+    """
+    Block until every handler `manager` scheduled on `loops` has finished
+    """
+    for loop in loops:
+        asyncio.run_coroutine_threadsafe(manager.drain(timeout), loop).result()
+
+
+def timed(func, *args, **kwargs):
+    """
+    Run `func` once and return `(elapsed_seconds, result)`
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
@@ -0,0 +1,60 @@
+"""
+Same-loop emit chains: every handler emits the next event on the loop it
+runs on, as follow-up events usually do. Reports the time per hop.
+"""
+import argparse
+import asyncio
+import time
+
+from aioevt import Manager
+
+from ._util import report
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--hops", "20000"]
+#: fields identifying a configuration when comparing runs
+KEY = ("callback", "inline")
+
+
+async def chain(mgr, hops, kind):
+    done = asyncio.get_running_loop().create_future()
+
+    if kind == "sync":
+        def step(remaining):
+            if remaining:
+                mgr.emit("bench_chain", args=(remaining - 1,))
+            else:
+                done.set_result(None)
+    else:
+        async def step(remaining):
+            if remaining:
+                mgr.emit("bench_chain", args=(remaining - 1,))
+            else:
+                done.set_result(None)
+
+    mgr.register("bench_chain", step)
+    start = time.perf_counter()
+    mgr.emit("bench_chain", args=(hops,))
+    await done
+    elapsed = time.perf_counter() - start
+    mgr.unregister("bench_chain")
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hops", type=int, default=200000)
+    opts = parser.parse_args(argv)
+
+    for inline in (False, True):
+        for kind in ("sync", "async"):
+            async def run():
+                return await chain(Manager(**options), opts.hops, kind)
+            options = {"inline": inline}
+            elapsed = asyncio.run(run())
+            report("chain", callback=kind, inline=inline,
+                   hop_ns=elapsed / opts.hops * 1e9)
+
+
+if __name__ == "__main__":
+    main()
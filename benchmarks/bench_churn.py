@@ -0,0 +1,90 @@
+"""
+Register/unregister churn: 100k short-lived handlers spread over a table of
+10k event names, removed by handle and by function. The `scan` path is the
+previous full-table rebuild per `unregister(func=...)`, sampled because it
+is quadratic.
+"""
+import argparse
+import time
+
+from aioevt import Manager
+
+from ._util import report
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--handlers", "10000", "--names", "1000", "--sample", "10"]
+#: fields identifying a configuration when comparing runs
+KEY = ("handlers", "names")
+
+
+def make_handler():
+    def handler(*args, **kwargs):
+        pass
+    return handler
+
+
+def scan_unregister(table, func):
+    """
+    The previous algorithm: rebuild every name's subscriber list
+    """
+    for name in list(table):
+        remaining = [e for e in table[name] if e is not func]
+        if remaining:
+            table[name] = remaining
+        else:
+            del table[name]
+
+
+def run(handlers: int, names: int, sample: int):
+    mgr = Manager()
+    funcs = [make_handler() for _ in range(handlers)]
+
+    start = time.perf_counter()
+    subs = [
+        mgr.register("name{}".format(i % names), func)
+        for i, func in enumerate(funcs)
+    ]
+    registered = time.perf_counter() - start
+
+    half = handlers // 2
+    start = time.perf_counter()
+    for sub in subs[:half]:
+        sub.cancel()
+    by_handle = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for func in funcs[half:]:
+        mgr.unregister(func=func)
+    by_func = time.perf_counter() - start
+    assert len(mgr._events) == 0
+
+    table = {}
+    for i, func in enumerate(funcs):
+        table.setdefault("name{}".format(i % names), []).append(func)
+    start = time.perf_counter()
+    for func in funcs[:sample]:
+        scan_unregister(table, func)
+    scan = (time.perf_counter() - start) / sample
+
+    report(
+        "churn",
+        handlers=handlers,
+        names=names,
+        register_us=registered / handlers * 1e6,
+        cancel_us=by_handle / half * 1e6,
+        unregister_func_us=by_func / (handlers - half) * 1e6,
+        scan_unregister_us=scan * 1e6,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--handlers", type=int, default=100000)
+    parser.add_argument("--names", type=int, default=10000)
+    parser.add_argument("--sample", type=int, default=50)
+    opts = parser.parse_args(argv)
+    run(opts.handlers, opts.names, opts.sample)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Registry contention: threads register, emit and unregister handlers on
+event names of their own, so no two threads ever touch the same name.
+Reports the aggregate operations per second for a single registry lock
+and for striped locks, at several thread counts.
+
+On a free-threaded build (`python3.13t`) the threads really run in
+parallel, which is where striping matters; `gil` in each record tells
+which interpreter produced it.
+"""
+from threading import Barrier, Thread
+import argparse
+import asyncio
+import sys
+import time
+
+from aioevt import Manager
+
+from ._util import report
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--ops", "2000", "--threads", "1", "4"]
+#: fields identifying a configuration when comparing runs
+KEY = ("gil", "threads", "shards")
+
+
+def handler(*args, **kwargs):
+    pass
+
+
+def worker(mgr, index, ops, start):
+    names = ["bench_contention.{}.{}".format(index, i) for i in range(16)]
+    # a loop per thread, never run: deliveries land in its own (tiny)
+    # pending buffer, so the registry is the only shared state
+    loop = asyncio.new_event_loop()
+    start.wait()
+    for i in range(ops):
+        name = names[i % 16]
+        sub = mgr.register(name, handler, loop=loop)
+        mgr.emit(name)
+        sub.cancel()
+    loop.close()
+
+
+def run(shards, threads, ops):
+    mgr = Manager(registry_shards=shards, pending_maxsize=1)
+    start = Barrier(threads + 1)
+    workers = [
+        Thread(target=worker, args=(mgr, i, ops, start)) for i in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    return threads * ops / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=20000,
+                        help="register/emit/unregister rounds per thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 16])
+    opts = parser.parse_args(argv)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    for threads in opts.threads:
+        for shards in opts.shards:
+            report("contention", gil=gil, threads=threads, shards=shards,
+                   ops_per_s=float(run(shards, threads, opts.ops)))
+
+
+if __name__ == "__main__":
+    main()
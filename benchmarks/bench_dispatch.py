@@ -0,0 +1,97 @@
+"""
+Wakeups per emit and emit throughput: batched per-loop dispatch versus the
+previous one-`call_soon_threadsafe`-per-subscriber delivery path.
+"""
+import argparse
+import itertools
+
+from aioevt import Manager
+
+from ._util import barrier, loop_threads, report, stop_loops, timed
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--subscribers", "1", "50", "--emits", "500"]
+#: fields identifying a configuration when comparing runs
+KEY = ("path", "subscribers", "loops", "emits")
+
+
+def count_wakeups(loops):
+    """
+    Wrap `call_soon_threadsafe` on each loop so every wakeup is counted
+    """
+    counter = itertools.count()
+    for loop in loops:
+        original = loop.call_soon_threadsafe
+
+        def counting(callback, *args, _original=original, **kwargs):
+            next(counter)
+            return _original(callback, *args, **kwargs)
+        loop.call_soon_threadsafe = counting
+    return counter
+
+
+def legacy_emit(targets, args, kwargs):
+    """
+    The pre-batching delivery path: one thread-safe wakeup per subscriber
+    """
+    for func, loop in targets:
+        loop.call_soon_threadsafe(lambda f=func: f(*args, **kwargs))
+
+
+def run(subscribers: int, loops_count: int, emits: int):
+    loops = loop_threads(loops_count)
+    hits = [0]
+
+    def callback(*args, **kwargs):
+        hits[0] += 1
+
+    mgr = Manager(loop=loops[0])
+    targets = []
+    for i in range(subscribers):
+        loop = loops[i % loops_count]
+        mgr.register("bench", callback, loop=loop)
+        targets.append((callback, loop))
+
+    counter = count_wakeups(loops)
+
+    def batched():
+        for _ in range(emits):
+            mgr.emit("bench", args=(1,))
+        barrier(loops)
+
+    def legacy():
+        for _ in range(emits):
+            legacy_emit(targets, (1,), {})
+        barrier(loops)
+
+    for label, func in (("legacy", legacy), ("batched", batched)):
+        hits[0] = 0
+        before = next(counter)
+        elapsed, _ = timed(func)
+        # subtract the barrier's own wakeups (and the counter probe itself)
+        wakeups = next(counter) - before - 1 - loops_count
+        report(
+            "dispatch",
+            path=label,
+            subscribers=subscribers,
+            loops=loops_count,
+            emits=emits,
+            deliveries=hits[0],
+            wakeups_per_emit=wakeups / emits,
+            emits_per_sec=emits / elapsed,
+        )
+    stop_loops(loops)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--loops", type=int, default=4)
+    parser.add_argument("--emits", type=int, default=2000)
+    opts = parser.parse_args(argv)
+    for subscribers in opts.subscribers:
+        run(subscribers, opts.loops, opts.emits)
+
+
+if __name__ == "__main__":
+    main()
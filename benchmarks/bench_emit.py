@@ -0,0 +1,80 @@
+"""
+Emit throughput against subscriber count (1 to 10k), the number of target
+loops, the number of emitting threads, and sync versus async callbacks.
+"""
+from threading import Thread
+import argparse
+
+from aioevt import Manager
+
+from ._util import drain, loop_threads, report, stop_loops, timed
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--subscribers", "1", "100", "10000", "--loops", "1", "4", "--threads", "1", "4", "--deliveries", "20000"]
+#: fields identifying a configuration when comparing runs
+KEY = ("subscribers", "loops", "threads", "callback")
+
+
+def sync_callback(*args):
+    pass
+
+
+async def async_callback(*args):
+    pass
+
+
+def run(subscribers: int, loops_count: int, threads: int, kind: str, emits: int):
+    loops = loop_threads(loops_count)
+    mgr = Manager(loop=loops[0])
+    callback = async_callback if kind == "async" else sync_callback
+    for i in range(subscribers):
+        mgr.register("bench", callback, loop=loops[i % loops_count])
+
+    per_thread = max(emits // threads, 1)
+
+    def emitter():
+        for _ in range(per_thread):
+            mgr.emit("bench", args=(1,))
+
+    def emit_all():
+        workers = [Thread(target=emitter) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        # until the handlers have run, not just been scheduled
+        drain(mgr, loops)
+
+    elapsed, _ = timed(emit_all)
+    stop_loops(loops)
+    total = per_thread * threads
+    report(
+        "emit",
+        subscribers=subscribers,
+        loops=loops_count,
+        threads=threads,
+        callback=kind,
+        emits_per_sec=total / elapsed,
+        deliveries_per_sec=total * subscribers / elapsed,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--loops", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--callbacks", nargs="+", default=["sync", "async"])
+    parser.add_argument("--deliveries", type=int, default=200000,
+                        help="approximate deliveries per configuration")
+    opts = parser.parse_args(argv)
+    for kind in opts.callbacks:
+        for subscribers in opts.subscribers:
+            for loops_count in opts.loops:
+                for threads in opts.threads:
+                    emits = max(opts.deliveries // subscribers, threads)
+                    run(subscribers, loops_count, threads, kind, emits)
+
+
+if __name__ == "__main__":
+    main()
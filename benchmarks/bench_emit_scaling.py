@@ -0,0 +1,81 @@
+"""
+Multi-threaded emit scaling: aggregate emit throughput with 1, 2, 4 and 8
+emitter threads, each emitting its own event name. The `global_lock` path
+serializes every emit on a single lock, as the registry used to.
+"""
+from threading import Barrier, Lock as LockType, Thread
+import argparse
+import time
+
+from aioevt import Manager
+
+from ._util import barrier, loop_threads, report, stop_loops
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--emits", "2000"]
+#: fields identifying a configuration when comparing runs
+KEY = ("path", "threads", "subscribers")
+
+
+class GlobalLockManager(Manager):
+    """
+    Emulates the previous registry where emit held one global lock
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._global_lock = LockType()
+
+    def emit(self, *args, **kwargs):
+        with self._global_lock:
+            return super().emit(*args, **kwargs)
+
+
+def run(manager_cls, label: str, threads: int, emits: int, subscribers: int):
+    loops = loop_threads(2)
+    mgr = manager_cls(loop=loops[0])
+    for t in range(threads):
+        for i in range(subscribers):
+            mgr.register("evt{}".format(t), lambda *a: None, loop=loops[i % 2])
+
+    start_line = Barrier(threads + 1)
+
+    def emitter(name):
+        start_line.wait()
+        for _ in range(emits):
+            mgr.emit(name, args=(1,))
+
+    workers = [
+        Thread(target=emitter, args=("evt{}".format(t),))
+        for t in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    start_line.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    barrier(loops)
+    stop_loops(loops)
+    report(
+        "emit_scaling",
+        path=label,
+        threads=threads,
+        subscribers=subscribers,
+        emits_per_sec=threads * emits / elapsed,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--emits", type=int, default=20000)
+    parser.add_argument("--subscribers", type=int, default=4)
+    opts = parser.parse_args(argv)
+    for threads in opts.threads:
+        run(GlobalLockManager, "global_lock", threads, opts.emits, opts.subscribers)
+        run(Manager, "snapshot", threads, opts.emits, opts.subscribers)
+
+
+if __name__ == "__main__":
+    main()
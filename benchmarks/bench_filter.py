@@ -0,0 +1,64 @@
+"""
+Tenant-scoped subscribers: every subscriber only cares about emits for its
+own tenant. Compares handlers that check the tenant themselves (every emit
+is delivered to every subscriber's loop), `where=` predicates (evaluated on
+the emitting thread) and indexed `where={"tenant": ...}` equality filters.
+Reports the time per emit, including delivery.
+"""
+import argparse
+import asyncio
+import time
+
+from aioevt import Manager
+
+from ._util import report
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--subscribers", "1000", "--emits", "200"]
+#: fields identifying a configuration when comparing runs
+KEY = ("filter", "subscribers")
+
+
+def subscribe(mgr, mode, tenant, hits):
+    if mode == "handler":
+        def handler(**kwargs):
+            if kwargs["tenant"] == tenant:
+                hits.append(tenant)
+        mgr.register("bench_filter", handler)
+    elif mode == "predicate":
+        mgr.register("bench_filter", lambda **kwargs: hits.append(tenant),
+                     where=lambda **kwargs: kwargs["tenant"] == tenant)
+    else:
+        mgr.register("bench_filter", lambda **kwargs: hits.append(tenant),
+                     where={"tenant": tenant})
+
+
+async def run(mode, subscribers, emits):
+    mgr = Manager()
+    hits = []
+    for tenant in range(subscribers):
+        subscribe(mgr, mode, tenant, hits)
+    start = time.perf_counter()
+    for i in range(emits):
+        mgr.emit("bench_filter", kwargs={"tenant": i % subscribers})
+        await asyncio.sleep(0)
+    await mgr.drain()
+    elapsed = time.perf_counter() - start
+    assert len(hits) == emits
+    return elapsed / emits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--emits", type=int, default=2000)
+    opts = parser.parse_args(argv)
+
+    for mode in ("handler", "predicate", "fields"):
+        per_emit = asyncio.run(run(mode, opts.subscribers, opts.emits))
+        report("filter", filter=mode, subscribers=opts.subscribers,
+               emit_us=per_emit * 1e6)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Journal throughput: events per second appended through `Manager.emit`
+with a journal attached, by fsync interval, and events per second replayed
+from disk into a subscriber through `Journal.replay`.
+"""
+import argparse
+import asyncio
+import shutil
+import tempfile
+import time
+
+from aioevt import Journal, Manager
+
+from ._util import report
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--events", "20000", "--sync-events", "200"]
+#: fields identifying a configuration when comparing runs
+KEY = ("op", "fsync_interval", "checkpoint", "batch_size")
+
+
+def write(directory, events, fsync_interval):
+    journal = Journal(directory, fsync_interval=fsync_interval)
+    mgr = Manager(pending_maxsize=1)
+    mgr.attach_journal(journal)
+    start = time.perf_counter()
+    for i in range(events):
+        mgr.emit("bench_journal", kwargs={"seq": i, "payload": "x" * 64})
+    journal.close()
+    elapsed = time.perf_counter() - start
+    return events / elapsed, float(journal.commits)
+
+
+async def replay(directory, batch_size, consumer):
+    journal = Journal(directory)
+    mgr = Manager()
+    seen = []
+    mgr.register("bench_journal", lambda **kwargs: seen.append(kwargs["seq"]))
+    start = time.perf_counter()
+    await journal.replay(mgr, consumer=consumer, batch_size=batch_size)
+    await mgr.drain()
+    elapsed = time.perf_counter() - start
+    journal.close()
+    return len(seen) / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--sync-events", type=int, default=2000,
+                        help="events written with an fsync per emit")
+    parser.add_argument("--batch-size", type=int, default=1024)
+    opts = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="aioevt-journal-")
+    try:
+        for interval in (0, 0.001, 0.01, 0.05):
+            path = "{}/{}".format(directory, interval)
+            events = opts.sync_events if interval == 0 else opts.events
+            rate, commits = write(path, events, interval)
+            report("journal", op="write", fsync_interval=interval,
+                   commits=commits, events_per_s=rate)
+
+        path = "{}/{}".format(directory, 0.05)
+        for consumer in (None, "bench"):
+            rate = asyncio.run(replay(path, opts.batch_size, consumer))
+            report("journal", op="replay", checkpoint=consumer is not None,
+                   batch_size=opts.batch_size, events_per_s=rate)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Memory per registered subscription, measured with tracemalloc while
+registering many handlers across many names.
+"""
+import argparse
+import gc
+import tracemalloc
+
+from aioevt import Manager
+
+from ._util import report
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--subscriptions", "20000"]
+#: fields identifying a configuration when comparing runs
+KEY = ("subscriptions", "names")
+
+
+def callback(*args):
+    pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscriptions", type=int, default=100000)
+    parser.add_argument("--names", type=int, default=1000)
+    opts = parser.parse_args(argv)
+
+    names = ["name{}".format(i) for i in range(opts.names)]
+    mgr = Manager()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    subs = [
+        mgr.register(names[i % opts.names], callback)
+        for i in range(opts.subscriptions)
+    ]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the handles list itself is not part of the registry
+    overhead = 8 * len(subs)
+    report(
+        "memory",
+        subscriptions=opts.subscriptions,
+        names=opts.names,
+        bytes_per_subscription=float(after - before - overhead) / opts.subscriptions,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Instrumentation overhead: emit throughput with metrics disabled and enabled.
+With metrics disabled the only cost is a `self._metrics is not None` check
+per event, measured in isolation as `disabled_check_ns`.
+"""
+import argparse
+import timeit
+
+from aioevt import Manager
+
+from ._util import barrier, loop_threads, report, stop_loops, timed
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--emits", "5000"]
+#: fields identifying a configuration when comparing runs
+KEY = ("subscribers",)
+
+
+def run(metrics: bool, subscribers: int, emits: int, loop):
+    mgr = Manager(loop=loop, metrics=metrics)
+    for _ in range(subscribers):
+        mgr.register("bench", lambda *a: None, loop=loop)
+
+    def emit_all():
+        for _ in range(emits):
+            mgr.emit("bench", args=(1,))
+        barrier([loop])
+
+    emit_all()  # warm up
+    elapsed, _ = timed(emit_all)
+    return mgr, elapsed / emits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=4)
+    parser.add_argument("--emits", type=int, default=50000)
+    opts = parser.parse_args(argv)
+    [loop] = loop_threads(1)
+
+    mgr, disabled = run(False, opts.subscribers, opts.emits, loop)
+    _, enabled = run(True, opts.subscribers, opts.emits, loop)
+    check = min(timeit.repeat(
+        "m._metrics is not None", globals={"m": mgr}, number=1000000, repeat=5,
+    )) / 1000000
+    stop_loops([loop])
+
+    report(
+        "metrics",
+        subscribers=opts.subscribers,
+        disabled_emit_us=disabled * 1e6,
+        enabled_emit_us=enabled * 1e6,
+        enabled_overhead_pct=(enabled / disabled - 1) * 100,
+        disabled_check_ns=check * 1e9,
+        disabled_overhead_pct=check / disabled * 100,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Latency of urgent events while a flood of bulk events saturates the same
+target loop, with the urgent subscriber in the bulk lane and in a higher
+priority lane.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from aioevt import Manager
+
+from ._util import loop_threads, report, stop_loops
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--probes", "200"]
+#: fields identifying a configuration when comparing runs
+KEY = ("lane",)
+
+
+def bulk(*_):
+    # a small amount of work per bulk delivery
+    sum(range(50))
+
+
+def measure(priority, probes, backlog, interval):
+    [loop] = loop_threads(1)
+    mgr = Manager()
+    latencies = []
+    done = threading.Event()
+
+    def urgent(sent):
+        latencies.append(time.perf_counter() - sent)
+        if len(latencies) == probes:
+            done.set()
+
+    mgr.register("bulk", bulk, loop=loop)
+    mgr.register("urgent", urgent, loop=loop, priority=priority)
+
+    stop = threading.Event()
+
+    def flood():
+        batch = [("bulk", None)] * 256
+        while not stop.is_set():
+            if mgr.in_flight() < backlog:
+                mgr.emit_many(batch)
+            else:
+                time.sleep(0)
+
+    flooder = threading.Thread(target=flood)
+    flooder.start()
+    time.sleep(0.05)
+    for _ in range(probes):
+        mgr.emit("urgent", args=(time.perf_counter(),))
+        time.sleep(interval)
+    done.wait(60)
+    stop.set()
+    flooder.join()
+    stop_loops([loop])
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--probes", type=int, default=1000)
+    parser.add_argument("--backlog", type=int, default=20000,
+                        help="bulk deliveries kept queued by the flooder")
+    parser.add_argument("--interval", type=float, default=0.001,
+                        help="seconds between urgent emits")
+    opts = parser.parse_args(argv)
+
+    for lane, priority in (("bulk_lane", 0), ("high_lane", 10)):
+        latencies = sorted(measure(priority, opts.probes, opts.backlog, opts.interval))
+        report(
+            "priority",
+            lane=lane,
+            probes=len(latencies),
+            p50_us=statistics.median(latencies) * 1e6,
+            p99_us=latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+        )
+
+
+if __name__ == "__main__":
+    main()
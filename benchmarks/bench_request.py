@@ -0,0 +1,74 @@
+"""
+Request/response latency: `request()` against the old pattern of emitting a
+reply event from the handler and `wait()`-ing for it, with the handler on
+another thread's loop.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from aioevt import Manager
+
+from ._util import loop_threads, report, stop_loops
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--rounds", "500"]
+#: fields identifying a configuration when comparing runs
+KEY = ("mode",)
+
+
+async def emit_and_wait(mgr, rounds):
+    latencies = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        # correlate by name, as callers had to before `request`
+        reply = "bench_reply_{}".format(i)
+        task = asyncio.ensure_future(mgr.wait(reply))
+        await asyncio.sleep(0)
+        mgr.emit("bench_emit", args=(reply, i))
+        await task
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def request(mgr, rounds):
+    latencies = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        await mgr.request("bench_request", args=(i,))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(mode, latencies):
+    latencies = sorted(latencies)
+    report(
+        "request",
+        mode=mode,
+        rounds=len(latencies),
+        p50_us=statistics.median(latencies) * 1e6,
+        p99_us=latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5000)
+    opts = parser.parse_args(argv)
+
+    async def run():
+        mgr = Manager()
+        [other] = loop_threads(1)
+        mgr.register("bench_emit",
+                     lambda reply, value: mgr.emit(reply, args=(value * 2,)),
+                     loop=other)
+        mgr.register("bench_request", lambda value: value * 2, loop=other)
+        summarize("emit_and_wait", await emit_and_wait(mgr, opts.rounds))
+        summarize("request", await request(mgr, opts.rounds))
+        stop_loops([other])
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-subscriber dispatch cost: time spent on the emitting side (resolving
+and queueing deliveries) and on the target loop (running them) for one
+emit fanned out to many sync or coroutine subscribers.
+"""
+import argparse
+import asyncio
+import time
+
+from aioevt import Manager
+
+from ._util import report
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--subscribers", "1000", "--emits", "20"]
+#: fields identifying a configuration when comparing runs
+KEY = ("callback", "subscribers")
+
+
+def sync_callback(*args):
+    pass
+
+
+async def async_callback(*args):
+    pass
+
+
+def run(kind: str, subscribers: int, emits: int):
+    loop = asyncio.new_event_loop()
+    mgr = Manager(loop=loop)
+    callback = async_callback if kind == "async" else sync_callback
+    for _ in range(subscribers):
+        mgr.register("bench", callback, loop=loop)
+
+    async def measure():
+        emit_time = drain_time = 0.0
+        for _ in range(emits):
+            start = time.perf_counter()
+            mgr.emit("bench", args=(1,))
+            emit_time += time.perf_counter() - start
+            start = time.perf_counter()
+            await asyncio.sleep(0)
+            if kind == "async":
+                await asyncio.sleep(0)
+            drain_time += time.perf_counter() - start
+        return emit_time, drain_time
+
+    emit_time, drain_time = loop.run_until_complete(measure())
+    loop.close()
+    deliveries = subscribers * emits
+    report(
+        "subscriber",
+        callback=kind,
+        subscribers=subscribers,
+        emit_ns=emit_time / deliveries * 1e9,
+        run_ns=drain_time / deliveries * 1e9,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--emits", type=int, default=200)
+    opts = parser.parse_args(argv)
+    for kind in ("sync", "async"):
+        run(kind, opts.subscribers, opts.emits)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Delayed emits at 1M pending timers: insert, cancel and reschedule cost of the
+timer wheel behind `emit_after`, against plain `loop.call_later` handles,
+plus the rate at which due timers are fired in per-tick batches.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from aioevt import EvtData
+from aioevt.timer import TimerWheel
+
+from ._util import report
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--timers", "50000"]
+#: fields identifying a configuration when comparing runs
+KEY = ("path", "timers")
+
+
+def per_op(start: float, count: int) -> float:
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def bench_wheel(delays, data):
+    loop = asyncio.new_event_loop()
+    wheel = TimerWheel(loop, lambda due: None, resolution=0.01)
+    count = len(delays)
+
+    start = time.perf_counter()
+    handles = [wheel.call_later(delay, "timer", data) for delay in delays]
+    insert_us = per_op(start, count)
+
+    start = time.perf_counter()
+    for handle in handles[::4]:
+        handle.reschedule(handle.when - loop.time() + 1.0)
+    reschedule_us = per_op(start, len(handles[::4]))
+
+    start = time.perf_counter()
+    for handle in handles[1::2]:
+        handle.cancel()
+    cancel_us = per_op(start, len(handles[1::2]))
+
+    pending = len(wheel)
+    start = time.perf_counter()
+    fired = wheel.advance(wheel._now_tick() + int(max(delays) / 0.01) + 200)
+    fire_elapsed = time.perf_counter() - start
+    assert len(fired) == pending
+    loop.close()
+    return dict(
+        insert_us=insert_us,
+        reschedule_us=reschedule_us,
+        cancel_us=cancel_us,
+        fired_per_sec=pending / fire_elapsed,
+    )
+
+
+def bench_call_later(delays):
+    loop = asyncio.new_event_loop()
+    count = len(delays)
+    callback = lambda: None
+
+    start = time.perf_counter()
+    handles = [loop.call_later(delay, callback) for delay in delays]
+    insert_us = per_op(start, count)
+
+    start = time.perf_counter()
+    for i in range(0, count, 4):
+        handles[i].cancel()
+        handles[i] = loop.call_later(delays[i] + 1.0, callback)
+    reschedule_us = per_op(start, len(range(0, count, 4)))
+
+    start = time.perf_counter()
+    for handle in handles[1::2]:
+        handle.cancel()
+    cancel_us = per_op(start, len(handles[1::2]))
+    # cancelled handles stay in the heap until they reach its top
+    heap_entries = len(loop._scheduled)
+    loop.close()
+    return dict(
+        insert_us=insert_us,
+        reschedule_us=reschedule_us,
+        cancel_us=cancel_us,
+        heap_entries=heap_entries,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--timers", type=int, default=1000000)
+    parser.add_argument("--horizon", type=float, default=60.0)
+    opts = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    delays = [rng.uniform(0, opts.horizon) for _ in range(opts.timers)]
+    data = EvtData()
+    report("timers", path="call_later", timers=opts.timers, **bench_call_later(delays))
+    report("timers", path="wheel", timers=opts.timers, **bench_wheel(delays, data))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Emit-side cost of exact names once wildcard patterns are registered: no
+patterns, many patterns with the resolved subscribers cached, and a cache
+miss on every emit (resolution through the topic trie).
+"""
+import argparse
+import asyncio
+import timeit
+
+from aioevt import Manager
+
+from ._util import report
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--calls", "20000", "--patterns", "100"]
+#: fields identifying a configuration when comparing runs
+KEY = ("mode", "patterns")
+
+
+def noop(*_):
+    pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--patterns", type=int, default=1000)
+    opts = parser.parse_args(argv)
+
+    # deliveries stay buffered for a loop that never runs
+    loop = asyncio.new_event_loop()
+    for mode in ("none", "cached", "miss"):
+        mgr = Manager(loop=loop)
+        # three deliveries per emit in every mode
+        mgr.register("order.1.created", noop)
+        if mode == "none":
+            mgr.register("order.1.created", noop)
+            mgr.register("order.1.created", noop)
+        else:
+            for i in range(opts.patterns):
+                mgr.register("region{}.*.created".format(i), noop)
+            mgr.register("order.*.created", noop)
+            mgr.register("order.#", noop)
+        stmt = "emit('order.1.created')"
+        if mode == "miss":
+            stmt = "table._resolved = {}; " + stmt
+        best = min(timeit.repeat(
+            stmt, number=opts.calls, repeat=3,
+            globals={"emit": mgr.emit, "table": mgr._events},
+        ))
+        report("topics", mode=mode, patterns=opts.patterns if mode != "none" else 0,
+               emit_us=best / opts.calls * 1e6)
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Cross-process delivery: throughput and ping-pong latency of a Manager on a
+SharedMemoryBus against a plain `multiprocessing.Queue` pair.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import time
+
+from aioevt import EvtData, Manager, SharedMemoryBus
+
+from ._util import report
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--messages", "5000", "--pings", "200"]
+#: fields identifying a configuration when comparing runs
+KEY = ("path", "messages", "batch")
+
+
+def bus_worker(bus, expected):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    mgr = Manager(loop=loop)
+    mgr.attach_transport(bus.endpoint(1), loop)
+    received = [0]
+
+    @mgr.on("data", loop=loop)
+    def data(value):
+        received[0] += 1
+        if received[0] == expected:
+            mgr.emit("done")
+
+    mgr.register("ping", lambda seq: mgr.emit("pong", args=(seq,)), loop)
+    mgr.register("stop", loop.stop, loop)
+    loop.call_soon(mgr.emit, "ready")
+    loop.run_forever()
+
+
+def queue_worker(inbox, outbox, expected):
+    received = 0
+    while True:
+        kind, value = inbox.get()
+        if kind == "data":
+            received += 1
+            if received == expected:
+                outbox.put(("done", None))
+        elif kind == "ping":
+            outbox.put(("pong", value))
+        else:
+            return
+
+
+def bench_bus(ctx, messages: int, pings: int, batch: int):
+    bus = SharedMemoryBus.create(peers=2, ring_size=1 << 22, context=ctx)
+
+    async def run():
+        mgr = Manager()
+        mgr.attach_transport(bus.endpoint(0))
+        ready = asyncio.ensure_future(mgr.wait("ready"))
+        await asyncio.sleep(0)
+        proc = ctx.Process(target=bus_worker, args=(bus, messages))
+        proc.start()
+        await asyncio.wait_for(ready, 60.0)
+
+        done = asyncio.ensure_future(mgr.wait("done"))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        if batch > 1:
+            events = [("data", EvtData(args=(i,))) for i in range(messages)]
+            for i in range(0, messages, batch):
+                mgr.emit_many(events[i:i + batch])
+        else:
+            for i in range(messages):
+                mgr.emit("data", args=(i,))
+        await done
+        elapsed = time.perf_counter() - start
+
+        latencies = []
+        for seq in range(pings):
+            pong = asyncio.ensure_future(mgr.wait("pong"))
+            await asyncio.sleep(0)
+            start = time.perf_counter()
+            mgr.emit("ping", args=(seq,))
+            await pong
+            latencies.append(time.perf_counter() - start)
+
+        mgr.emit("stop")
+        proc.join(10.0)
+        mgr.detach_transport()
+        return elapsed, latencies
+
+    try:
+        return asyncio.run(run())
+    finally:
+        bus.close()
+
+
+def bench_queue(ctx, messages: int, pings: int):
+    inbox, outbox = ctx.Queue(), ctx.Queue()
+    proc = ctx.Process(target=queue_worker, args=(inbox, outbox, messages))
+    proc.start()
+
+    start = time.perf_counter()
+    for i in range(messages):
+        inbox.put(("data", i))
+    assert outbox.get() == ("done", None)
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    for seq in range(pings):
+        start = time.perf_counter()
+        inbox.put(("ping", seq))
+        outbox.get()
+        latencies.append(time.perf_counter() - start)
+
+    inbox.put(("stop", None))
+    proc.join(10.0)
+    return elapsed, latencies
+
+
+def summarize(path, messages, elapsed, latencies, **extra):
+    latencies = sorted(latencies)
+    report(
+        "transport",
+        path=path,
+        messages=messages,
+        messages_per_sec=messages / elapsed,
+        rtt_p50_us=statistics.median(latencies) * 1e6,
+        rtt_p99_us=latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+        **extra
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--pings", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=256)
+    opts = parser.parse_args(argv)
+    ctx = multiprocessing.get_context("spawn")
+
+    summarize("mp_queue", opts.messages, *bench_queue(ctx, opts.messages, opts.pings))
+    summarize("shm_bus", opts.messages,
+              *bench_bus(ctx, opts.messages, opts.pings, 1), batch=1)
+    summarize("shm_bus", opts.messages,
+              *bench_bus(ctx, opts.messages, opts.pings, opts.batch), batch=opts.batch)
+
+
+if __name__ == "__main__":
+    main()
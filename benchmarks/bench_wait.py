@@ -0,0 +1,70 @@
+"""
+`wait()` round-trip latency: emit from the waiting loop itself, and from
+another thread running its own loop.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from aioevt import Manager
+
+from ._util import loop_threads, report, stop_loops
+
+#: arguments used by `python -m benchmarks --quick`
+QUICK = ["--rounds", "500"]
+#: fields identifying a configuration when comparing runs
+KEY = ("mode",)
+
+
+async def same_loop(mgr, rounds):
+    latencies = []
+    for _ in range(rounds):
+        task = asyncio.ensure_future(mgr.wait("bench"))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        mgr.emit("bench", args=(1,))
+        await task
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def cross_thread(mgr, rounds, other):
+    latencies = []
+    for _ in range(rounds):
+        task = asyncio.ensure_future(mgr.wait("bench"))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        other.call_soon_threadsafe(mgr.emit, "bench", (1,))
+        await task
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(mode, latencies):
+    latencies = sorted(latencies)
+    report(
+        "wait",
+        mode=mode,
+        rounds=len(latencies),
+        p50_us=statistics.median(latencies) * 1e6,
+        p99_us=latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5000)
+    opts = parser.parse_args(argv)
+
+    async def run():
+        mgr = Manager()
+        summarize("same_loop", await same_loop(mgr, opts.rounds))
+        [other] = loop_threads(1)
+        summarize("cross_thread", await cross_thread(mgr, opts.rounds, other))
+        stop_loops([other])
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
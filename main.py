@@ -64,9 +64,8 @@ async def main():
     # start the thread, even if it is slightly delayed, emit will automatically re-schedule
     task_thread.start()
 
-    # Emit the event, even though the event loop is not currently running.
-    # By default, it will retry 5 times to address delay issues when starting
-    # new threads
+    # Emit the event, even though the event loop may not be running yet.
+    # Deliveries are buffered per loop and flushed as soon as it starts.
 
     mgr.proxy.AsyncEvent(evt, 0.1)                              # invoke using proxy
     resp = await mgr.wait("complete", 1.0)
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from aioevt import Channel
+from aioevt.manager import Manager
+
+
+def test_channel_is_cached():
+    mgr = Manager()
+    channel = mgr.channel("test_channel")
+    assert isinstance(channel, Channel)
+    assert mgr.channel("test_channel") is channel
+    assert mgr.proxy is mgr.proxy
+    assert mgr.proxy.test_channel is channel
+    with pytest.raises(AttributeError):
+        mgr.proxy.__wrapped__
+    # internal state stays out of the event namespace
+    assert mgr.proxy._manager is mgr.channel("_manager")
+
+
+def test_channel_cache_is_bounded():
+    mgr = Manager(channels_maxsize=4)
+    for i in range(10):
+        getattr(mgr.proxy, "dynamic_{}".format(i))
+    assert len(mgr._channels) <= 4
+    assert not hasattr(mgr.proxy, "__dict__")
+
+
+def test_channel_emit():
+    async def run():
+        mgr = Manager()
+        received = []
+        channel = mgr.channel("test_channel_emit")
+        channel.register(lambda *a, **k: received.append((a, k)))
+
+        channel.emit(1, 2, x=3)
+        mgr.proxy.test_channel_emit(4)
+        await asyncio.sleep(0)
+        assert received == [((1, 2), {"x": 3}), ((4,), {})]
+
+        waiting = asyncio.ensure_future(channel.wait(timeout=1.0))
+        await asyncio.sleep(0)
+        channel(5)
+        data = await waiting
+        assert data.args == (5,)
+    asyncio.run(run())
@@ -0,0 +1,164 @@
+import asyncio
+
+from aioevt.dispatch import LoopDispatcher
+from aioevt.event import COROUTINE, SYNC
+
+
+def test_burst_single_wakeup():
+    loop = asyncio.new_event_loop()
+    dispatcher = LoopDispatcher(loop)
+    seen = []
+
+    for i in range(100):
+        dispatcher.push((SYNC, seen.append, (i,), {}))
+    assert dispatcher.wakeups == 1
+
+    loop.run_until_complete(asyncio.sleep(0))
+    assert seen == list(range(100))
+
+    dispatcher.push((SYNC, seen.append, (100,), {}))
+    assert dispatcher.wakeups == 2
+    loop.run_until_complete(asyncio.sleep(0))
+    assert seen[-1] == 100
+    loop.close()
+
+
+def test_failing_callback_does_not_stop_batch():
+    loop = asyncio.new_event_loop()
+    errors = []
+    loop.set_exception_handler(lambda _, ctx: errors.append(ctx["exception"]))
+    dispatcher = LoopDispatcher(loop)
+    seen = []
+
+    def fail():
+        raise ValueError("boom")
+
+    async def coro(value):
+        seen.append(value)
+
+    dispatcher.push_many([
+        (SYNC, fail, (), {}),
+        (SYNC, seen.append, (1,), {}),
+        (COROUTINE, coro, (2,), {}),
+    ])
+    loop.run_until_complete(asyncio.sleep(0.01))
+    assert seen == [1, 2]
+    assert len(errors) == 1 and isinstance(errors[0], ValueError)
+    loop.close()
+
+
+def test_pending_buffer_overflow_and_ttl():
+    loop = asyncio.new_event_loop()
+    dispatcher = LoopDispatcher(loop, pending_maxsize=3)
+    seen = []
+
+    for i in range(5):
+        dispatcher.push((SYNC, seen.append, (i,), {}))
+    assert dispatcher.overflowed == 2
+    assert dispatcher.wakeups == 1
+
+    loop.run_until_complete(asyncio.sleep(0))
+    assert seen == [2, 3, 4]
+
+    expiring = LoopDispatcher(loop, pending_ttl=0.0)
+    expiring.push((SYNC, seen.append, ("stale",), {}))
+    loop.run_until_complete(asyncio.sleep(0.01))
+    assert "stale" not in seen
+    assert expiring.expired == 1
+    loop.close()
+
+    dispatcher.push((SYNC, seen.append, ("closed",), {}))
+    assert dispatcher.dropped == 1
+
+
+def test_priority_lanes_and_budget():
+    async def run():
+        dispatcher = LoopDispatcher(
+            asyncio.get_running_loop(), drain_budget=10, lane_quota=2,
+        )
+        seen = []
+        dispatcher.push_many([(SYNC, seen.append, (("low", i),), {}) for i in range(30)])
+        dispatcher.push((SYNC, seen.append, (("high", 0),), {}), priority=5)
+
+        await asyncio.sleep(0)
+        # the high lane goes first, the low lane fills the rest of the budget
+        assert seen[0] == ("high", 0)
+        assert len(seen) == 10
+
+        dispatcher.push((SYNC, seen.append, (("high", 1),), {}), priority=5)
+        await asyncio.sleep(0)
+        assert seen[10] == ("high", 1)
+
+        while len(dispatcher):
+            await asyncio.sleep(0)
+        assert [v for lane, v in seen if lane == "low"] == list(range(30))
+    asyncio.run(run())
+
+
+def test_low_lane_is_not_starved():
+    async def run():
+        dispatcher = LoopDispatcher(
+            asyncio.get_running_loop(), drain_budget=10, lane_quota=2,
+        )
+        seen = []
+        dispatcher.push((SYNC, seen.append, ("low",), {}), priority=-1)
+        dispatcher.push_many(
+            [(SYNC, seen.append, ("high",), {}) for _ in range(50)], priority=1,
+        )
+        await asyncio.sleep(0)
+        assert "low" in seen
+        assert len(seen) == 10
+    asyncio.run(run())
+
+
+def test_inline_runs_inside_push():
+    async def run():
+        dispatcher = LoopDispatcher(asyncio.get_running_loop(), inline=True)
+        seen = []
+        dispatcher.push((SYNC, seen.append, (1,), {}))
+        assert seen == [1]
+        assert dispatcher.wakeups == 0
+    asyncio.run(run())
+
+
+def test_inline_never_overtakes_queued_items():
+    async def run():
+        dispatcher = LoopDispatcher(asyncio.get_running_loop(), inline=True)
+        seen = []
+        dispatcher.inline = False
+        dispatcher.push((SYNC, seen.append, ("queued",), {}))
+        dispatcher.inline = True
+        dispatcher.push((SYNC, seen.append, ("inline",), {}))
+        assert seen == []
+        await asyncio.sleep(0)
+        assert seen == ["queued", "inline"]
+    asyncio.run(run())
+
+
+def test_inline_depth_falls_back_to_queue():
+    async def run():
+        dispatcher = LoopDispatcher(asyncio.get_running_loop(), inline=True)
+        depth = []
+
+        def recurse(level):
+            depth.append(level)
+            if level < 40:
+                dispatcher.push((SYNC, recurse, (level + 1,), {}))
+
+        dispatcher.push((SYNC, recurse, (0,), {}))
+        assert depth == list(range(LoopDispatcher.INLINE_DEPTH))
+        while len(dispatcher):
+            await asyncio.sleep(0)
+        assert depth == list(range(41))
+    asyncio.run(run())
+
+
+def test_discard_drops_everything():
+    loop = asyncio.new_event_loop()
+    dispatcher = LoopDispatcher(loop)
+    dispatcher.push((SYNC, print, (), {}))
+    dispatcher.push((SYNC, print, (), {}), priority=5)
+    loop.close()
+    dispatcher.discard()
+    assert len(dispatcher) == 0
+    assert dispatcher.dropped == 2
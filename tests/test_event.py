@@ -47,3 +47,58 @@ def test_event_order():
     func, loop, recurring = create_event_objects()
     assert Evt(func, loop, recurring) == Evt(loop=loop, recurring=recurring, func=func)
 
+
+def test_event_classification():
+    from aioevt.event import AWAITABLE, COROUTINE, SYNC
+
+    async def coro():
+        pass
+
+    class AsyncCallable:
+        async def __call__(self):
+            pass
+
+    assert Evt(lambda: None, None, True).kind == SYNC
+    assert Evt(coro, None, True).kind == COROUTINE
+    assert Evt(AsyncCallable(), None, True).kind == AWAITABLE
+    assert Evt(None, None, True).kind is None
+
+def test_event_slots():
+    func, loop, recurring = create_event_objects()
+    evt = Evt(func, loop, recurring)
+    assert not hasattr(evt, "__dict__")
+
+def test_weak_event():
+    import gc
+
+    class Handler:
+        def on_event(self):
+            pass
+
+    handler = Handler()
+    evt = Evt(handler.on_event, None, True, weak=True)
+    assert evt.func is None
+    assert evt.callback == handler.on_event
+    assert not evt.dead
+
+    del handler
+    gc.collect()
+    assert evt.callback is None
+    assert evt.dead
+
+def test_weak_event_requires_weakrefable():
+    from operator import itemgetter
+
+    try:
+        Evt(itemgetter(0), None, True, weak=True)
+    except TypeError:
+        pass
+    else:
+        assert False
+
+def test_event_on_closed_loop_is_dead():
+    loop = asyncio.new_event_loop()
+    evt = Evt(lambda: None, loop, True)
+    assert not evt.dead
+    loop.close()
+    assert evt.dead
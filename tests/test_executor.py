@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aioevt.manager import Manager
+
+
+def test_blocking_handler_does_not_delay_others():
+    async def run():
+        mgr = Manager()
+        release = threading.Event()
+        fast = asyncio.Event()
+
+        def blocking():
+            release.wait(2.0)
+
+        mgr.register("test_blocking", blocking, executor="thread")
+        mgr.register("test_blocking", fast.set)
+
+        start = time.perf_counter()
+        mgr.emit("test_blocking")
+        await asyncio.wait_for(fast.wait(), 1.0)
+        assert time.perf_counter() - start < 0.5
+        release.set()
+        mgr.shutdown_executors()
+    asyncio.run(run())
+
+
+def test_executor_runs_off_loop():
+    async def run():
+        mgr = Manager()
+        loop_thread = threading.get_ident()
+        threads = []
+        done = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def handler(value):
+            threads.append((threading.get_ident(), value))
+            loop.call_soon_threadsafe(done.set)
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            mgr.register("test_off_loop", handler, executor=pool)
+            mgr.emit("test_off_loop", args=(1,))
+            await asyncio.wait_for(done.wait(), 1.0)
+        assert threads[0][1] == 1
+        assert threads[0][0] != loop_thread
+    asyncio.run(run())
+
+
+def test_executor_exception_reaches_loop():
+    async def run():
+        mgr = Manager()
+        loop = asyncio.get_running_loop()
+        reported = loop.create_future()
+        loop.set_exception_handler(
+            lambda _, context: reported.done() or reported.set_result(context))
+
+        def handler():
+            raise ValueError("boom")
+
+        mgr.register("test_executor_exception", handler, executor="thread")
+        mgr.emit("test_executor_exception")
+        context = await asyncio.wait_for(reported, 1.0)
+        assert isinstance(context["exception"], ValueError)
+        mgr.shutdown_executors()
+    asyncio.run(run())
+
+
+def test_max_concurrency():
+    async def run():
+        mgr = Manager(executor_workers=8)
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0, "calls": 0}
+        loop = asyncio.get_running_loop()
+        done = asyncio.Event()
+
+        def handler():
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.01)
+            with lock:
+                state["running"] -= 1
+                state["calls"] += 1
+                if state["calls"] == 6:
+                    loop.call_soon_threadsafe(done.set)
+
+        mgr.register("test_max_concurrency", handler,
+                     executor="thread", max_concurrency=2)
+        for _ in range(6):
+            mgr.emit("test_max_concurrency")
+        await asyncio.wait_for(done.wait(), 2.0)
+        assert state["peak"] <= 2
+        mgr.shutdown_executors()
+    asyncio.run(run())
+
+
+def test_named_executor():
+    mgr = Manager()
+    pool = ThreadPoolExecutor(max_workers=1)
+    mgr.add_executor("io", pool)
+    mgr.register("test_named_executor", lambda: None, executor="io")
+
+    with pytest.raises(RuntimeError):
+        mgr.add_executor("io", pool)
+    with pytest.raises(RuntimeError):
+        mgr.register("test_named_executor", lambda: None, executor="missing")
+
+    async def coro():
+        pass
+    with pytest.raises(ValueError):
+        mgr.register("test_named_executor", coro, executor="io")
+    with pytest.raises(ValueError):
+        mgr.register("test_named_executor", lambda: None, max_concurrency=1)
+
+    mgr.shutdown_executors()
+    with pytest.raises(RuntimeError):
+        pool.submit(print)
@@ -0,0 +1,41 @@
+from aioevt.event import Evt
+from aioevt.filter import FieldIndex, split_where
+
+
+def make_evt(where=None):
+    predicate, fields = split_where(where)
+    return Evt(func=lambda **kw: None, loop=None, recurring=True,
+               where=predicate, fields=fields)
+
+
+def test_split_where():
+    predicate = lambda **kw: True
+    assert split_where(None) == (None, None)
+    assert split_where(predicate) == (predicate, None)
+    assert split_where({"b": 2, "a": 1}) == (None, (("a", 1), ("b", 2)))
+
+
+def test_index_selects_matching_subscribers_in_order():
+    plain = make_evt()
+    acme = make_evt({"tenant": "acme"})
+    acme_eu = make_evt({"tenant": "acme", "region": "eu"})
+    other = make_evt({"tenant": "other"})
+    symbol = make_evt({"symbol": "XYZ"})
+    index = FieldIndex((acme, plain, acme_eu, other, symbol))
+
+    assert index.select({"tenant": "acme"}) == [acme, plain]
+    assert index.select({"tenant": "acme", "region": "eu"}) == [acme, plain, acme_eu]
+    assert index.select({"tenant": "other", "symbol": "XYZ"}) == [plain, other, symbol]
+    assert index.select({}) == [plain]
+
+
+def test_index_without_filters_returns_snapshot():
+    snapshot = (make_evt(), make_evt())
+    assert FieldIndex(snapshot).select({"tenant": "acme"}) is snapshot
+
+
+def test_unhashable_emit_values_still_compare():
+    evt = make_evt({"tags": frozenset({"a"})})
+    index = FieldIndex((evt,))
+    assert index.select({"tags": {"a"}}) == [evt]
+    assert index.select({"tags": {"b"}}) == []
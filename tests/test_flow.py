@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from aioevt import InFlightLimitExceeded, OverflowPolicy
+from aioevt.manager import Manager
+
+
+def blocking_handler(gate: asyncio.Event, calls: list):
+    async def handler(value):
+        calls.append(value)
+        await gate.wait()
+    return handler
+
+
+def test_subscriber_limit_queues():
+    async def run():
+        mgr = Manager()
+        gate = asyncio.Event()
+        calls = []
+        mgr.register("test_limit_queue", blocking_handler(gate, calls),
+                     max_in_flight=2)
+        for i in range(5):
+            mgr.emit("test_limit_queue", args=(i,))
+        await asyncio.sleep(0.01)
+        assert calls == [0, 1]
+        assert mgr.in_flight() == 5
+
+        gate.set()
+        await mgr.drain(timeout=1.0)
+        assert calls == [0, 1, 2, 3, 4]
+        assert mgr.in_flight() == 0
+    asyncio.run(run())
+
+
+def test_subscriber_limit_drops():
+    async def run():
+        mgr = Manager()
+        gate = asyncio.Event()
+        calls = []
+        sub = mgr.register("test_limit_drop", blocking_handler(gate, calls),
+                           max_in_flight=1, overflow=OverflowPolicy.DROP)
+        for i in range(3):
+            mgr.emit("test_limit_drop", args=(i,))
+        gate.set()
+        await mgr.drain(timeout=1.0)
+        assert calls == [0]
+        assert sub.limit.dropped == 2
+
+        mgr.emit("test_limit_drop", args=(3,))
+        await mgr.drain(timeout=1.0)
+        assert calls == [0, 3]
+    asyncio.run(run())
+
+
+def test_loop_limit_rejects():
+    async def run():
+        mgr = Manager(max_in_flight=1, overflow=OverflowPolicy.REJECT)
+        gate = asyncio.Event()
+        calls = []
+        sync_calls = []
+        mgr.register("test_limit_reject", blocking_handler(gate, calls))
+        mgr.register("test_limit_reject", sync_calls.append)
+
+        mgr.emit("test_limit_reject", args=(0,))
+        with pytest.raises(InFlightLimitExceeded):
+            mgr.emit("test_limit_reject", args=(1,))
+        gate.set()
+        await mgr.drain(timeout=1.0)
+        # sync callbacks aren't limited
+        assert sync_calls == [0, 1]
+        assert calls == [0]
+    asyncio.run(run())
+
+
+def test_drain_timeout():
+    async def run():
+        mgr = Manager()
+        gate = asyncio.Event()
+        mgr.register("test_drain_timeout", blocking_handler(gate, []))
+        mgr.emit("test_drain_timeout", args=(0,))
+        with pytest.raises(asyncio.TimeoutError):
+            await mgr.drain(timeout=0.05)
+        assert mgr.in_flight() == 1
+        gate.set()
+        await mgr.drain(timeout=1.0)
+        assert not mgr._drainers
+    asyncio.run(run())
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        Manager(max_in_flight=0)
+    with pytest.raises(ValueError):
+        Manager().register("test_invalid", print, max_in_flight=1, overflow="bogus")
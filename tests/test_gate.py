@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+
+from aioevt.manager import Manager
+
+
+def test_coalesce_keeps_latest():
+    async def run():
+        mgr = Manager()
+        received = []
+        mgr.register("test_coalesce", received.append, coalesce=True)
+        for i in range(100):
+            mgr.emit("test_coalesce", args=(i,))
+        await mgr.drain(timeout=1.0)
+        assert received == [99]
+
+        mgr.emit("test_coalesce", args=(100,))
+        await mgr.drain(timeout=1.0)
+        assert received == [99, 100]
+    asyncio.run(run())
+
+
+def test_coalesce_dispatches_once():
+    async def run():
+        mgr = Manager()
+        received = []
+        mgr.register("test_coalesce_once", received.append, coalesce=True)
+        for i in range(100):
+            mgr.emit("test_coalesce_once", args=(i,))
+        dispatcher = mgr._dispatchers[asyncio.get_running_loop()]
+        assert len(dispatcher) == 1
+        await mgr.drain(timeout=1.0)
+    asyncio.run(run())
+
+
+def test_debounce_waits_for_quiet():
+    async def run():
+        mgr = Manager()
+        received = []
+
+        async def handler(value):
+            received.append(value)
+
+        mgr.register("test_debounce", handler, debounce=0.05)
+        for i in range(5):
+            mgr.emit("test_debounce", args=(i,))
+            await asyncio.sleep(0.01)
+        assert received == []
+        await mgr.drain(timeout=1.0)
+        assert received == [4]
+    asyncio.run(run())
+
+
+def test_throttle_spaces_deliveries():
+    async def run():
+        mgr = Manager()
+        received = []
+        mgr.register("test_throttle", received.append, throttle=20)
+        mgr.emit("test_throttle", args=(0,))
+        await asyncio.sleep(0.01)
+        # leading edge is delivered right away
+        assert received == [0]
+        for i in range(1, 10):
+            mgr.emit("test_throttle", args=(i,))
+        await asyncio.sleep(0.01)
+        assert received == [0]
+        await mgr.drain(timeout=1.0)
+        assert received == [0, 9]
+    asyncio.run(run())
+
+
+def test_gate_bypassed_by_request():
+    async def run():
+        mgr = Manager()
+        mgr.register("test_gate_request", lambda value: value, debounce=10.0)
+        assert await mgr.request("test_gate_request", args=(1,), timeout=1.0) == 1
+    asyncio.run(run())
+
+
+def test_gate_options():
+    mgr = Manager()
+    with pytest.raises(ValueError):
+        mgr.register("test_gate_options", print, coalesce=True, debounce=1.0)
+    with pytest.raises(ValueError):
+        mgr.register("test_gate_options", print, throttle=0)
+
+
+def test_gate_respects_max_in_flight():
+    async def run():
+        mgr = Manager()
+        running = []
+        peak = []
+
+        async def handler(value):
+            running.append(value)
+            peak.append(len(running))
+            await asyncio.sleep(0.05)
+            running.remove(value)
+
+        mgr.register("test_gate_limit", handler, coalesce=True,
+                     max_in_flight=1, overflow="drop")
+        for i in range(5):
+            mgr.emit("test_gate_limit", args=(i,))
+            await asyncio.sleep(0.001)
+        await mgr.drain(timeout=1.0)
+        assert max(peak) == 1
+    asyncio.run(run())
+
+
+def test_lost_arm_resets_gate():
+    mgr = Manager(pending_ttl=0.01)
+    loop = asyncio.new_event_loop()
+    received = []
+    mgr.register("test_gate_lost", received.append, loop=loop, coalesce=True)
+    mgr.emit("test_gate_lost", args=(1,))
+    # the arming item expires in the pending buffer before the loop starts
+    time.sleep(0.02)
+
+    async def run():
+        await asyncio.sleep(0)
+        mgr.emit("test_gate_lost", args=(2,))
+        await mgr.drain(timeout=1.0)
+
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+    assert received == [2]
+
+
+def test_gate_drops_payload_after_unregister():
+    async def run():
+        mgr = Manager()
+        received = []
+        mgr.register("test_gate_debounce", received.append, debounce=0.02)
+        mgr.emit("test_gate_debounce", args=(1,))
+        mgr.unregister("test_gate_debounce")
+
+        sub = mgr.register("test_gate_throttle", received.append, throttle=20)
+        mgr.emit("test_gate_throttle", args=(2,))
+        await asyncio.sleep(0.005)
+        mgr.emit("test_gate_throttle", args=(3,))
+        sub.cancel()
+        await mgr.drain(timeout=1.0)
+        assert received == [2]
+    asyncio.run(run())
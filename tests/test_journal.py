@@ -0,0 +1,141 @@
+import asyncio
+import os
+
+import pytest
+
+from aioevt import EvtData, Journal, Manager
+
+
+def events(count, name="test_journal"):
+    return [(name, EvtData(args=(i,), kwargs={"i": i})) for i in range(count)]
+
+
+def test_append_and_read(tmp_path):
+    with Journal(str(tmp_path), segment_size=256) as journal:
+        journal.append(events(50))
+        journal.append([("test_journal", None)])
+        records = list(journal.read())
+        assert len(journal.segments()) > 1
+    assert [data.args for _, _, data in records[:-1]] == [(i,) for i in range(50)]
+    assert records[-1][2] == EvtData(args=(), kwargs=None)
+    assert records[-1][0] == journal.end
+
+    # offsets resume from an earlier record
+    middle = records[24][0]
+    with Journal(str(tmp_path)) as journal:
+        assert [data.args for _, _, data in journal.read(middle)][0] == (25,)
+
+
+def test_synchronous_commit(tmp_path):
+    with Journal(str(tmp_path), fsync_interval=0) as journal:
+        journal.append(events(3))
+        assert journal.commits == 1
+        assert os.path.getsize(os.path.join(str(tmp_path), "{:020d}.seg".format(0))) == journal.end
+
+
+def test_torn_tail_is_cut_off(tmp_path):
+    with Journal(str(tmp_path)) as journal:
+        journal.append(events(5))
+        end = journal.flush()
+        path = os.path.join(str(tmp_path), "{:020d}.seg".format(journal.segments()[-1]))
+    with open(path, "ab") as segment:
+        segment.write(b"\x40\x00\x00\x00\x00\x00\x00\x00partial")
+
+    with Journal(str(tmp_path)) as journal:
+        assert journal.end == end
+        assert len(list(journal.read())) == 5
+        journal.append(events(1))
+        assert len(list(journal.read())) == 6
+
+
+def test_names_filter(tmp_path):
+    with Journal(str(tmp_path), names=["kept"]) as journal:
+        journal.append(events(2, "kept") + events(2, "skipped"))
+        assert [name for _, name, _ in journal.read()] == ["kept", "kept"]
+
+
+def test_manager_journals_and_replays(tmp_path):
+    async def run():
+        journal = Journal(str(tmp_path), fsync_interval=0.01)
+        mgr = Manager()
+        mgr.attach_journal(journal)
+        mgr.emit("test_journal", args=(0,))
+        mgr.emit_many(events(3)[1:])
+        await mgr.drain()
+        assert mgr.detach_journal() is journal
+        journal.close()
+
+        journal = Journal(str(tmp_path))
+        seen = []
+        mgr = Manager()
+        mgr.attach_journal(journal)
+        mgr.register("test_journal", lambda value, **kw: seen.append(value))
+        end = await journal.replay(mgr, consumer="counter", batch_size=2)
+        assert seen == [0, 1, 2]
+        assert journal.checkpoint("counter") == end == journal.end
+        # replayed events aren't journaled again
+        assert len(list(journal.read())) == 3
+
+        # a restart resumes after the checkpoint
+        mgr.emit("test_journal", args=(3,))
+        end = await journal.replay(mgr, consumer="counter")
+        assert end == journal.end
+        await mgr.drain()
+        assert seen == [0, 1, 2, 3, 3]
+        journal.close()
+
+        with Journal(str(tmp_path)) as journal:
+            assert journal.checkpoint("counter") == end
+    asyncio.run(run())
+
+
+def test_compact(tmp_path):
+    with Journal(str(tmp_path), segment_size=64) as journal:
+        journal.append(events(20))
+        offsets = [offset for offset, _, _ in journal.read()]
+        before = len(journal.segments())
+        journal.commit("consumer", offsets[9])
+        removed = journal.compact()
+        assert removed and len(journal.segments()) == before - removed
+        assert [data.args for _, _, data in journal.read(offsets[9])][0] == (10,)
+
+
+def test_invalid_options(tmp_path):
+    with pytest.raises(ValueError):
+        Journal(str(tmp_path), segment_size=0)
+    with pytest.raises(ValueError):
+        Journal(str(tmp_path), fsync_interval=-1)
+
+
+def test_failures_do_not_break_emit(tmp_path, caplog):
+    mgr = Manager()
+    seen = []
+    mgr.register("test_journal", seen.append)
+
+    class Broken:
+        def write(self, record):
+            raise OSError("disk full")
+
+        def close(self):
+            pass
+
+    async def run():
+        journal = Journal(str(tmp_path), fsync_interval=0.001)
+        mgr.attach_journal(journal)
+        mgr.emit("test_journal", (lambda: None,))
+        assert journal.failed == 1
+        journal._file = Broken()
+        mgr.emit("test_journal", (1,))
+        while journal._error is None:
+            await asyncio.sleep(0.001)
+        mgr.emit("test_journal", (2,))
+        await mgr.drain()
+        with pytest.raises(OSError):
+            journal.flush()
+        journal.close()
+        return journal
+
+    journal = asyncio.run(run())
+    assert len(seen) == 3
+    assert journal.failed == 3
+    assert "Journal write failed" in caplog.text
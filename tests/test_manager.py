@@ -3,6 +3,7 @@ import asyncio
 
 from aioevt.event import EvtData
 from aioevt.manager import Manager
+from aioevt.registry import SubscriberTable, WaiterTable
 
 
 def new_event_loop():
@@ -109,7 +110,7 @@ def test_multithread_async_callback():
     @mgr.on("test_multithread_async_callback", loop=task_loop, recurring=False)
     async def callback(*args, **kwargs):
         nonlocal main_loop, evt
-        evt._loop.call_soon_threadsafe(evt.set)
+        main_loop.call_soon_threadsafe(evt.set)
         mgr.emit("test_multithread_async_callback_done")
     
     t1 = threading.Thread(
@@ -211,4 +212,520 @@ def test_multithread_wait():
     t1 = threading.Thread(target=run_wait)
     t1.start()
     t1.join(1.0)
-    assert not t1.is_alive()
\ No newline at end of file
+    assert not t1.is_alive()
+
+def test_concurrent_one_shot_delivered_once():
+    loop = new_event_loop()
+    mgr = Manager(loop=loop)
+    calls = []
+    mgr.register("test_concurrent_one_shot", calls.append, loop, False)
+
+    async def run():
+        threads = [
+            threading.Thread(
+                target=mgr.emit,
+                args=("test_concurrent_one_shot", (i,)),
+            )
+            for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        await asyncio.sleep(0.01)
+
+    loop.run_until_complete(run())
+    assert len(calls) == 1
+    assert len(mgr._events) == 0
+
+
+def test_subscription_cancel():
+    mgr = Manager()
+
+    def callback():
+        pass
+
+    sub = mgr.register("test_subscription_cancel", callback)
+    other = mgr.register("test_subscription_cancel", callback)
+    assert sub.active and sub.name == "test_subscription_cancel"
+    assert sub.cancel() is True
+    assert sub.cancel() is False
+    assert not sub.active
+    assert other.active
+    assert len(mgr._events) == 1
+
+
+def test_unregister_func_across_names():
+    mgr = Manager()
+
+    class Handler:
+        def method(self):
+            pass
+
+    handler = Handler()
+    keep = mgr.register("a", lambda: None)
+    for name in ("a", "b", "c"):
+        mgr.register(name, handler.method)
+
+    removed = mgr.unregister(func=handler.method)
+    assert len(removed) == 3
+    assert len(mgr._events) == 1
+    assert keep.active
+
+
+def test_emit_many():
+    loop = new_event_loop()
+    mgr = Manager(loop=loop)
+    first, second = [], []
+    mgr.register("a", lambda value: first.append(("a", value)), loop)
+    mgr.register("b", lambda value: first.append(("b", value)), loop)
+    mgr.register("b", lambda value: second.append(value), loop)
+
+    async def run():
+        mgr.emit_many([
+            ("a", EvtData(args=(1,))),
+            ("b", EvtData(args=(2,))),
+            ("c", None),
+            ("a", EvtData(args=(3,))),
+        ])
+        assert mgr._dispatcher(loop).wakeups == 1
+        await asyncio.sleep(0)
+
+    loop.run_until_complete(run())
+    assert first == [("a", 1), ("b", 2), ("a", 3)]
+    assert second == [2]
+
+
+def test_emit_many_async():
+    async def run():
+        mgr = Manager()
+        seen = []
+        done = asyncio.Event()
+
+        def callback(value):
+            seen.append(value)
+            if value == 9:
+                done.set()
+
+        mgr.register("test_emit_many_async", callback)
+
+        async def produce():
+            for i in range(10):
+                yield "test_emit_many_async", EvtData(args=(i,))
+
+        await mgr.emit_many_async(produce(), chunk_size=3)
+        await asyncio.wait_for(done.wait(), 1.0)
+        assert seen == list(range(10))
+    asyncio.run(run())
+
+
+def test_wait_timeout_does_not_leak():
+    async def run():
+        mgr = Manager()
+        for _ in range(3):
+            try:
+                await mgr.wait("test_wait_timeout", timeout=0.01)
+            except asyncio.TimeoutError:
+                pass
+        assert len(mgr._waiters) == 0
+        assert len(mgr._events) == 0
+
+        task = asyncio.ensure_future(mgr.wait("test_wait_cancel"))
+        await asyncio.sleep(0)
+        assert len(mgr._waiters) == 1
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert len(mgr._waiters) == 0
+    asyncio.run(run())
+
+
+def test_wait_any():
+    async def run():
+        mgr = Manager()
+        task = asyncio.ensure_future(mgr.wait_any(["a", "b", "c"]))
+        await asyncio.sleep(0)
+        mgr.emit("b", args=(2,))
+        name, data = await asyncio.wait_for(task, 1.0)
+        assert name == "b"
+        assert data.args == (2,)
+        assert len(mgr._waiters) == 0
+    asyncio.run(run())
+
+
+def test_wait_all():
+    async def run():
+        mgr = Manager()
+        task = asyncio.ensure_future(mgr.wait_all(["a", "b"]))
+        await asyncio.sleep(0)
+        mgr.emit("a", args=(1,))
+        mgr.emit("a", args=(3,))
+        await asyncio.sleep(0)
+        assert not task.done()
+        mgr.emit("b", kwargs={"x": 2})
+        results = await asyncio.wait_for(task, 1.0)
+        assert results["a"].args == (1,)
+        assert results["b"].kwargs == {"x": 2}
+        assert len(mgr._waiters) == 0
+    asyncio.run(run())
+
+
+def test_emit_before_loop_starts():
+    mgr = Manager()
+    task_loop = asyncio.new_event_loop()
+    seen = []
+    done = threading.Event()
+
+    def callback(value):
+        seen.append(value)
+        if len(seen) == 3:
+            done.set()
+
+    mgr.register("test_emit_before_loop_starts", callback, loop=task_loop)
+    for i in range(3):
+        mgr.emit("test_emit_before_loop_starts", args=(i,))
+    assert seen == []
+
+    def run():
+        mgr.attach_loop(task_loop)
+        task_loop.run_until_complete(asyncio.sleep(0.01))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert done.wait(1.0)
+    thread.join(1.0)
+    assert seen == [0, 1, 2]
+    assert mgr.pending_overflow == 0
+    task_loop.close()
+
+
+def test_awaitable_callable():
+    async def run():
+        mgr = Manager()
+        done = asyncio.Event()
+
+        class Handler:
+            async def __call__(self, value):
+                await asyncio.sleep(0)
+                done.set()
+
+        mgr.register("test_awaitable_callable", Handler())
+        mgr.emit("test_awaitable_callable", args=(1,))
+        await asyncio.wait_for(done.wait(), 1.0)
+    asyncio.run(run())
+
+
+def test_emit_priority():
+    async def run():
+        mgr = Manager()
+        seen = []
+        mgr.register("test_priority_bulk", seen.append)
+        mgr.register("test_priority_urgent", seen.append, priority=10)
+
+        mgr.emit("test_priority_bulk", args=("bulk",))
+        mgr.emit("test_priority_urgent", args=("urgent",))
+        mgr.emit("test_priority_bulk", args=("bulk_urgent",), priority=20)
+        await asyncio.sleep(0)
+        assert seen == ["bulk_urgent", "urgent", "bulk"]
+    asyncio.run(run())
+
+
+def test_wildcard_subscription():
+    async def run():
+        mgr = Manager()
+        seen = []
+        mgr.register("order.*.created", lambda order: seen.append(("one", order)))
+        mgr.register("order.#", lambda order: seen.append(("any", order)))
+
+        mgr.emit("order.1.created", args=(1,))
+        mgr.emit("order.2.shipped", args=(2,))
+        await asyncio.sleep(0)
+        assert seen == [("one", 1), ("any", 1), ("any", 2)]
+
+        mgr.unregister("order.#")
+        mgr.emit("order.3.created", args=(3,))
+        await asyncio.sleep(0)
+        assert seen[-1] == ("one", 3)
+        assert len(seen) == 4
+    asyncio.run(run())
+
+
+def test_same_loop_emit_order():
+    async def run():
+        for inline in (False, True):
+            mgr = Manager(inline=inline)
+            seen = []
+
+            def first(value):
+                seen.append(("first", value))
+                if value == 0:
+                    mgr.emit("test_same_loop_order", args=(1,))
+
+            mgr.register("test_same_loop_order", first)
+            mgr.register("test_same_loop_order",
+                         lambda value: seen.append(("second", value)))
+            mgr.emit("test_same_loop_order", args=(0,))
+            await mgr.drain(timeout=1.0)
+            if inline:
+                # nested like function calls
+                assert seen == [("first", 0), ("first", 1), ("second", 1),
+                                ("second", 0)]
+            else:
+                assert seen == [("first", 0), ("second", 0), ("first", 1),
+                                ("second", 1)]
+    asyncio.run(run())
+
+
+def test_where_filters():
+    async def run():
+        mgr = Manager()
+        seen = []
+        mgr.register("quote", lambda **kw: seen.append(("acme", kw["price"])),
+                     where={"tenant": "acme"})
+        mgr.register("quote", lambda **kw: seen.append(("high", kw["price"])),
+                     where=lambda **kw: kw["price"] > 10)
+        mgr.register("quote", lambda **kw: seen.append(("all", kw["price"])))
+        once = mgr.register("quote", lambda **kw: seen.append(("once", kw["price"])),
+                            recurring=False, where={"tenant": "other"})
+
+        mgr.emit("quote", kwargs={"tenant": "acme", "price": 5})
+        mgr.emit("quote", kwargs={"tenant": "globex", "price": 20})
+        await asyncio.sleep(0)
+        assert seen == [("acme", 5), ("all", 5), ("high", 20), ("all", 20)]
+        # filtered out emits don't consume a one-shot subscription
+        assert once.active
+    asyncio.run(run())
+
+
+def test_where_validation():
+    mgr = Manager()
+    for where in ({}, {"tenant": []}, "tenant"):
+        try:
+            mgr.register("test_where_validation", print, where=where)
+        except (TypeError, ValueError):
+            pass
+        else:
+            assert False, where
+
+
+def test_weak_subscription_is_purged():
+    import gc
+
+    class Handler:
+        def __init__(self, seen):
+            self.seen = seen
+
+        def on_event(self, value):
+            self.seen.append(value)
+
+    async def run():
+        mgr = Manager(metrics=True)
+        seen = []
+        handler = Handler(seen)
+        mgr.register("test_weak", handler.on_event, weak=True)
+        other = Handler(seen)
+        mgr.register("test_weak", other.on_event, weak=True)
+        mgr.emit("test_weak", args=(1,))
+        await asyncio.sleep(0)
+        assert seen == [1, 1]
+
+        # removal by function finds weak subscriptions too
+        assert len(mgr.unregister(func=other.on_event)) == 1
+
+        del handler
+        gc.collect()
+        mgr.emit("test_weak", args=(2,))
+        await asyncio.sleep(0)
+        assert seen == [1, 1]
+        assert mgr.purged == 1
+        assert "test_weak" not in mgr._events
+        assert mgr.metrics_snapshot()["purged"] == 1
+    asyncio.run(run())
+
+
+def test_closed_loop_is_purged():
+    async def run():
+        mgr = Manager()
+        closed = asyncio.new_event_loop()
+        mgr.register("test_closed_loop", print, loop=closed)
+        mgr.register("test_closed_loop", lambda: None)
+        mgr.emit("test_closed_loop")
+        closed.close()
+        mgr.emit("test_closed_loop")
+        await asyncio.sleep(0)
+        assert mgr.purged == 1
+        assert len(mgr._events.get("test_closed_loop")) == 1
+        assert closed not in mgr._dispatchers
+
+        # once purged, the closed loop doesn't trigger another purge
+        mgr.emit("test_closed_loop")
+        assert not mgr._purge_scheduled
+    asyncio.run(run())
+
+
+def test_weak_subscription_rejects_executor():
+    mgr = Manager()
+    try:
+        mgr.register("test_weak_executor", print, weak=True, executor="thread")
+    except ValueError:
+        pass
+    else:
+        assert False
+
+
+def test_sticky_wait_returns_immediately():
+    async def run():
+        mgr = Manager()
+        mgr.emit("db_ready", kwargs={"dsn": "db"}, sticky=True)
+        data = await asyncio.wait_for(mgr.wait("db_ready"), 0.1)
+        assert data.kwargs == {"dsn": "db"}
+        assert len(mgr._waiters) == 0
+        assert await mgr.wait_any(["other", "db_ready"]) == ("db_ready", data)
+
+        # wait_all combines latched values with later emits
+        waiting = asyncio.ensure_future(mgr.wait_all(["db_ready", "cache_ready"]))
+        await asyncio.sleep(0)
+        mgr.emit("cache_ready")
+        result = await asyncio.wait_for(waiting, 1.0)
+        assert result["db_ready"] is data
+
+        assert mgr.clear("db_ready")
+        assert not mgr.clear("db_ready")
+        try:
+            await mgr.wait("db_ready", timeout=0.01)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            assert False
+    asyncio.run(run())
+
+
+def test_latched_name_replays_to_new_subscriptions():
+    async def run():
+        mgr = Manager(latched=["config_loaded"])
+        mgr.emit("config_loaded", args=(1,))
+        mgr.emit("config_loaded", args=(2,))
+        assert mgr.latest("config_loaded").args == (2,)
+
+        seen = []
+        sub = mgr.register("config_loaded", lambda value: seen.append(("sub", value)))
+        once = mgr.register("config_loaded", lambda value: seen.append(("once", value)),
+                            recurring=False)
+        filtered = mgr.register("config_loaded", lambda value: seen.append(("no", value)),
+                                where=lambda value: value > 5)
+        assert not once.active
+        assert sub.active and filtered.active
+        stream = mgr.stream("config_loaded")
+        await asyncio.sleep(0)
+        assert seen == [("sub", 2), ("once", 2)]
+        assert len(stream) == 1
+        stream.close()
+
+        mgr.unlatch("config_loaded")
+        assert mgr.latest("config_loaded") is None
+        mgr.emit("config_loaded", args=(3,))
+        assert mgr.latest("config_loaded") is None
+
+        mgr.latch("config_loaded")
+        mgr.emit("config_loaded", args=(4,))
+        assert mgr.latest("config_loaded").args == (4,)
+    asyncio.run(run())
+
+
+def test_sticky_cache_is_bounded():
+    mgr = Manager(sticky_maxsize=2)
+    loop = asyncio.new_event_loop()
+    mgr.loop = loop
+    for name in ("a", "b", "c"):
+        mgr.emit(name, sticky=True)
+    assert mgr.latest("a") is None
+    assert mgr.latest("c") is not None
+    loop.close()
+
+
+def test_latched_emit_racing_a_wait():
+    async def run():
+        mgr = Manager()
+
+        class LateWaiters(WaiterTable):
+            def add(self, waiter, names=None):
+                # the emit lands after the cache lookup, before the waiter is added
+                mgr.emit("ready", args=(1,), sticky=True)
+                super().add(waiter, names)
+
+        mgr._waiters = LateWaiters()
+        data = await mgr.wait("ready", timeout=1.0)
+        assert data.args == (1,)
+
+        # only the missing names are registered
+        mgr._waiters = WaiterTable()
+        waiting = asyncio.ensure_future(mgr.wait_all(["ready", "other"]))
+        await asyncio.sleep(0)
+        assert "ready" not in mgr._waiters._by_name
+        assert "other" in mgr._waiters._by_name
+        mgr.emit("other")
+        result = await asyncio.wait_for(waiting, 1.0)
+        assert result["ready"] is data
+    asyncio.run(run())
+
+
+def test_latched_emit_racing_a_register():
+    async def run():
+        mgr = Manager(latched=["config"])
+        seen = []
+        emitter = threading.Thread(target=mgr.emit, args=("config", (1,)))
+
+        class SlowSubscribers(SubscriberTable):
+            def add(self, name, evt):
+                super().add(name, evt)
+                # emit from another thread while the subscription is half done
+                emitter.start()
+                emitter.join(0.05)
+
+        mgr._events = SlowSubscribers()
+        mgr.register("config", seen.append, loop=asyncio.get_running_loop())
+        emitter.join()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert seen == [1]
+    asyncio.run(run())
+
+
+def test_faulty_where_filter_is_isolated():
+    async def run():
+        loop = asyncio.get_running_loop()
+        errors = []
+        loop.set_exception_handler(lambda loop, context: errors.append(context))
+        mgr = Manager()
+        seen = []
+        faulty = mgr.register("test_faulty_where", lambda **kw: seen.append("faulty"),
+                              recurring=False, where=lambda tenant: tenant == "a")
+        mgr.register("test_faulty_where", lambda **kw: seen.append("healthy"))
+        mgr.emit("test_faulty_where", kwargs={"symbol": "x"})
+        await asyncio.sleep(0)
+        assert seen == ["healthy"]
+        assert faulty.active
+        assert len(errors) == 1 and isinstance(errors[0]["exception"], TypeError)
+    asyncio.run(run())
+
+
+def test_latched_replay_is_not_overtaken():
+    async def run():
+        emitter = None
+
+        class SlowReplay(Manager):
+            def _deliver_latest(self, evt, data):
+                # a fresh emit from another thread while the replay is pending
+                emitter.start()
+                emitter.join(0.05)
+                super()._deliver_latest(evt, data)
+
+        mgr = SlowReplay(latched=["config"])
+        emitter = threading.Thread(target=mgr.emit, args=("config", (2,)))
+        mgr.emit("config", args=(1,))
+        seen = []
+        mgr.register("config", seen.append, loop=asyncio.get_running_loop())
+        emitter.join()
+        await mgr.drain(timeout=1.0)
+        assert seen == [1, 2]
+        assert mgr.latest("config").args == (2,)
+    asyncio.run(run())
@@ -0,0 +1,93 @@
+import asyncio
+
+from aioevt import Manager
+from aioevt.metrics import Histogram
+
+
+def test_histogram():
+    histogram = Histogram()
+    for value in (1e-6, 3e-6, 4e-6, 0.3, 0.3):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["max"] == 0.3
+    assert histogram.quantile(0.5) == 5e-6
+    assert histogram.quantile(0.99) == 0.3
+
+
+def test_disabled_by_default():
+    mgr = Manager()
+    assert mgr.metrics is None
+    assert mgr.metrics_snapshot() is None
+
+
+def test_manager_metrics():
+    exported = []
+
+    async def run():
+        mgr = Manager(metrics=True)
+        mgr.metrics.add_exporter(exported.append)
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda *_: None)
+        done = asyncio.Event()
+        running = []
+
+        def sync_handler():
+            pass
+
+        async def async_handler():
+            running.append(mgr.metrics.in_flight)
+            await asyncio.sleep(0)
+            done.set()
+
+        def failing():
+            raise ValueError("boom")
+
+        mgr.register("a", sync_handler)
+        mgr.register("a", async_handler)
+        mgr.register("b", failing)
+        mgr.emit("a")
+        mgr.emit("b")
+        mgr.emit("nobody")
+        assert mgr.metrics.in_flight == 0
+        await asyncio.wait_for(done.wait(), 1.0)
+        await asyncio.sleep(0)
+        assert running == [1]
+        return mgr.export_metrics()
+
+    snapshot = asyncio.run(run())
+    assert exported == [snapshot]
+    assert snapshot["emits"] == {"a": 1, "b": 1, "nobody": 1}
+    assert snapshot["deliveries"] == {"a": 2, "b": 1}
+    assert snapshot["failures"] == {"b": 1}
+    assert snapshot["in_flight"] == 0
+    assert snapshot["duration"]["sync"]["count"] == 2
+    assert snapshot["duration"]["async"]["count"] == 1
+    [latency] = snapshot["latency"].values()
+    assert latency["count"] == 3
+    [loop_stats] = snapshot["loops"].values()
+    assert loop_stats["queue_depth"] == 0
+
+
+def test_lost_deliveries_not_counted():
+    mgr = Manager(metrics=True, pending_maxsize=2)
+    loop = asyncio.new_event_loop()
+    calls = []
+
+    async def handler(i):
+        calls.append(i)
+
+    mgr.register("a", handler, loop=loop)
+    for i in range(10):
+        mgr.emit("a", (i,))
+    # the buffer kept two deliveries and dropped the rest, none ran yet
+    assert mgr.metrics.in_flight == 0
+    try:
+        loop.run_until_complete(mgr.drain())
+    finally:
+        loop.close()
+    snapshot = mgr.metrics.snapshot()
+    assert len(calls) == 2
+    assert snapshot["emits"] == {"a": 10}
+    assert snapshot["deliveries"] == {"a": 2}
+    assert snapshot["in_flight"] == 0
@@ -0,0 +1,175 @@
+from threading import Thread
+
+import pytest
+
+from aioevt.event import Evt
+from aioevt.registry import SubscriberTable
+
+
+def make_evt(recurring=True):
+    return Evt(func=lambda: None, loop=None, recurring=recurring)
+
+
+def test_snapshot_is_immutable():
+    table = SubscriberTable()
+    first = make_evt()
+    table.add("name", first)
+    snapshot = table.get("name")
+
+    table.add("name", make_evt())
+    assert snapshot == (first,)
+    assert len(table.get("name")) == 2
+
+
+def test_claim_once():
+    table = SubscriberTable()
+    keep, once = make_evt(), make_evt(recurring=False)
+    table.add("name", keep)
+    table.add("name", once)
+    snapshot = table.get("name")
+
+    assert table.claim("name", [once]) == (once,)
+    assert table.claim("name", [once]) == ()
+    assert table.get("name") == (keep,)
+    assert snapshot == (keep, once)
+
+
+def test_empty_names_are_dropped():
+    table = SubscriberTable()
+    evt = make_evt(recurring=False)
+    table.add("name", evt)
+    table.claim("name", [evt])
+    assert len(table) == 0
+    assert "name" not in table
+
+
+def test_remove_func_uses_index():
+    table = SubscriberTable()
+
+    def func():
+        pass
+
+    evts = [Evt(func=func, loop=None, recurring=True) for _ in range(3)]
+    for i, evt in enumerate(evts):
+        table.add("name{}".format(i), evt)
+    table.add("name0", make_evt())
+
+    assert table.remove_func(func) == evts
+    assert len(table) == 1
+    assert table.remove_func(func) == []
+
+
+def test_wildcard_resolution_and_invalidation():
+    table = SubscriberTable()
+    exact, one, many = make_evt(), make_evt(), make_evt()
+    table.add("order.1.created", exact)
+    table.add("order.*.created", one)
+    table.add("order.#", many)
+
+    assert table.get("order.1.created") == (exact, one, many)
+    assert table.get("order.2.created") == (one, many)
+    assert table.get("order") == (many,)
+    assert table.get("invoice.1.created") == ()
+
+    # cached entries are dropped on change
+    assert table.remove(one)
+    assert table.get("order.2.created") == (many,)
+    late = make_evt()
+    table.add("order.2.created", late)
+    assert table.get("order.2.created") == (late, many)
+    assert table.pop("order.#") == (many,)
+    assert table.get("order.2.created") == (late,)
+
+
+def test_wildcard_claim():
+    table = SubscriberTable()
+    once = make_evt(recurring=False)
+    table.add("order.*", once)
+    snapshot = table.get("order.1")
+    assert table.claim("order.1", snapshot) == (once,)
+    assert table.get("order.2") == ()
+    assert len(table) == 0
+
+
+def test_remove_func_across_shards():
+    table = SubscriberTable(shards=4)
+    func = lambda: None
+    for i in range(32):
+        table.add("name{}".format(i), Evt(func=func, loop=None, recurring=True))
+    table.add("name0", make_evt())
+    assert len(table.remove_func(func)) == 32
+    assert list(table) == ["name0"]
+
+
+def test_concurrent_writers():
+    table = SubscriberTable(shards=8)
+
+    def churn(thread):
+        for i in range(500):
+            evt = make_evt()
+            table.add("name{}.{}".format(thread, i % 10), evt)
+            if i % 2:
+                table.remove(evt)
+
+    threads = [Thread(target=churn, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(len(table.get(name)) for name in table) == 8 * 250
+
+
+def test_invalid_shards():
+    with pytest.raises(ValueError):
+        SubscriberTable(shards=0)
+
+
+def test_select_follows_changes():
+    table = SubscriberTable()
+    acme = Evt(func=lambda: None, loop=None, recurring=True,
+               fields=(("tenant", "acme"),))
+    table.add("quote", acme)
+    assert table.select("quote", {"tenant": "acme"}) == [acme]
+
+    late = Evt(func=lambda: None, loop=None, recurring=True,
+               fields=(("tenant", "acme"),))
+    table.add("quote", late)
+    assert table.select("quote", {"tenant": "acme"}) == [acme, late]
+    table.remove(acme)
+    assert table.select("quote", {"tenant": "acme"}) == [late]
+    assert table.select("quote", {"tenant": "other"}) == []
+
+
+def test_remove_if():
+    table = SubscriberTable()
+    keep, drop = make_evt(), make_evt(recurring=False)
+    table.add("a", keep)
+    table.add("a", drop)
+    table.add("b", make_evt(recurring=False))
+    removed = table.remove_if(lambda evt: not evt.recurring)
+    assert len(removed) == 2
+    assert list(table) == ["a"]
+    assert table.get("a") == (keep,)
+
+
+def test_last_value_cache_evicts_least_recently_used():
+    from aioevt.registry import LastValueCache
+
+    cache = LastValueCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.evicted == 1
+    assert cache.pop("a") == 1
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_emitting_a_pattern_name_resolves_it_once():
+    table = SubscriberTable()
+    star, other = make_evt(), make_evt()
+    table.add("order.*", star)
+    table.add("x.#", other)
+    assert table.get("order.*") == (star,)
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import pytest
+
+from aioevt import Gather
+from aioevt.manager import Manager
+
+
+def test_request_first():
+    async def run():
+        mgr = Manager()
+
+        async def slow(a, b):
+            await asyncio.sleep(0.05)
+            return "slow"
+
+        mgr.register("test_request_first", slow)
+        mgr.register("test_request_first", lambda a, b: a + b)
+        assert await mgr.request("test_request_first", args=(1, 2), timeout=1.0) == 3
+    asyncio.run(run())
+
+
+def test_request_all_in_subscription_order():
+    async def run():
+        mgr = Manager()
+
+        async def slow(value):
+            await asyncio.sleep(0.01)
+            return value * 2
+
+        mgr.register("test_request_all", slow)
+        mgr.register("test_request_all", lambda value: value + 1)
+        results = await mgr.request("test_request_all", args=(5,),
+                                    gather=Gather.ALL, timeout=1.0)
+        assert results == [10, 6]
+    asyncio.run(run())
+
+
+def test_request_quorum_tolerates_failures():
+    async def run():
+        mgr = Manager()
+
+        def fail():
+            raise ValueError("boom")
+
+        mgr.register("test_request_quorum", fail)
+        mgr.register("test_request_quorum", lambda: 1)
+        mgr.register("test_request_quorum", lambda: 2)
+        results = await mgr.request("test_request_quorum", gather=Gather.QUORUM,
+                                    quorum=2, timeout=1.0)
+        assert sorted(results) == [1, 2]
+
+        with pytest.raises(ValueError):
+            await mgr.request("test_request_quorum", gather=Gather.QUORUM,
+                              quorum=3, timeout=1.0)
+        with pytest.raises(ValueError):
+            await mgr.request("test_request_quorum", gather=Gather.ALL, timeout=1.0)
+    asyncio.run(run())
+
+
+def test_request_errors():
+    async def run():
+        mgr = Manager()
+        with pytest.raises(RuntimeError):
+            await mgr.request("test_request_nobody", timeout=1.0)
+
+        never = asyncio.Event()
+
+        async def hang():
+            await never.wait()
+
+        mgr.register("test_request_hang", hang)
+        with pytest.raises(asyncio.TimeoutError):
+            await mgr.request("test_request_hang", timeout=0.05)
+        never.set()
+
+        with pytest.raises(ValueError):
+            await mgr.request("test_request_hang", gather=Gather.QUORUM)
+        with pytest.raises(RuntimeError):
+            mgr.request_sync("test_request_hang")
+    asyncio.run(run())
+
+
+def test_request_sync_from_thread():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    try:
+        mgr = Manager()
+
+        async def double(value):
+            return value * 2
+
+        mgr.register("test_request_sync", double, loop=loop)
+        assert mgr.request_sync("test_request_sync", args=(21,), timeout=1.0) == 42
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def test_request_with_executor():
+    def boom():
+        raise KeyError("boom")
+
+    async def run():
+        mgr = Manager()
+        mgr.register("test_request_executor", lambda: 5, executor="thread")
+        assert await mgr.request("test_request_executor", timeout=1.0) == 5
+
+        mgr.unregister("test_request_executor")
+        mgr.register("test_request_executor", boom, executor="thread")
+        with pytest.raises(KeyError):
+            await mgr.request("test_request_executor", timeout=1.0)
+        mgr.shutdown_executors()
+    asyncio.run(run())
+
+
+def test_request_fails_on_lost_or_cancelled_delivery():
+    closed = asyncio.new_event_loop()
+    closed.close()
+
+    async def run():
+        mgr = Manager()
+        mgr.register("test_request_lost", lambda: 1, loop=closed)
+        for gather in (Gather.FIRST, Gather.ALL):
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(
+                    mgr.request("test_request_lost", gather=gather), 1.0)
+
+        async def cancelled():
+            raise asyncio.CancelledError
+
+        mgr.register("test_request_cancelled", cancelled)
+        for gather in (Gather.FIRST, Gather.ALL):
+            with pytest.raises(RuntimeError, match="cancelled"):
+                await asyncio.wait_for(
+                    mgr.request("test_request_cancelled", gather=gather), 1.0)
+
+        # one lost delivery doesn't spoil a request another handler answers
+        mgr.register("test_request_lost", lambda: 2)
+        assert await asyncio.wait_for(mgr.request("test_request_lost"), 1.0) == 2
+    asyncio.run(run())
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+
+from aioevt import EvtData, Manager, StreamPolicy
+
+
+def emit_range(mgr, name, count):
+    for i in range(count):
+        mgr.emit(name, args=(i,))
+
+
+def drain(stream):
+    values = []
+    while len(stream):
+        values.append(stream._buffer.popleft().args[0])
+    return values
+
+
+def test_stream_iterates_and_unsubscribes():
+    async def run():
+        mgr = Manager()
+        received = []
+        stream = mgr.stream("test_stream")
+        emit_range(mgr, "test_stream", 5)
+
+        async for data in stream:
+            received.append(data.args[0])
+            if len(received) == 5:
+                break
+        # the abandoned iterator is finalized by the loop's asyncgen hooks
+        await asyncio.sleep(0.01)
+
+        assert received == [0, 1, 2, 3, 4]
+        assert stream.closed
+        assert "test_stream" not in mgr._streams
+    asyncio.run(run())
+
+
+def test_stream_drop_policies():
+    async def run():
+        mgr = Manager()
+        oldest = mgr.stream("s", maxsize=3, policy=StreamPolicy.DROP_OLDEST)
+        newest = mgr.stream("s", maxsize=3, policy=StreamPolicy.DROP_NEWEST)
+        latest = mgr.stream("s", policy=StreamPolicy.KEEP_LATEST)
+        emit_range(mgr, "s", 6)
+
+        assert drain(oldest) == [3, 4, 5]
+        assert drain(newest) == [0, 1, 2]
+        assert drain(latest) == [5]
+        assert (oldest.dropped, newest.dropped, latest.dropped) == (3, 3, 5)
+        for stream in (oldest, newest, latest):
+            stream.close()
+        assert len(mgr._streams) == 0
+    asyncio.run(run())
+
+
+def test_stream_blocks_producer():
+    async def run():
+        mgr = Manager()
+        stream = mgr.stream("s", maxsize=2, policy=StreamPolicy.BLOCK)
+        producer = threading.Thread(target=emit_range, args=(mgr, "s", 10))
+        producer.start()
+
+        received = []
+        while len(received) < 10:
+            assert len(stream) <= 2
+            received.append((await stream.get()).args[0])
+        producer.join(1.0)
+        assert received == list(range(10))
+        assert stream.dropped == 0
+        stream.close()
+    asyncio.run(run())
+
+
+def test_stream_close_wakes_consumer():
+    async def run():
+        mgr = Manager()
+        async with mgr.stream("s") as stream:
+            task = asyncio.ensure_future(stream.get())
+            await asyncio.sleep(0)
+            stream.put(EvtData(args=(1,)))
+            assert (await asyncio.wait_for(task, 1.0)).args == (1,)
+        assert stream.closed
+        try:
+            await stream.get()
+        except EOFError:
+            pass
+        else:
+            raise AssertionError("closed stream should raise EOFError")
+    asyncio.run(run())
+
+
+def test_stream_of_closed_loop_is_dropped():
+    mgr = Manager()
+    consumer = asyncio.new_event_loop()
+    stream = mgr.stream("test_stream_closed", loop=consumer)
+    waiting = consumer.create_task(stream.get())
+    consumer.run_until_complete(asyncio.sleep(0))
+    waiting.cancel()
+    consumer.run_until_complete(asyncio.sleep(0))
+    consumer.close()
+
+    async def run():
+        received = []
+        mgr.register("test_stream_closed", received.append)
+        mgr.emit("test_stream_closed", args=(1,))
+        await asyncio.sleep(0)
+        assert received == [1]
+        assert stream.closed
+        assert "test_stream_closed" not in mgr._streams
+    asyncio.run(run())
+
+    other = asyncio.new_event_loop()
+    stream = mgr.stream("test_stream_closed", loop=other)
+    other.close()
+    assert mgr.purge() == 1
+    assert stream.closed
+    assert "test_stream_closed" not in mgr._streams
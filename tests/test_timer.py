@@ -0,0 +1,89 @@
+import asyncio
+import random
+
+from aioevt import EvtData, Manager
+from aioevt.timer import TimerWheel
+
+
+class FakeLoop:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def call_soon_threadsafe(self, callback, *args):
+        pass
+
+
+def make_wheel(**kwargs):
+    loop = FakeLoop()
+    fired = []
+    wheel = TimerWheel(loop, fired.extend, resolution=1.0, **kwargs)
+    return loop, wheel
+
+
+def test_timers_fire_on_their_tick():
+    loop, wheel = make_wheel(slots=8, levels=3)
+    rng = random.Random(7)
+    delays = [rng.randint(0, 700) for _ in range(500)]
+    handles = [wheel.call_later(d, "t", EvtData(args=(d,))) for d in delays]
+    assert len(wheel) == 500
+
+    for tick in range(1, 702):
+        for handle in wheel.advance(tick):
+            # never early, never more than one tick late
+            assert handle.data.args[0] <= tick <= max(handle.data.args[0], 1)
+    assert len(wheel) == 0
+    assert not any(handle.active for handle in handles)
+
+
+def test_cancel_and_reschedule():
+    loop, wheel = make_wheel()
+    keep = wheel.call_later(5, "keep", EvtData())
+    gone = wheel.call_later(5, "gone", EvtData())
+    moved = wheel.call_later(5, "moved", EvtData())
+
+    assert gone.cancel() is True
+    assert gone.cancel() is False
+    moved.reschedule(100)
+    assert len(wheel) == 2
+
+    assert [h.name for h in wheel.advance(5)] == ["keep"]
+    assert wheel.advance(99) == []
+    assert [h.name for h in wheel.advance(100)] == ["moved"]
+    assert not keep.active and not moved.active
+
+    moved.reschedule(1)
+    assert [h.name for h in wheel.advance(101)] == ["moved"]
+
+
+def test_beyond_wheel_range():
+    loop, wheel = make_wheel(slots=4, levels=2)
+    far = wheel.call_later(50, "far", EvtData())
+    assert wheel.advance(49) == []
+    assert wheel.advance(50) == [far]
+
+
+def test_manager_emit_after():
+    async def run():
+        mgr = Manager(timer_resolution=0.001)
+        seen = []
+        done = asyncio.Event()
+
+        def callback(value):
+            seen.append(value)
+            done.set()
+
+        mgr.register("test_emit_after", callback)
+        cancelled = mgr.emit_after(0.01, "test_emit_after", args=("cancelled",))
+        late = mgr.emit_after(0.01, "test_emit_after", args=("late",))
+        mgr.emit_after(0.02, "test_emit_after", args=("on time",))
+        cancelled.cancel()
+        late.reschedule(0.05)
+
+        await asyncio.wait_for(done.wait(), 1.0)
+        assert seen == ["on time"]
+        await asyncio.sleep(0.06)
+        assert seen == ["on time", "late"]
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+from aioevt.topic import TopicTrie, is_pattern
+
+
+def test_is_pattern():
+    assert is_pattern("order.*.created")
+    assert is_pattern("metrics.#")
+    assert is_pattern("#")
+    assert not is_pattern("order.created")
+    assert not is_pattern("order.c*")
+
+
+def test_match():
+    trie = TopicTrie()
+    for pattern in ("order.*.created", "metrics.#", "a.#.z", "*"):
+        trie.add(pattern)
+
+    assert trie.match("order.1.created") == ["order.*.created"]
+    assert trie.match("order.1.2.created") == []
+    assert trie.match("metrics") == ["metrics.#", "*"]
+    assert trie.match("metrics.cpu.load") == ["metrics.#"]
+    assert trie.match("a.z") == ["a.#.z"]
+    assert trie.match("a.x.y.z") == ["a.#.z"]
+    assert trie.match("single") == ["*"]
+
+
+def test_discard_prunes():
+    trie = TopicTrie()
+    trie.add("a.*.c")
+    trie.add("a.#")
+    trie.discard("a.*.c")
+    assert len(trie) == 1
+    assert trie.match("a.b.c") == ["a.#"]
+    trie.discard("a.#")
+    assert not trie._root.children
+
+
+def test_match_tolerates_concurrent_discard():
+    trie = TopicTrie()
+    trie.add("a.*")
+    trie.add("a.#")
+    # as if `discard` removed the pattern while a match was sorting
+    del trie._order["a.*"]
+    assert trie.match("a.b") == ["a.#", "a.*"]
@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from aioevt import Manager, SharedMemoryBus, Transport
+
+
+def test_ring_wraps_and_drops():
+    bus = SharedMemoryBus.create(peers=1, ring_size=64)
+    ring = bus.rings[0]
+    try:
+        for round_ in range(10):
+            payloads = [bytes([round_]) * 10, bytes([round_]) * 20]
+            assert ring.write(payloads) == 2
+            assert ring.read() == payloads
+
+        assert ring.write([b"x" * 40, b"y" * 40], timeout=0.0) == 1
+        assert ring.read() == [b"x" * 40]
+        assert ring.read() == []
+    finally:
+        bus.close()
+
+
+def test_transport_is_abstract():
+    with pytest.raises(TypeError):
+        Transport()
+
+
+def test_full_ring_never_blocks_a_loop():
+    bus = SharedMemoryBus.create(peers=2, ring_size=64)
+    sender = bus.endpoint(0, put_timeout=10.0)
+    try:
+        bus.rings[1].write([b"x" * 60])
+
+        async def publish():
+            start = time.monotonic()
+            sender.publish([("test_transport", None)])
+            return time.monotonic() - start
+
+        assert asyncio.run(publish()) < 1.0
+        assert sender.dropped == 1
+    finally:
+        sender.close()
+        bus.close()
+
+
+def worker(bus, index):
+    """
+    Echo every `ping` back as a `pong` from another process
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    mgr = Manager(loop=loop)
+    mgr.attach_transport(bus.endpoint(index), loop)
+
+    @mgr.on("ping", loop=loop)
+    def ping(value, **kwargs):
+        mgr.emit("pong", args=(value + 1,), kwargs={"pid": index})
+
+    @mgr.on("stop", loop=loop)
+    def stop():
+        loop.stop()
+
+    loop.call_soon(mgr.emit, "ready", (index,))
+    loop.run_forever()
+    mgr.detach_transport()
+
+
+def test_cross_process_emit():
+    ctx = multiprocessing.get_context("spawn")
+    bus = SharedMemoryBus.create(peers=3, context=ctx)
+
+    async def run():
+        mgr = Manager()
+        mgr.attach_transport(bus.endpoint(0))
+        ready = set()
+        mgr.register("ready", ready.add)
+
+        workers = [ctx.Process(target=worker, args=(bus, i)) for i in (1, 2)]
+        for proc in workers:
+            proc.start()
+
+        for _ in range(3000):
+            if len(ready) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert ready == {1, 2}
+
+        pongs = []
+        stream = mgr.stream("pong")
+        mgr.emit("ping", args=(41,))
+        async for data in stream:
+            pongs.append((data.args[0], data.kwargs["pid"]))
+            if len(pongs) == 2:
+                break
+
+        mgr.emit("stop")
+        for proc in workers:
+            proc.join(10.0)
+        mgr.detach_transport()
+        return pongs, [proc.exitcode for proc in workers]
+
+    try:
+        pongs, exitcodes = asyncio.run(run())
+    finally:
+        bus.close()
+    assert sorted(pongs) == [(42, 1), (42, 2)]
+    assert exitcodes == [0, 0]
+
+
+def test_publish_failures_do_not_break_emit():
+    bus = SharedMemoryBus.create(peers=2, ring_size=256)
+
+    async def run():
+        mgr = Manager()
+        transport = bus.endpoint(0)
+        mgr.attach_transport(transport)
+        seen = []
+        mgr.register("test_transport", lambda *args: seen.append(len(args)))
+        mgr.emit("test_transport", args=(lambda: None,))
+        mgr.emit("test_transport", args=(b"x" * 1024,))
+        mgr.emit("test_transport", args=(1, 2))
+        await asyncio.sleep(0)
+        mgr.detach_transport()
+        transport.close()
+        return seen, transport
+
+    try:
+        seen, transport = asyncio.run(run())
+    finally:
+        bus.close()
+    assert seen == [1, 1, 2]
+    assert transport.dropped == 2
+    assert transport.published == 1